@@ -5,7 +5,7 @@ from sqlalchemy import pool
 
 from alembic import context
 
-from app.db.models import StatementDB, TransactionDB, CorrectionDB  # noqa — registers tables
+from app.db.models import StatementDB, TransactionDB, CorrectionDB, LayoutProfileDB  # noqa — registers tables
 from sqlmodel import SQLModel
 from app.config.settings import settings
 
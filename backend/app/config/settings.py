@@ -10,6 +10,18 @@ class Settings(BaseSettings):
     llm_total_timeout_s: float = 30.0
     llm_max_enriched: int = 100
     database_url: str = "sqlite:///./statements.db"
+    pdf_parallel_workers: int = 0  # ≥2 enables process-pool page extraction
+    pdf_parallel_min_pages: int = 16
+    pdf_text_backend: str = "pdfplumber"  # or "pdfium" — metadata/page-check text only
+    pdf_page_cache_dir: str = "./page_cache"
+    pdf_page_cache_mb: int = 0  # per-page table cache on disk, statement rows included; 0 = off
+    parse_max_pages: int = 1000  # per-request parse budget; 0 = no limit
+    parse_max_rows: int = 0  # transactions returned at most; 0 = no limit
+    parse_max_seconds: float = 120.0
+    layout_profile_cache_size: int = 64  # in-memory LRU in front of the layout_profiles table
+    narration_cache_size: int = 4096  # per tier: exact narrations, digit-masked templates; 0 disables
+    merchant_rules_path: str = ""  # JSON merchant catalogue; "" = built-in merchants only
+    merchant_rules_reload_s: float = 5.0  # catalogue change-check interval; 0 = load once at startup
 
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8"}
 
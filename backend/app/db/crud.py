@@ -1,11 +1,13 @@
 import hashlib
 import json
-from collections import defaultdict
 from typing import Optional
 
+import numpy as np
+import pandas as pd
 from sqlmodel import Session, select
 
-from app.db.models import CorrectionDB, StatementDB, TransactionDB
+from app.db.models import CorrectionDB, LayoutProfileDB, StatementDB, TransactionDB
+from app.models.frame import TransactionFrame
 
 
 def hash_file(file_bytes: bytes) -> str:
@@ -60,6 +62,27 @@ def get_correction(session: Session, fingerprint: str) -> Optional[CorrectionDB]
     ).first()
 
 
+def get_layout_profile(session: Session, signature: str) -> Optional[dict]:
+    row = session.exec(
+        select(LayoutProfileDB).where(LayoutProfileDB.signature == signature)
+    ).first()
+    return json.loads(row.profile_json) if row else None
+
+
+def save_layout_profile(
+    session: Session, signature: str, source: str, profile: dict
+) -> LayoutProfileDB:
+    """Upsert a layout profile keyed by header signature."""
+    existing = session.exec(
+        select(LayoutProfileDB).where(LayoutProfileDB.signature == signature)
+    ).first()
+    row = existing or LayoutProfileDB(signature=signature, source=source, profile_json="")
+    row.profile_json = json.dumps(profile)
+    session.add(row)
+    session.commit()
+    return row
+
+
 def find_statement_by_hash(session: Session, file_hash: str) -> Optional[StatementDB]:
     return session.exec(
         select(StatementDB).where(StatementDB.file_hash == file_hash)
@@ -127,50 +150,67 @@ def get_monthly_summary(account_number: str, session: Session) -> list[dict]:
     if not statements:
         return []
 
-    monthly: dict[str, dict] = {}
-
+    txns = []
     for stmt in statements:
-        txns = session.exec(
-            select(TransactionDB)
-            .where(TransactionDB.statement_id == stmt.id)
-            .limit(5000)  # cap: prevents memory spike on very large statements
-        ).all()
-
-        for txn in txns:
-            if not txn.transaction_date:
-                continue
-            month_key = txn.transaction_date[:7]  # "YYYY-MM"
-            if month_key not in monthly:
-                monthly[month_key] = {
-                    "month": month_key,
-                    "income": 0.0,
-                    "expenses": 0.0,
-                    "net": 0.0,
-                    "transaction_count": 0,
-                    "category_totals": defaultdict(float),
-                }
-            m = monthly[month_key]
-            amount = abs(txn.amount or 0.0)
-            txn_type = (txn.transaction_type or "").upper()
-            m["transaction_count"] += 1
-            if txn_type in ("CREDIT", "CR"):
-                m["income"] += amount
-            else:
-                m["expenses"] += amount
-                cats = json.loads(txn.category or "[]")
-                for cat in cats:
-                    m["category_totals"][cat] += amount
+        txns.extend(
+            session.exec(
+                select(TransactionDB)
+                .where(TransactionDB.statement_id == stmt.id)
+                .limit(5000)  # cap: prevents memory spike on very large statements
+            ).all()
+        )
+    frame = TransactionFrame(txns)
+
+    dated = np.array([bool(d) for d in frame.dates], dtype=bool)
+    month_codes, month_keys = pd.factorize(
+        np.array([d[:7] if d else "" for d in frame.dates], dtype=object)  # "YYYY-MM"
+    )
+    n_months = len(month_keys)
+    amount = np.abs(np.nan_to_num(frame.amount))
+    income = dated & frame.is_credit
+    expense = dated & ~frame.is_credit
+
+    # bincount adds in row order, like the running totals it replaces;
+    # rows outside the mask add 0.0.
+    def month_sum(mask):
+        return np.bincount(
+            month_codes, weights=np.where(mask, amount, 0.0), minlength=n_months
+        ).tolist()
+
+    incomes, expenses = month_sum(income), month_sum(expense)
+    counts = np.bincount(month_codes[dated], minlength=n_months).tolist()
+
+    # Top expense category per month; ties go to the category seen first.
+    rows = frame.category_rows[expense[frame.category_rows]]
+    cats = frame.category_codes[expense[frame.category_rows]]
+    n_cats = max(len(frame.categories), 1)
+    cells = month_codes[rows] * n_cats + cats
+    cat_totals = np.bincount(cells, weights=amount[rows], minlength=n_months * n_cats)
+    top_category: dict[int, int] = {}
+    for cell in pd.unique(cells).tolist():
+        month, cat = divmod(cell, n_cats)
+        best = top_category.get(month)
+        if best is None or cat_totals[cell] > cat_totals[month * n_cats + best]:
+            top_category[month] = cat
+
+    monthly = {
+        month_keys[i]: {
+            "income": incomes[i],
+            "expenses": expenses[i],
+            "transaction_count": counts[i],
+            "top_category": (
+                frame.categories[top_category[i]] if i in top_category else None
+            ),
+        }
+        for i in range(n_months)
+        if counts[i]
+    }
 
     result = []
     months_sorted = sorted(monthly.keys())
     for i, month_key in enumerate(months_sorted):
         m = monthly[month_key]
         net = round(m["income"] - m["expenses"], 2)
-        top_cat = (
-            max(m["category_totals"], key=m["category_totals"].get)
-            if m["category_totals"]
-            else None
-        )
         delta = None
         if i > 0:
             prev_exp = monthly[months_sorted[i - 1]]["expenses"]
@@ -182,7 +222,7 @@ def get_monthly_summary(account_number: str, session: Session) -> list[dict]:
             "expenses": round(m["expenses"], 2),
             "net": net,
             "transaction_count": m["transaction_count"],
-            "top_category": top_cat,
+            "top_category": m["top_category"],
             "delta_expenses_pct": delta,
         })
 
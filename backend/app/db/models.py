@@ -45,3 +45,12 @@ class CorrectionDB(SQLModel, table=True):
     corrected_category: str
     corrected_merchant: Optional[str] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+
+
+class LayoutProfileDB(SQLModel, table=True):
+    __tablename__ = "layout_profiles"
+    id: Optional[int] = Field(default=None, primary_key=True)
+    signature: str = Field(unique=True, index=True)  # SHA-256 of source + normalized header row
+    source: str  # "tabular" (CSV/Excel) or "pdf"
+    profile_json: str  # JSON: roles, date_format, amount_convention
+    created_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
@@ -0,0 +1,87 @@
+"""Aho-Corasick automaton: every keyword occurring in a text, in one pass.
+
+The enricher used to test each keyword table with ``keyword in narration``,
+one substring scan per keyword, so its per-row cost grew with the tables.
+The automaton walks the text once, whatever the number of keywords: a trie
+of the keywords with failure links (the longest proper suffix of the
+current match that is also a trie path) and, per state, the keywords that
+end there, including those ending in a suffix of it.
+"""
+
+
+class KeywordAutomaton:
+    """Finds which of a fixed set of keywords occur in a text.
+
+    find() returns the set of keywords occurring anywhere in the text, as
+    substrings, overlaps included — the same set the ``kw in text`` test
+    selects, found in one pass.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = tuple(dict.fromkeys(k for k in keywords if k))
+        goto: list[dict[str, int]] = [{}]
+        out: list[tuple[str, ...]] = [()]
+        for keyword in self.keywords:
+            state = 0
+            for ch in keyword:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    out.append(())
+                state = nxt
+            out[state] += (keyword,)
+
+        # Breadth-first, so a state's failure target is final before its
+        # children need it. Depth-1 states fail to the root.
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        for state in queue:
+            for ch, child in goto[state].items():
+                queue.append(child)
+                target = fail[state]
+                while target and ch not in goto[target]:
+                    target = fail[target]
+                fail[child] = goto[target].get(ch, 0)
+                out[child] += out[fail[child]]
+
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def find(self, text: str) -> set[str]:
+        goto, fail, out = self._goto, self._fail, self._out
+        found: set[str] = set()
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
+
+    def find_words(self, text: str) -> set[str]:
+        """The keywords occurring in `text` as whole words: a keyword that
+        starts (ends) with a letter or digit must not have one right before
+        (after) it, so "OLA" is found in "OLA CABS" but not in "COLA"."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found: set[str] = set()
+        state = 0
+        for end, ch in enumerate(text, 1):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                for keyword in out[state]:
+                    start = end - len(keyword)
+                    if keyword[0].isalnum() and start and text[start - 1].isalnum():
+                        continue
+                    if keyword[-1].isalnum() and end < len(text) and text[end].isalnum():
+                        continue
+                    found.add(keyword)
+        return found
@@ -0,0 +1,165 @@
+"""Merchant catalogue: a JSON rule file of merchant aliases, hot-reloaded.
+
+The enricher's built-in merchant table has a few dozen entries; a
+narration it can't place is left uncategorized for the LLM pass, one
+Ollama round-trip per batch. The catalogue names many more merchants
+without a code change: each rule gives a merchant, its category and the
+aliases narrations print it under. The aliases are compiled into one
+KeywordAutomaton at load, so a row costs one pass over its text whatever
+the catalogue's size, and are matched as whole words only — with tens of
+thousands of aliases, substring matches ("OLA" in "COLA") would be mostly
+wrong.
+
+start() loads the file, then a background thread re-reads it when it
+changes, checking every ``settings.merchant_rules_reload_s`` seconds; the
+app starts it with the server. apply() only looks up, so a reload never
+runs on a request. A file that fails to load leaves the previous rules in
+place. The catalogue is applied to the narration cache's results, never
+cached with them, so a reload takes effect on the next row.
+
+    {"merchants": [
+        {"merchant": "BIGBASKET", "category": "Groceries",
+         "aliases": ["BIGBASKET", "BB NOW", "SUPERMARKET GROCERY SUPPLIES"]}
+    ]}
+
+``category`` is a canonical label (services/categories.py) or one of the
+enricher's category codes, mapped to its label.
+"""
+
+import json
+import logging
+import os
+import threading
+
+from app.config.settings import settings
+from app.enrichers.keyword_automaton import KeywordAutomaton
+from app.services.categories import CANONICAL_CATEGORIES, REGEX_TO_CANONICAL
+
+logger = logging.getLogger(__name__)
+
+
+def _canonical(category: str) -> str:
+    label = REGEX_TO_CANONICAL.get(category.upper(), category)
+    if label not in CANONICAL_CATEGORIES:
+        raise ValueError(f"unknown category {category!r}")
+    return label
+
+
+def compile_rules(rules: list[dict]) -> tuple[KeywordAutomaton, dict[str, tuple]]:
+    """(automaton over the uppercased aliases, alias → (merchant, category,
+    position in the file)). An alias listed twice keeps its first rule."""
+    by_alias: dict[str, tuple] = {}
+    for i, rule in enumerate(rules):
+        try:
+            merchant = rule["merchant"].strip().upper()
+            category = _canonical(rule["category"]) if rule.get("category") else None
+            aliases = [alias.strip().upper() for alias in rule.get("aliases") or ()]
+        except (KeyError, AttributeError, TypeError, ValueError) as e:
+            raise ValueError(f"merchant rule {i}: {e!r}") from e
+        for alias in [merchant, *aliases]:
+            if alias:
+                by_alias.setdefault(alias, (merchant, category, len(by_alias)))
+    return KeywordAutomaton(by_alias), by_alias
+
+
+class MerchantRules:
+    """The merchant catalogue at ``path``; empty while no path is set."""
+
+    def __init__(
+        self,
+        path: str = settings.merchant_rules_path,
+        reload_s: float = settings.merchant_rules_reload_s,
+    ):
+        self.path = path
+        self.reload_s = reload_s
+        # One tuple, swapped whole on reload, so a reader never pairs one
+        # load's automaton with another's aliases.
+        self._rules = compile_rules([])
+        self._version = None  # (mtime_ns, size) of the file loaded
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._watcher: threading.Thread | None = None
+
+    def __len__(self) -> int:
+        return len(self._rules[1])
+
+    def load(self, rules: list[dict]) -> None:
+        """Replace the catalogue with `rules` (the file's "merchants")."""
+        self._rules = compile_rules(rules)
+
+    def refresh(self) -> bool:
+        """Reload the file if it changed since it was loaded; whether it was."""
+        if not self.path:
+            return False
+        with self._lock:
+            try:
+                stat = os.stat(self.path)
+            except OSError as e:
+                logger.warning("[MerchantRules] Cannot read %s: %s", self.path, e)
+                return False
+            version = (stat.st_mtime_ns, stat.st_size)
+            if version == self._version:
+                return False
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    self.load(json.load(f)["merchants"])
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logger.warning(
+                    "[MerchantRules] %s not loaded, keeping %d aliases: %s",
+                    self.path,
+                    len(self),
+                    e,
+                )
+                return False
+            # Only once loaded: a file caught half-written is retried on the
+            # next check, not taken as current until it changes again.
+            self._version = version
+        logger.info("[MerchantRules] Loaded %d aliases from %s", len(self), self.path)
+        return True
+
+    def start(self) -> None:
+        """Load the file, then re-check it every `reload_s` seconds on a
+        daemon thread until stop(). A `reload_s` of 0 loads it once."""
+        if not self.path or self._watcher is not None:
+            return
+        self.refresh()
+        if self.reload_s <= 0:
+            return
+        self._stopped.clear()
+        self._watcher = threading.Thread(
+            target=self._watch, name="merchant-rules", daemon=True
+        )
+        self._watcher.start()
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self.reload_s):
+            self.refresh()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def apply(self, narration: str, details: dict) -> dict:
+        """Fill in the merchant and category of `details` from the catalogue
+        where the enricher left them empty. The longest alias in the
+        narration wins, then the one listed first. Where the enricher named
+        the merchant, only that merchant's own aliases may give a category."""
+        automaton, by_alias = self._rules
+        if not by_alias or (details["merchant"] and details["category"]):
+            return details
+        aliases = automaton.find_words(narration.upper())
+        if details["merchant"]:
+            named = details["merchant"]
+            aliases = [alias for alias in aliases if by_alias[alias][0] == named]
+        if aliases:
+            best = max(aliases, key=lambda alias: (len(alias), -by_alias[alias][2]))
+            merchant, category, _ = by_alias[best]
+            details["merchant"] = merchant
+            if category and not details["category"]:
+                details["category"] = [category]
+        return details
+
+
+merchant_rules = MerchantRules()
@@ -0,0 +1,191 @@
+"""Two-tier memo in front of analyze_narration_details().
+
+A statement repeats the same few narration shapes thousands of times —
+``UPI/<digits>/<payee>/<bank>/<ref>``, ``NEFT/SALARY/ACME/<month>`` — and
+each row used to be analyzed from scratch. The first tier is an LRU keyed
+by the exact narration. The second is keyed by the narration's template:
+the narration with every long run of ASCII digits replaced by a digit
+repeated as many times, a different one for each run in turn. Every
+pattern the enricher uses tests those digits only as digits, and a masked
+run keeps its length, so a narration and its template are analyzed alike
+field for field, position for position. The template's result is kept
+with the offsets of each value holding a digit, and a narration sharing
+the template gets that result back with those values re-read from its
+own text.
+"""
+
+import re
+import string
+import threading
+from collections import OrderedDict
+from itertools import cycle
+
+from app.config.settings import settings
+from app.enrichers import narration_enricher
+
+# Where digits are regrouped (``1234 5678 9012`` → ``123456789012``) a
+# value is no longer a slice of the text, so its digits can't be re-read.
+_SEPARATED_GROUPS = re.compile(r"\d{4}[\s\-]\d{4}")
+_ASCII_DIGIT = re.compile(r"[0-9]")
+
+
+def masked_runs(keywords) -> re.Pattern | None:
+    """The digit runs a template may mask given the keyword tables: those
+    longer than any digit run inside a keyword, which no keyword can match
+    into. None when a keyword starts or ends with a digit, as such a
+    keyword can match part of any run."""
+    runs = [0]
+    for keyword in keywords:
+        if keyword[0] in string.digits or keyword[-1] in string.digits:
+            return None
+        runs.extend(len(run) for run in re.findall(r"[0-9]+", keyword))
+    return re.compile("[0-9]{%d,}" % (max(runs) + 1))
+
+
+def _copy(result: dict) -> dict:
+    return {
+        **result,
+        "receiver_details": dict(result["receiver_details"]),
+        "category": list(result["category"]),
+        "remarks": list(result["remarks"]),
+    }
+
+
+def _refill_plan(template: str, result: dict) -> list[tuple] | None:
+    """(key, subkey, start, end) of every value in `result` holding a digit,
+    found in the uppercased template; None unless each occurs exactly once
+    there, so that where it came from is certain."""
+    upper = template.upper()
+    if result["receiver_details"]["account"] is not None:
+        # Equal-length account numbers are picked in set order, which
+        # depends on the digits themselves.
+        accounts = narration_enricher.extract_possible_account_numbers(upper)
+        if len(accounts) > 1 and len(accounts[0]) == len(accounts[1]):
+            return None
+    plan = []
+    for key, value in result.items():
+        if isinstance(value, dict):
+            values = value.items()
+        elif isinstance(value, list):
+            values = enumerate(value)
+        else:
+            values = ((None, value),)
+        for subkey, text in values:
+            if isinstance(text, str) and _ASCII_DIGIT.search(text):
+                start = upper.find(text)
+                if start == -1 or upper.find(text, start + 1) != -1:
+                    return None
+                plan.append((key, subkey, start, start + len(text)))
+    return plan
+
+
+class NarrationCache:
+    """analyze_narration_details() memoized by narration, then by template.
+
+    Both tiers are LRUs of `max_entries`; 0 disables the cache. Every call
+    returns a fresh result the caller may modify. A template whose values
+    can't all be re-read (see _refill_plan) is remembered as such, and its
+    narrations are analyzed in full.
+    """
+
+    def __init__(
+        self,
+        analyze=narration_enricher.analyze_narration_details,
+        keywords=narration_enricher._KEYWORDS.keywords,
+        max_entries: int = settings.narration_cache_size,
+    ):
+        self.max_entries = max_entries
+        self._analyze = analyze
+        self._runs = masked_runs(keywords)
+        self._exact: OrderedDict[str, dict] = OrderedDict()
+        self._templates: OrderedDict[str, tuple | None] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.template_hits = 0
+        self.misses = 0
+
+    def _template(self, narration: str) -> str | None:
+        if self._runs is None:
+            return None
+        fill = cycle("123456789")
+        template, masked = self._runs.subn(
+            lambda run: next(fill) * (run.end() - run.start()), narration
+        )
+        if not masked or _SEPARATED_GROUPS.search(template):
+            return None
+        return template
+
+    @staticmethod
+    def _remember(cache: OrderedDict, key: str, value, max_entries: int) -> None:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > max_entries:
+            cache.popitem(last=False)
+
+    def details(self, narration: str) -> dict:
+        if not self.max_entries:
+            return self._analyze(narration)
+        with self._lock:
+            result = self._exact.get(narration)
+            if result is not None:
+                self._exact.move_to_end(narration)
+                self.hits += 1
+                return _copy(result)
+
+        template = self._template(narration)
+        entry, known = None, False
+        if template is not None:
+            with self._lock:
+                known = template in self._templates
+                if known:
+                    entry = self._templates[template]
+                    self._templates.move_to_end(template)
+            if not known:
+                masked = self._analyze(template)
+                plan = _refill_plan(template, masked)
+                entry = (masked, plan) if plan is not None else None
+                with self._lock:
+                    self._remember(self._templates, template, entry, self.max_entries)
+
+        if entry is None:
+            result = self._analyze(narration)
+        else:
+            masked, plan = entry
+            result = _copy(masked)
+            upper = narration.upper()
+            for key, subkey, start, end in plan:
+                if subkey is None:
+                    result[key] = upper[start:end]
+                else:
+                    result[key][subkey] = upper[start:end]
+
+        with self._lock:
+            if entry is not None and known:
+                self.template_hits += 1
+            else:
+                self.misses += 1
+            self._remember(self._exact, narration, result, self.max_entries)
+        return _copy(result)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._exact.clear()
+            self._templates.clear()
+            self.hits = self.template_hits = self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.template_hits + self.misses
+            return {
+                "hits": self.hits,
+                "template_hits": self.template_hits,
+                "misses": self.misses,
+                "hit_rate": (
+                    round((self.hits + self.template_hits) / lookups, 4) if lookups else 0.0
+                ),
+                "cached_narrations": len(self._exact),
+                "cached_templates": len(self._templates),
+            }
+
+
+narration_cache = NarrationCache()
@@ -1,5 +1,14 @@
-import re
-
+from app.enrichers.keyword_automaton import KeywordAutomaton
+from app.enrichers.narration_lexer import (
+    NarrationTokens,
+    account_numbers,
+    find_receiver,
+    find_reference,
+    find_vpa,
+    imps_fields,
+    upi_fields,
+    vsi_fields,
+)
 from app.services.categories import REGEX_TO_CANONICAL
 
 _PAYMENT_METHODS_KEYWORDS = {
@@ -110,36 +119,36 @@ _MERCHANTS_AND_CATEGORIES = {
 }
 
 
-def extract_possible_account_numbers(description):
-    if not description:
-        return []
+def _first_rank(groups) -> dict[str, int]:
+    """keyword → index of the first group listing it."""
+    ranks: dict[str, int] = {}
+    for rank, keywords in enumerate(groups):
+        for kw in keywords:
+            ranks.setdefault(kw, rank)
+    return ranks
 
-    numbers = set()
 
-    account_pattern = re.findall(r"\b\d{4}[\s\-]?\d{4}[\s\-]?\d{4,12}\b", description)
-    for match in account_pattern:
-        numbers.add(match.replace(" ", "").replace("-", ""))
+# The three tables compiled into one automaton, so a narration is scanned
+# once for all of them. Each table keeps its priority as a rank per keyword:
+# the first payment method with a keyword present wins, the first bank
+# listed wins, and merchant rules merge in table order.
+_METHODS = list(_PAYMENT_METHODS_KEYWORDS)
+_METHOD_RANK = _first_rank(_PAYMENT_METHODS_KEYWORDS.values())
+_BANK_RANK = _first_rank([bank] for bank in _BANK_KEYWORDS)
+_MERCHANT_RULES = list(_MERCHANTS_AND_CATEGORIES.values())
+_MERCHANT_RANK = _first_rank([kw] for kw in _MERCHANTS_AND_CATEGORIES)
+_KEYWORDS = KeywordAutomaton([*_METHOD_RANK, *_BANK_RANK, *_MERCHANT_RANK])
 
-    long_number_pattern = re.findall(r"\b\d{8,20}\b", description)
-    for match in long_number_pattern:
-        if len(match) <= 20:
-            numbers.add(match)
 
-    upi_ref_pattern = re.findall(
-        r"(?:UPI|REF|TXN)[\s\-:]*(\d{8,16})", description, re.IGNORECASE
-    )
-    numbers.update(upi_ref_pattern)
-
-    transfer_ref_pattern = re.findall(
-        r"(?:NEFT|RTGS|IMPS)[\s\-:]*[A-Z]*(\d{8,16})", description, re.IGNORECASE
-    )
-    numbers.update(transfer_ref_pattern)
-
-    return sorted(numbers, key=lambda x: -len(x))
+def extract_possible_account_numbers(description):
+    if not description:
+        return []
+    return account_numbers(NarrationTokens(description))
 
 
-def analyze_narration_details(narration):
-    result = {
+def blank_details() -> dict:
+    """The details of a narration nothing could be read from."""
+    return {
         "payment_method": None,
         "upi_id": None,
         "transaction_reference": None,
@@ -151,105 +160,93 @@ def analyze_narration_details(narration):
         "payment_gateway": None,
     }
 
+
+def analyze_narration_details(narration):
+    result = blank_details()
+
     if not narration:
         return result
 
     narration_upper = narration.upper()
 
-    upi_structured_match = re.search(
-        r"UPI\/(?P<upi_id>[^\/]+)\/(?P<remark>[^\/]+)\/(?P<bank>[^\/]+)\/(?P<txn_id>[^\s\/]+)",
-        narration_upper,
-    )
-    if upi_structured_match:
+    upi = upi_fields(narration_upper)
+    if upi:
+        upi_id, remark, bank, txn_id = (field.strip() for field in upi)
         result["payment_method"] = "UPI"
-        result["upi_id"] = upi_structured_match.group("upi_id").strip()
-        result["transaction_reference"] = upi_structured_match.group("txn_id").strip()
-        result["bank_peer"] = upi_structured_match.group("bank").strip()
-        result["remarks"].append(upi_structured_match.group("remark").strip())
+        result["upi_id"] = upi_id
+        result["transaction_reference"] = txn_id
+        result["bank_peer"] = bank
+        result["remarks"].append(remark)
         return result
 
-    vsi_pattern = re.search(
-        r"VSI\/(?P<merchant>[^\/]+)\/(?P<datetime>[^\/]+)\/(?P<txn_id>[^\s\/]+)",
-        narration_upper,
-    )
-    if vsi_pattern:
+    vsi = vsi_fields(narration_upper)
+    if vsi:
         result["payment_method"] = "CARD"
-        result["merchant"] = vsi_pattern.group("merchant").strip()
-        result["transaction_reference"] = vsi_pattern.group("txn_id").strip()
+        result["merchant"] = vsi[0].strip()
+        result["transaction_reference"] = vsi[2].strip()
         return result
 
-    imps_transfer_match = re.search(
-        r"IMPS/(\d{10,})/([^/]+)/([^/]+)", narration_upper
-    )
-    if imps_transfer_match:
+    imps = imps_fields(narration_upper)
+    if imps:
+        reference, name, bank = (field.strip() for field in imps)
         result["payment_method"] = "IMPS"
-        result["transaction_reference"] = imps_transfer_match.group(1).strip()
-        result["receiver_details"]["name"] = imps_transfer_match.group(2).strip()
-        result["bank_peer"] = imps_transfer_match.group(3).strip()
+        result["transaction_reference"] = reference
+        result["receiver_details"]["name"] = name
+        result["bank_peer"] = bank
         result["remarks"].append("IMPS TRANSFER")
         return result
 
-    for method, keywords in _PAYMENT_METHODS_KEYWORDS.items():
-        if any(kw in narration_upper for kw in keywords):
-            result["payment_method"] = method
-            break
-
-    if not result["upi_id"]:
-        upi_id_match = re.search(
-            r"[a-z0-9.\-_]+@[a-z]{2,}", narration_upper, re.IGNORECASE
-        )
-        if upi_id_match:
-            result["upi_id"] = upi_id_match.group().strip()
-            result["receiver_details"]["vpa"] = result["upi_id"]
-
-    if not result["transaction_reference"]:
-        txn_ref_patterns = [
-            r"\b(?:RRN|REF|TRF|TXN|UTR|UTR NO|NFS|CMS|ID)\s*[:\.]?\s*([A-Z0-9]{10,25})\b",
-            r"\b(YBL|AXI|ICI|KOT|PNB|PYTM|PTM|HDFC|ICICI|YES|SBI)[a-zA-Z0-9]{6,25}\b",
-            r"\b(?:\d{10,})\b",
-        ]
-        for pattern in txn_ref_patterns:
-            match = re.search(pattern, narration_upper)
-            if match:
-                try:
-                    result["transaction_reference"] = match.group(1).strip()
-                except IndexError:
-                    result["transaction_reference"] = match.group().strip()
-                break
-
-    receiver_patterns = [
-        r"(?:TO|FROM|BY)\s+([A-Z0-9\s.&,-_']{3,}(?:\s(?:A/C|ACC|AC|ACCOUNT|NO)\s*\d+)?)\b",
-        r"(?:TRANSFER TO|PAYMENT TO)\s+([A-Z\s.&,-_']{3,})",
-        r"CR BY\s+([A-Z\s.&,-_']{3,})",
-    ]
-    for pattern in receiver_patterns:
-        match = re.search(pattern, narration_upper)
-        if match:
-            potential_receiver = match.group(1).strip()
-            if re.search(r"\d{6,}", potential_receiver) and not re.search(
-                r"[A-Z]{3,}", potential_receiver
-            ):
-                result["receiver_details"]["account"] = potential_receiver
-            else:
-                result["receiver_details"]["name"] = potential_receiver
-            break
-
-    for bank in _BANK_KEYWORDS:
-        if bank in narration_upper:
-            result["bank_peer"] = bank
-            break
-
-    for keyword, details in _MERCHANTS_AND_CATEGORIES.items():
-        if keyword in narration_upper:
-            if details.get("merchant") and not result["merchant"]:
-                result["merchant"] = details["merchant"]
-            if (
-                details.get("category")
-                and details["category"] not in result["category"]
-            ):
-                result["category"].append(details["category"])
-            if details.get("payment_gateway") and not result["payment_gateway"]:
-                result["payment_gateway"] = details["payment_gateway"]
+    tokens = NarrationTokens(narration_upper)
+
+    vpa = find_vpa(tokens)
+    if vpa:
+        result["upi_id"] = vpa
+        result["receiver_details"]["vpa"] = vpa
+
+    result["transaction_reference"] = find_reference(tokens)
+
+    receiver = find_receiver(tokens)
+    if receiver:
+        potential_receiver, is_account = receiver
+        if is_account:
+            result["receiver_details"]["account"] = potential_receiver
+        else:
+            result["receiver_details"]["name"] = potential_receiver
+
+    possible_accounts = account_numbers(tokens)
+    if possible_accounts:
+        result["receiver_details"]["account"] = possible_accounts[0]
+
+    return merge_keywords(narration_upper, result)
+
+
+def merge_keywords(narration_upper, result):
+    """Complete `result` from the keyword tables: the payment method and
+    peer bank where it has none, the merchant, categories and gateway
+    merged in, the REFUND/TRANSFER/DEBITED/CREDITED remarks, and the
+    categories mapped to their canonical labels."""
+    hits = _KEYWORDS.find(narration_upper)
+
+    methods = [_METHOD_RANK[kw] for kw in hits if kw in _METHOD_RANK]
+    if methods and not result["payment_method"]:
+        result["payment_method"] = _METHODS[min(methods)]
+
+    banks = [_BANK_RANK[kw] for kw in hits if kw in _BANK_RANK]
+    if banks and not result["bank_peer"]:
+        result["bank_peer"] = _BANK_KEYWORDS[min(banks)]
+
+    merchant_hits = sorted(
+        _MERCHANT_RANK[kw] for kw in hits if kw in _MERCHANT_RANK
+    )
+    # Merged in table order, as the former scan over the table did.
+    for rank in merchant_hits:
+        details = _MERCHANT_RULES[rank]
+        if details.get("merchant") and not result["merchant"]:
+            result["merchant"] = details["merchant"]
+        if details.get("category") and details["category"] not in result["category"]:
+            result["category"].append(details["category"])
+        if details.get("payment_gateway") and not result["payment_gateway"]:
+            result["payment_gateway"] = details["payment_gateway"]
 
     if "REFUND" in narration_upper and "REFUND" not in result["remarks"]:
         result["remarks"].append("REFUND")
@@ -260,10 +257,6 @@ def analyze_narration_details(narration):
     if "CREDITED" in narration_upper and "CREDITED" not in result["remarks"]:
         result["remarks"].append("CREDITED")
 
-    possible_accounts = extract_possible_account_numbers(narration_upper)
-    if possible_accounts:
-        result["receiver_details"]["account"] = possible_accounts[0]
-
     result["category"] = list(
         dict.fromkeys(REGEX_TO_CANONICAL.get(c, c) for c in result["category"])
     )
@@ -0,0 +1,290 @@
+"""Per-bank narration grammars, chosen once per statement.
+
+analyze_narration_details() reads every narration the same way, whatever
+bank printed it: the UPI/VSI/IMPS layouts wherever they occur, then the
+free-text heuristics. Banks print their own layouts, though — HDFC's
+``UPI-<payee>-<vpa>-<ifsc>-<rrn>-<note>``, ICICI's ``UPI/<rrn>/<note>/<vpa>/…``
+— which the generic layouts misread or miss. A grammar maps the prefix a
+bank's rows start with (``UPI-``, ``MMT/``, ``TO TRANSFER-``) to the layout
+behind it, so each row is sent by one dict lookup to the one layout that
+applies. A row whose prefix the bank doesn't use, or that doesn't fit the
+layout after all, gets the generic reading, as every row of a statement
+from an unlisted bank does.
+
+Adding a bank is a GRAMMARS entry: its IFSC bank code, the names its
+statements give it, and its prefixes.
+"""
+
+import re
+
+from app.enrichers.merchant_rules import merchant_rules
+from app.enrichers.narration_cache import narration_cache
+from app.enrichers.narration_enricher import blank_details, merge_keywords
+
+# A row's prefix: its leading words up to the first "/" or "-".
+_PREFIX = re.compile(r"[A-Z ]{2,16}[/-]")
+_IFSC = re.compile(r"[A-Z]{4}0[A-Z0-9]{6}")
+
+# IFSC bank code → the enricher's name for the bank (a _BANK_KEYWORDS
+# entry). Layouts print the peer bank as an IFSC or its first four letters.
+_IFSC_BANKS = {
+    "SBIN": "SBI",
+    "HDFC": "HDFC",
+    "ICIC": "ICICI",
+    "UTIB": "AXIS",
+    "KKBK": "KOTAK",
+    "YESB": "YES BANK",
+    "PUNB": "PNB",
+    "UBIN": "UNION",
+    "CNRB": "CANARA",
+    "IDIB": "INDIAN BANK",
+    "INDB": "INDUSIND",
+    "FDRL": "FEDERAL BANK",
+    "RATN": "RBL BANK",
+    "BDBL": "BANDHAN BANK",
+    "IDFB": "IDFC FIRST BANK",
+    "BARB": "BOB",
+    "UCBA": "UCO BANK",
+    "CBIN": "CENTRAL BANK OF INDIA",
+    "IOBA": "IOB",
+    "BKID": "BOI",
+}
+
+
+def _bank_name(field: str | None) -> str | None:
+    """The bank a layout's bank field names: an IFSC or IFSC bank code
+    mapped to its name; None for anything else, which the keyword pass
+    then reads."""
+    if not field:
+        return None
+    if len(field) == 4 or _IFSC.fullmatch(field):
+        return _IFSC_BANKS.get(field[:4])
+    return None
+
+
+def _fields(rest: str, sep: str, count: int) -> list[str] | None:
+    """`rest` split on `sep` and stripped; None unless the first `count`
+    fields are all non-empty."""
+    fields = [field.strip() for field in rest.split(sep)]
+    if len(fields) < count or not all(fields[:count]):
+        return None
+    return fields
+
+
+def _details(
+    method: str,
+    *,
+    reference=None,
+    name=None,
+    account=None,
+    vpa=None,
+    bank=None,
+    remark=None,
+) -> dict:
+    result = blank_details()
+    result["payment_method"] = method
+    result["upi_id"] = vpa
+    result["transaction_reference"] = reference
+    result["receiver_details"].update(name=name, account=account, vpa=vpa)
+    result["bank_peer"] = _bank_name(bank)
+    if remark:
+        result["remarks"].append(remark)
+    return result
+
+
+def _is_vpa(field: str) -> bool:
+    return "@" in field and " " not in field
+
+
+# --- HDFC Bank ------------------------------------------------------------
+
+
+def _hdfc_upi(rest: str) -> dict | None:
+    """UPI-<payee>-<vpa>-<ifsc>-<rrn>-<note>"""
+    fields = _fields(rest, "-", 4)
+    if not fields or not _is_vpa(fields[1]) or not fields[3].isdecimal():
+        return None
+    payee, vpa, ifsc, rrn = fields[:4]
+    return _details(
+        "UPI", reference=rrn, name=payee, vpa=vpa, bank=ifsc, remark="-".join(fields[4:])
+    )
+
+
+def _hdfc_imps(rest: str) -> dict | None:
+    """IMPS-<ref>-<name>-<bank>-<account>-<note>"""
+    fields = _fields(rest, "-", 3)
+    if not fields or not fields[0].isdecimal():
+        return None
+    account = fields[3] if len(fields) > 3 and fields[3] else None
+    return _details(
+        "IMPS", reference=fields[0], name=fields[1], account=account, bank=fields[2],
+        remark="IMPS TRANSFER",
+    )
+
+
+def _hdfc_neft(rest: str) -> dict | None:
+    """NEFT CR-<ifsc>-<name>-<note>[-<utr>]"""
+    fields = _fields(rest, "-", 3)
+    if not fields or not _IFSC.fullmatch(fields[0]):
+        return None
+    reference = fields[-1] if len(fields) > 3 else None
+    note = "-".join(fields[2:-1] if reference else fields[2:])
+    return _details("NEFT", reference=reference, name=fields[1], bank=fields[0], remark=note)
+
+
+# --- ICICI Bank -----------------------------------------------------------
+
+
+def _icici_upi(rest: str) -> dict | None:
+    """UPI/<rrn>/<note>/<vpa>/<bank>/…"""
+    fields = _fields(rest, "/", 4)
+    if not fields or not fields[0].isdecimal() or not _is_vpa(fields[2]):
+        return None
+    rrn, note, vpa, bank = fields[:4]
+    return _details("UPI", reference=rrn, vpa=vpa, bank=bank, remark=note)
+
+
+def _icici_mmt(rest: str) -> dict | None:
+    """MMT/IMPS/<ref>/<note>/<name>/<bank>"""
+    fields = _fields(rest, "/", 5)
+    if not fields or fields[0] != "IMPS" or not fields[1].isdecimal():
+        return None
+    return _details(
+        "IMPS", reference=fields[1], name=fields[3], bank=fields[4], remark="IMPS TRANSFER"
+    )
+
+
+# --- State Bank of India --------------------------------------------------
+
+
+def _sbi_transfer(rest: str) -> dict | None:
+    """TO TRANSFER-UPI/DR/<rrn>/<name>/<bank>/<vpa>/<note> (BY … /CR/ for credits)"""
+    fields = _fields(rest, "/", 5)
+    if (
+        not fields
+        or fields[0] != "UPI"
+        or fields[1] not in ("DR", "CR")
+        or not fields[2].isdecimal()
+    ):
+        return None
+    vpa = fields[5] if len(fields) > 5 and _is_vpa(fields[5]) else None
+    return _details(
+        "UPI", reference=fields[2], name=fields[3], vpa=vpa, bank=fields[4],
+        remark="/".join(fields[6:]),
+    )
+
+
+# --- Kotak Mahindra Bank --------------------------------------------------
+
+
+def _kotak_upi(rest: str) -> dict | None:
+    """UPI/<name>/<rrn>/<note>"""
+    fields = _fields(rest, "/", 3)
+    if not fields or len(fields) != 3 or not fields[1].isdecimal():
+        return None
+    return _details("UPI", reference=fields[1], name=fields[0], remark=fields[2])
+
+
+# --- Axis Bank ------------------------------------------------------------
+
+
+def _axis_upi(rest: str) -> dict | None:
+    """UPI/P2A/<rrn>/<name>/<bank>/<note> (P2M for merchant payments)"""
+    fields = _fields(rest, "/", 4)
+    if not fields or fields[0] not in ("P2A", "P2M") or not fields[1].isdecimal():
+        return None
+    bank = fields[3] if len(fields) > 3 else None
+    return _details(
+        "UPI", reference=fields[1], name=fields[2], bank=bank, remark="/".join(fields[4:])
+    )
+
+
+def _axis_imps(rest: str) -> dict | None:
+    """IMPS/P2A/<ref>/<name>/<bank>"""
+    fields = _fields(rest, "/", 4)
+    if not fields or fields[0] != "P2A" or not fields[1].isdecimal():
+        return None
+    return _details(
+        "IMPS", reference=fields[1], name=fields[2], bank=fields[3], remark="IMPS TRANSFER"
+    )
+
+
+class NarrationGrammar:
+    """How one bank's statements print narrations.
+
+    ``names`` are what statement headers call the bank (matched as
+    substrings of the detected bank name), ``layouts`` map a row prefix to
+    a function reading the rest of the row, returning its details or None
+    when the row doesn't fit after all.
+    """
+
+    def __init__(self, code: str, names: tuple[str, ...], layouts: dict):
+        self.code = code
+        self.names = names
+        self.layouts = layouts
+
+    def details(self, narration: str) -> dict:
+        """analyze_narration_details(narration), read with this bank's
+        layout where its prefix has one, and completed from the merchant
+        catalogue. A layout reads the row's fields; the method, bank,
+        merchant and categories it leaves empty come from the keyword
+        tables, as on the generic path."""
+        details = None
+        if narration and self.layouts:
+            upper = narration.upper()
+            prefix = _PREFIX.match(upper)
+            layout = prefix and self.layouts.get(prefix.group())
+            if layout:
+                details = layout(upper[prefix.end() :])
+                if details is not None:
+                    details = merge_keywords(upper, details)
+        if details is None:
+            details = narration_cache.details(narration)
+        return merchant_rules.apply(narration, details)
+
+
+GENERIC = NarrationGrammar("", (), {})
+
+# Keyed by IFSC bank code (the first four letters of an IFSC).
+GRAMMARS = {
+    grammar.code: grammar
+    for grammar in (
+        NarrationGrammar(
+            "HDFC",
+            ("HDFC",),
+            {
+                "UPI-": _hdfc_upi,
+                "IMPS-": _hdfc_imps,
+                "NEFT CR-": _hdfc_neft,
+                "NEFT DR-": _hdfc_neft,
+            },
+        ),
+        NarrationGrammar("ICIC", ("ICICI",), {"UPI/": _icici_upi, "MMT/": _icici_mmt}),
+        NarrationGrammar(
+            "SBIN",
+            ("STATE BANK OF INDIA", "SBI"),
+            {"TO TRANSFER-": _sbi_transfer, "BY TRANSFER-": _sbi_transfer},
+        ),
+        NarrationGrammar("KKBK", ("KOTAK",), {"UPI/": _kotak_upi}),
+        NarrationGrammar("UTIB", ("AXIS",), {"UPI/": _axis_upi, "IMPS/": _axis_imps}),
+    )
+}
+
+
+def grammar_for(account_info: dict | None) -> NarrationGrammar:
+    """The grammar of the bank a statement's metadata names — by IFSC code,
+    else by bank name — or GENERIC.
+
+    The IFSC comes first: the bank name is found by scanning the leading
+    rows, narrations included, so a payee's bank can be taken for it.
+    """
+    account_info = account_info or {}
+    ifsc = (account_info.get("ifsc_code") or "").upper()
+    if ifsc:
+        return GRAMMARS.get(ifsc[:4], GENERIC)
+    bank_name = (account_info.get("bank_name") or "").upper()
+    if bank_name:
+        for grammar in GRAMMARS.values():
+            if any(name in bank_name for name in grammar.names):
+                return grammar
+    return GENERIC
@@ -0,0 +1,241 @@
+"""Narration lexer: the text scanned once into the tokens the extractors use.
+
+analyze_narration_details() used to run a dozen regular expressions over
+each narration — the UPI/VSI/IMPS layouts, the VPA, three reference and
+three receiver patterns, four account-number findalls — each searching the
+whole text on its own. Every one of those fields starts at a token of a
+kind a single scan can pick out: a digit run, an "@", a reference label or
+bank prefix opening a word, or TO/FROM/BY ahead of whitespace. The
+narration is scanned once for those, and each extractor below matches the
+rest of its former pattern in place at its own tokens, anchored, so the
+text is not searched again and each field keeps the exact semantics of the
+pattern it replaces. The slash layouts read the segments after a
+``PREFIX/`` and need no tokens at all — most rows are UPI and stop there.
+"""
+
+import re
+import string
+
+_TOKENS = re.compile(
+    r"(\d+)"
+    r"|(@)"
+    r"|((?:TO|FROM|BY)(?=\s))"
+    # Zero-width, so a label never hides a TO/FROM/BY overlapping its end.
+    r"|\b(?=RRN|REF|TRF|TXN|UTR|NFS|CMS|ID|YBL|AXI|ICI|KOT|PNB|PYTM|PTM|HDFC|YES|SBI)"
+)
+
+# The former patterns minus the part the tokens already locate, matched
+# anchored at a token.
+_REF_CODE = re.compile(
+    r"(?:RRN|REF|TRF|TXN|UTR|UTR NO|NFS|CMS|ID)\s*[:\.]?\s*([A-Z0-9]{10,25})\b"
+)
+_REF_BANK_CODE = re.compile(
+    r"(YBL|AXI|ICI|KOT|PNB|PYTM|PTM|HDFC|ICICI|YES|SBI)[a-zA-Z0-9]{6,25}\b"
+)
+_RECEIVER = re.compile(r"\s+([A-Z0-9\s.&,-_']{3,}(?:\s(?:A/C|ACC|AC|ACCOUNT|NO)\s*\d+)?)\b")
+_LABELLED_RECEIVER = re.compile(r"\s+([A-Z\s.&,-_']{3,})")
+_VPA_DOMAIN = re.compile(r"[a-z]{2,}", re.IGNORECASE)
+_GROUPED_NUMBER = re.compile(r"\d{4}[\s\-]?\d{4}[\s\-]?\d{4,12}\b")
+# Checked on the extracted receiver only.
+_ACCOUNT_LIKE = re.compile(r"\d{6,}")
+_NAME_LIKE = re.compile(r"[A-Z]{3,}")
+
+_REF_ACCOUNT_LABELS = ("UPI", "REF", "TXN")
+_TRANSFER_ACCOUNT_LABELS = ("NEFT", "RTGS", "IMPS")
+
+# Non-ASCII letters re.IGNORECASE matches against ASCII letters.
+_FOLDED = {"İ": "I", "ı": "I", "ſ": "S", "K": "K"}
+_ANY_CASE = frozenset(string.ascii_letters + "".join(_FOLDED))
+_VPA_LOCAL = _ANY_CASE | frozenset(string.digits + ".-_")
+
+
+class NarrationTokens:
+    """The tokens of one narration, in text order.
+
+    numbers are the (start, end) spans of the digit runs, ats the offsets of
+    each "@", labels the offsets where a reference label or bank prefix
+    opens a word, and receivers the offsets just past a TO, FROM or BY that
+    whitespace follows.
+    """
+
+    __slots__ = ("text", "numbers", "ats", "labels", "receivers")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.numbers, self.ats, self.labels, self.receivers = [], [], [], []
+        for match in _TOKENS.finditer(text):
+            kind = match.lastindex
+            if kind == 1:
+                self.numbers.append(match.span())
+            elif kind == 2:
+                self.ats.append(match.start())
+            elif kind == 3:
+                self.receivers.append(match.end())
+            else:
+                self.labels.append(match.start())
+
+    def standalone(self, start: int, end: int) -> bool:
+        """Whether text[start:end] has a word boundary on both sides."""
+        return not (_is_word(self.text, start - 1) or _is_word(self.text, end))
+
+
+def _is_word(text: str, i: int) -> bool:
+    return 0 <= i < len(text) and (text[i].isalnum() or text[i] == "_")
+
+
+def _fold(text: str) -> str:
+    """Text uppercased letter for letter, as re.IGNORECASE compares them."""
+    if text.isascii():
+        return text.upper()
+    return "".join(
+        _FOLDED.get(ch) or (up if len(up := ch.upper()) == 1 else ch) for ch in text
+    )
+
+
+# --- Slash layouts: UPI/…, VSI/…, IMPS/… ---------------------------------
+
+
+def _slash_fields(text: str, prefix: str, count: int) -> list[str] | None:
+    """The fields of the first ``PREFIX/f1/…/fcount/ID``: `count` non-empty
+    segments, then the ID up to the next whitespace or "/"."""
+    prefix += "/"
+    at = text.find(prefix)
+    while at != -1:
+        segments = text[at + len(prefix) :].split("/", count)
+        if len(segments) > count and all(segments[:count]):
+            last = segments[count]
+            if last and not last[0].isspace() and last[0] != "/":
+                return segments[:count] + [last.split("/", 1)[0].split(None, 1)[0]]
+        at = text.find(prefix, at + 1)
+    return None
+
+
+def upi_fields(text: str) -> list[str] | None:
+    """[upi_id, remark, bank, txn_id] of a ``UPI/…/…/…/ID`` narration."""
+    return _slash_fields(text, "UPI", 3)
+
+
+def vsi_fields(text: str) -> list[str] | None:
+    """[merchant, datetime, txn_id] of a ``VSI/…/…/ID`` narration."""
+    return _slash_fields(text, "VSI", 2)
+
+
+def imps_fields(text: str) -> list[str] | None:
+    """[reference, name, bank] of an ``IMPS/<10+ digits>/…/…`` narration."""
+    at = text.find("IMPS/")
+    while at != -1:
+        segments = text[at + 5 :].split("/", 3)[:3]
+        if len(segments) == 3 and len(segments[0]) >= 10 and segments[0].isdecimal() and all(segments):
+            return segments
+        at = text.find("IMPS/", at + 1)
+    return None
+
+
+# --- Free-text fields -----------------------------------------------------
+
+
+def find_vpa(tokens: NarrationTokens) -> str | None:
+    """First ``local@domain`` handle: the run of [a-z0-9.-_] before an "@"
+    and the 2+ letters after it."""
+    text = tokens.text
+    for at in tokens.ats:
+        domain = _VPA_DOMAIN.match(text, at + 1)
+        if domain:
+            start = at
+            while start and text[start - 1] in _VPA_LOCAL:
+                start -= 1
+            if start < at:
+                return text[start : domain.end()]
+    return None
+
+
+def find_reference(tokens: NarrationTokens) -> str | None:
+    """Transaction reference, by the first rule that finds one: a labelled
+    10-25 character code (``RRN: …``, ``UTR NO …``), a bank-prefixed code
+    (which yields the prefix alone), or a standalone 10+ digit number."""
+    text = tokens.text
+    for pattern in (_REF_CODE, _REF_BANK_CODE):
+        for start in tokens.labels:
+            match = pattern.match(text, start)
+            if match:
+                return match.group(1)
+    for start, end in tokens.numbers:
+        if end - start >= 10 and tokens.standalone(start, end):
+            return text[start:end]
+    return None
+
+
+def find_receiver(tokens: NarrationTokens) -> tuple[str, bool] | None:
+    """(receiver, is_account) after the first ``TO/FROM/BY``, else after
+    ``TRANSFER TO/PAYMENT TO``, else ``CR BY``. is_account is set for a
+    6+ digit receiver with no run of three capitals."""
+    text = tokens.text
+    for labels, pattern in (
+        (None, _RECEIVER),
+        (("TRANSFER TO", "PAYMENT TO"), _LABELLED_RECEIVER),
+        (("CR BY",), _LABELLED_RECEIVER),
+    ):
+        for start in tokens.receivers:
+            if labels is None or text.endswith(labels, 0, start):
+                match = pattern.match(text, start)
+                if match:
+                    receiver = match.group(1).strip()
+                    is_account = bool(
+                        _ACCOUNT_LIKE.search(receiver) and not _NAME_LIKE.search(receiver)
+                    )
+                    return receiver, is_account
+    return None
+
+
+def _labelled(text: str, start: int, labels, letters: bool) -> bool:
+    """Whether the digits at `start` follow one of `labels` (compared
+    case-insensitively) and any whitespace, "-" and ":" — and with
+    `letters`, then any letters."""
+    first = start
+    if letters:
+        while first and text[first - 1] in _ANY_CASE:
+            first -= 1
+        if any(label in _fold(text[first:start]) for label in labels):
+            return True
+    end = first
+    while end and (text[end - 1].isspace() or text[end - 1] in "-:"):
+        end -= 1
+    if letters and end == first:
+        # A label right before the letters would be part of them.
+        return False
+    return _fold(text[max(0, end - 4) : end]).endswith(labels)
+
+
+def account_numbers(tokens: NarrationTokens) -> list[str]:
+    """Account-like numbers, longest first: grouped 12-20 digit numbers,
+    standalone 8-20 digit runs, and 8-16 digits after UPI/REF/TXN or
+    NEFT/RTGS/IMPS labels."""
+    if not tokens.numbers:
+        return []
+    text = tokens.text
+    numbers = set()
+
+    last = 0
+    for start, end in tokens.numbers:
+        if start >= last and end - start >= 4 and not _is_word(text, start - 1):
+            match = _GROUPED_NUMBER.match(text, start)
+            if match:
+                numbers.add(match.group().replace(" ", "").replace("-", ""))
+                last = match.end()
+
+    long_runs = [(start, end) for start, end in tokens.numbers if end - start >= 8]
+    for start, end in long_runs:
+        if end - start <= 20 and tokens.standalone(start, end):
+            numbers.add(text[start:end])
+
+    # A label takes the first 16 digits of the run after it; a run has at
+    # most one label before it, so the runs are checked one by one.
+    for labels, letters in ((_REF_ACCOUNT_LABELS, False), (_TRANSFER_ACCOUNT_LABELS, True)):
+        numbers.update(
+            text[start : min(end, start + 16)]
+            for start, end in long_runs
+            if _labelled(text, start, labels, letters)
+        )
+
+    # Stable, so equal lengths keep the set's order, as they always have.
+    return sorted(numbers, key=len, reverse=True)
@@ -6,8 +6,10 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config.settings import settings
-from app.db.database import create_db_and_tables
-from app.routers import health, analyze, corrections, export, statements, summary, qa
+from app.db.database import create_db_and_tables, engine
+from app.enrichers.merchant_rules import merchant_rules
+from app.routers import health, analyze, corrections, export, statements, summary, qa, metrics
+from app.services.layout_profiles import layout_profiles
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +18,8 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     create_db_and_tables()
     logger.info("Database tables ready")
+    layout_profiles.attach(engine)
+    merchant_rules.start()
     logger.info("Bank Statement Analyzer v2 started on port 8000")
     try:
         async with httpx.AsyncClient(timeout=3.0) as client:
@@ -27,6 +31,7 @@ async def lifespan(app: FastAPI):
             settings.ollama_base_url,
         )
     yield
+    merchant_rules.stop()
     logger.info("Shutting down")
 
 
@@ -52,3 +57,4 @@ app.include_router(export.router)
 app.include_router(statements.router)
 app.include_router(summary.router)
 app.include_router(qa.router)
+app.include_router(metrics.router)
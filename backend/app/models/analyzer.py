@@ -4,24 +4,42 @@ import re
 
 import pandas as pd
 
-from collections import defaultdict
-
+from app.models.frame import as_frame
 from app.parsers.excel_parser import (
+    STREAM_CHUNK_ROWS,
     clean_column_name,
     deduplicate_transactions,
     detect_header_row,
+    find_header,
     find_column,
     process_excel_csv,
+    stream_excel_csv,
 )
+from app.parsers.ingest import frame_from_grid
 from app.parsers.pdf_parser import looks_like_header, process_pdf_transactions
 
 logger = logging.getLogger(__name__)
 
+_NAME_LIKE = re.compile(r"[A-Za-z]{2,}")
+
 
 class BankStatementAnalyzer:
 
-    def __init__(self, file_path):
+    def __init__(
+        self,
+        file_path,
+        encoding=None,
+        pdf_engine="tables",
+        layout_profiles=None,
+        page_cache=None,
+        budget=None,
+    ):
         self.file_path = file_path
+        self.encoding = encoding  # CSV only; None → sniffed from the file
+        self.pdf_engine = pdf_engine  # "tables" or "text"; see PDF_ENGINES
+        self.layout_profiles = layout_profiles  # LayoutProfileStore; None → no cache
+        self.page_cache = page_cache  # PageTableCache for PDF pages; None → no cache
+        self.budget = budget  # ParseBudget; None → no limits
 
     @staticmethod
     def _looks_like_header(row):
@@ -35,12 +53,17 @@ class BankStatementAnalyzer:
             logger.info("[DEDUP] Removed %d duplicate transaction(s)", dropped)
         return deduped
 
-    def _get_statement_range_from_df(self, df):
+    def _get_statement_range_from_df(self, df, date_format=None):
         date_col = find_column(
             ["date", "txn_date", "transaction_date", "value_date"], df.columns
         )
         if date_col:
             dates = pd.to_datetime(df[date_col], errors="coerce", dayfirst=True)
+            if date_format:
+                detected = pd.to_datetime(
+                    df[date_col].str.strip(), format=date_format, errors="coerce"
+                )
+                dates = detected.fillna(dates)
             valid_dates = dates.dropna()
             if not valid_dates.empty:
                 return {
@@ -50,8 +73,13 @@ class BankStatementAnalyzer:
         logger.debug("Could not determine statement date range.")
         return {}
 
-    def _extract_metadata_from_df(self, raw_df, max_lines=30):
+    def _extract_metadata_from_df(self, raw_df, df=None, date_format=None, max_lines=30):
         try:
+            # Rows from the table header down are transactions; an IFSC or
+            # bank named in a narration is the payee's, not the statement's.
+            header = find_header(raw_df)
+            if header.score > 0:
+                max_lines = min(max_lines, header.index)
             lines = (
                 raw_df.iloc[:max_lines].fillna("").astype(str).values.flatten().tolist()
             )
@@ -59,25 +87,14 @@ class BankStatementAnalyzer:
             metadata = self._extract_metadata_from_text(text_blob)
 
             try:
-                header_row_index = detect_header_row(raw_df)
-                if self.file_path.endswith(".csv"):
-                    skip_rows = list(range(header_row_index))
-                    df_for_dates = pd.read_csv(
-                        self.file_path,
-                        skiprows=skip_rows,
-                        header=0,
-                        dtype=str,
-                        on_bad_lines="skip",
-                    )
-                else:
-                    df_for_dates = pd.read_excel(
-                        self.file_path, header=header_row_index, dtype=str
-                    )
+                if df is None:
+                    df = frame_from_grid(raw_df, detect_header_row(raw_df))
+                df_for_dates = df.copy(deep=False)
                 df_for_dates.columns = [
                     clean_column_name(col) for col in df_for_dates.columns
                 ]
                 metadata["statement_period"] = self._get_statement_range_from_df(
-                    df_for_dates
+                    df_for_dates, date_format
                 )
             except Exception as e:
                 logger.warning(
@@ -126,8 +143,8 @@ class BankStatementAnalyzer:
                 r"BRANCH\s*[:\.,]\s*([A-Z][A-Za-z\s&.-]{2,40}?)(?=\s+(?:INDIA\b|IFSC|Nomination|\d{6,}|$))",
             ],
             "ifsc_code": [
-                r"\b([A-Z]{4}0[A-Z0-9]{6})\b",
                 r"(?:IFSC\s*Code|IFSC)\s*[:\.]?\s*([A-Z]{4}0[A-Z0-9]{6})\b",
+                r"\b([A-Z]{4}0[A-Z0-9]{6})\b",
             ],
             "phone": [
                 r"(?:tel|phone|mobile|mob|ph\.?)\s*[:\.]?\s*(\+?91[-\s]?[6-9]\d{9}|[6-9]\d{9})",
@@ -200,16 +217,52 @@ class BankStatementAnalyzer:
         return metadata
 
     def _process_excel_csv(self):
-        result = process_excel_csv(self.file_path, self._extract_metadata_from_df)
+        result = process_excel_csv(
+            self.file_path,
+            self._extract_metadata_from_df,
+            self.encoding,
+            self.layout_profiles,
+            self.budget,
+        )
         if result.get("result") is not None and "transactions" in result.get("result", {}):
             result["result"]["merchant_insights"] = TransactionPatternTrainer().analyze(
                 result["result"]["transactions"]
             )
         return result
 
+    def stream_transactions(self, chunk_size: int = STREAM_CHUNK_ROWS):
+        """Yield parse events chunk by chunk (see stream_excel_csv).
+
+        CSV and .xlsx only; merchant insights need every transaction at once
+        and are not produced in streaming mode.
+        """
+        file_extension = os.path.splitext(self.file_path)[1].lower()
+        if file_extension not in (".csv", ".xlsx"):
+            logger.warning("Streaming not supported for file type: %s", file_extension)
+            yield {
+                "event": "error",
+                "status_code": 400,
+                "message": "Streaming is only supported for CSV and XLSX statements",
+            }
+            return
+        yield from stream_excel_csv(
+            self.file_path,
+            self._extract_metadata_from_df,
+            self._get_statement_range_from_df,
+            chunk_size,
+            self.encoding,
+            self.layout_profiles,
+            self.budget,
+        )
+
     def _process_pdf_transactions(self):
         result = process_pdf_transactions(
-            self.file_path, self._extract_metadata_from_text
+            self.file_path,
+            self._extract_metadata_from_text,
+            engine=self.pdf_engine,
+            profiles=self.layout_profiles,
+            page_cache=self.page_cache,
+            budget=self.budget,
         )
         if result.get("result") is not None and "transactions" in result.get("result", {}):
             result["result"]["merchant_insights"] = TransactionPatternTrainer().analyze(
@@ -238,62 +291,64 @@ class TransactionPatternTrainer:
     def __init__(self):
         pass
 
-    def analyze(self, transactions: list) -> dict:
-        merchants = defaultdict(list)
-
-        for txn in transactions:
-            merchant = txn.get("merchant")
+    @staticmethod
+    def _merchant_keys(frame) -> list[str]:
+        """The merchant, else a receiver name with letters in it, else UNKNOWN."""
+        keys = []
+        for merchant, receiver_name in zip(
+            frame.column("merchant"), frame.receiver_names
+        ):
             if not merchant:
-                receiver_name = txn.get("receiver_details", {}).get("name") or ""
-                if receiver_name and re.search(r"[A-Za-z]{2,}", receiver_name):
+                receiver_name = receiver_name or ""
+                if receiver_name and _NAME_LIKE.search(receiver_name):
                     merchant = receiver_name.strip()
                 else:
                     merchant = "UNKNOWN"
-            merchants[merchant].append(txn)
+            keys.append(merchant)
+        return keys
 
-        insights = {}
-        for m, txns in merchants.items():
-            amounts = [
-                t.get("amount")
-                for t in txns
-                if isinstance(t.get("amount"), (int, float))
-            ]
-            dates = [
-                t.get("transaction_date") for t in txns if t.get("transaction_date")
-            ]
-
-            parsed_dates = []
-            for d in dates:
-                try:
-                    pd_dt = pd.to_datetime(d, errors="coerce")
-                    if pd.notna(pd_dt):
-                        parsed_dates.append(pd_dt)
-                except Exception:
-                    continue
-
-            count = len(txns)
-            avg = float(pd.Series(amounts).mean()) if amounts else None
-            median = float(pd.Series(amounts).median()) if amounts else None
-            std = (
-                float(pd.Series(amounts).std())
-                if amounts and len(amounts) > 1
-                else None
-            )
+    def analyze(self, transactions) -> dict:
+        """Per-merchant amount and date statistics, one groupby per column.
 
-            first = min(parsed_dates).strftime("%Y-%m-%d") if parsed_dates else None
-            last = max(parsed_dates).strftime("%Y-%m-%d") if parsed_dates else None
+        Takes a transaction list or a TransactionFrame; merchants come out in
+        order of first appearance.
+        """
+        frame = as_frame(transactions)
+        if not len(frame):
+            return {}
+
+        df = pd.DataFrame(
+            {
+                "merchant": self._merchant_keys(frame),
+                "amount": frame.amount,
+                "date": frame.parsed_dates.to_numpy(),
+            }
+        )
+        df["day"] = df["date"].dt.day
+        groups = df.groupby("merchant", sort=False)
+        amounts = groups["amount"].agg(["size", "count", "mean", "median", "std"])
+        dates = groups["date"].agg(["min", "max"])
+        day_counts = df.groupby(["merchant", "day"], sort=True).size()
+        repeated_days = day_counts[day_counts > 1].reset_index()
+        common_days = repeated_days.groupby("merchant", sort=False)["day"].agg(list)
+
+        def stat(value):
+            return round(float(value), 2) if pd.notna(value) else None
 
-            days = [p.day for p in parsed_dates]
-            common_days = sorted({d for d in days if days.count(d) > 1})
+        def day(value):
+            return value.strftime("%Y-%m-%d") if pd.notna(value) else None
 
+        insights = {}
+        for m, row in amounts.iterrows():
+            has_amounts = row["count"] > 0
             insights[m] = {
-                "count": count,
-                "avg_amount": round(avg, 2) if avg is not None else None,
-                "median_amount": round(median, 2) if median is not None else None,
-                "std_amount": round(std, 2) if std is not None else None,
-                "first_seen": first,
-                "last_seen": last,
-                "common_days": common_days,
+                "count": int(row["size"]),
+                "avg_amount": stat(row["mean"]) if has_amounts else None,
+                "median_amount": stat(row["median"]) if has_amounts else None,
+                "std_amount": stat(row["std"]) if row["count"] > 1 else None,
+                "first_seen": day(dates.at[m, "min"]),
+                "last_seen": day(dates.at[m, "max"]),
+                "common_days": [int(d) for d in common_days.get(m, [])],
             }
 
         return insights
@@ -0,0 +1,247 @@
+"""Columnar view of a transaction list for the stages that aggregate over it.
+
+Dedup, confidence scoring, TransactionPatternTrainer, generate_insights, the
+/summary router and get_monthly_summary used to walk the list of transaction
+dicts one at a time, each on its own. TransactionFrame pulls the fields they
+read into typed NumPy arrays once, so each stage becomes a few vectorized
+operations. Columns are built on first access, so a stage pays only for the
+fields it reads.
+
+It wraps whatever the caller holds: TransactionRecords or dicts (parser
+output), pydantic ``Transaction`` models (/summary) or ``TransactionDB`` rows
+(whose ``category`` is a JSON string). ``transactions`` keeps the original
+list, and to_dicts() is the adapter back to the API's dict list.
+"""
+
+import json
+from collections.abc import Mapping
+from functools import cached_property
+from operator import attrgetter
+
+import numpy as np
+import pandas as pd
+
+from app.models.record import TransactionRecord, as_dicts
+
+_CREDIT_TYPES = ("CREDIT", "CR")
+# Record fields read from another slot: lazy lists are None until written.
+_SLOTS = {"category": "_category", "remarks": "_remarks"}
+
+
+def _column_reader(transactions):
+    """column(key) for this kind of transaction (the first one decides)."""
+    first = transactions[0] if transactions else None
+    if isinstance(first, TransactionRecord):
+        # Straight slot reads; lazy lists are read without being created.
+        return lambda key: list(map(attrgetter(_SLOTS.get(key, key)), transactions))
+    if first is not None and not isinstance(first, Mapping):
+        return lambda key: [getattr(txn, key, None) for txn in transactions]
+    return lambda key: [txn.get(key) for txn in transactions]
+
+
+def _receiver(txn) -> tuple:
+    """(name, account, vpa) from a dict or a pydantic Transaction."""
+    if isinstance(txn, Mapping):
+        details = txn.get("receiver_details") or {}
+    else:
+        details = getattr(txn, "receiver_details", None) or {}
+    if not isinstance(details, Mapping):  # a pydantic ReceiverDetails
+        details = details.model_dump()
+    return details.get("name"), details.get("account"), details.get("vpa")
+
+
+class TransactionFrame:
+    """Typed columns over a list of transactions, one entry per transaction.
+
+    ``amount`` is float64 with NaN for a missing or non-numeric amount;
+    ``dates`` holds the raw date values and ``parsed_dates`` the same as
+    Timestamps (NaT when unparseable); ``is_credit`` is the CREDIT/CR test
+    every stage applies to ``transaction_type``. ``merchant_codes`` and
+    ``category_codes`` index into ``merchants`` / ``categories`` in order of
+    first appearance (-1: no merchant). Categories are a list per
+    transaction, so they are stored exploded: ``category_rows[i]`` is the
+    transaction that ``category_codes[i]`` belongs to.
+
+    ``column(key)`` returns the raw values of one field, read the fastest way
+    for the kind of transaction given.
+    """
+
+    def __init__(self, transactions):
+        self.transactions = transactions
+        self.column = _column_reader(transactions)
+
+    def __len__(self) -> int:
+        return len(self.transactions)
+
+    def to_dicts(self) -> list[dict]:
+        return as_dicts(self.transactions)
+
+    @cached_property
+    def amount(self) -> np.ndarray:
+        return np.array(
+            [
+                value if isinstance(value, (int, float)) else np.nan
+                for value in self.column("amount")
+            ],
+            dtype=np.float64,
+        )
+
+    @cached_property
+    def dates(self) -> np.ndarray:
+        return np.array(self.column("transaction_date"), dtype=object)
+
+    @cached_property
+    def parsed_dates(self) -> pd.Series:
+        # Each distinct value parsed on its own, exactly as the per-row
+        # pd.to_datetime(d) calls did; statements have few distinct dates.
+        parsed = {}
+        for value in set(self.dates.tolist()):
+            if value:
+                try:
+                    parsed[value] = pd.to_datetime(value, errors="coerce")
+                except Exception:
+                    parsed[value] = pd.NaT
+        return pd.Series(
+            [parsed.get(value, pd.NaT) if value else pd.NaT for value in self.dates],
+            dtype="datetime64[ns]",
+        )
+
+    @cached_property
+    def transaction_types(self) -> np.ndarray:
+        return np.array(self.column("transaction_type"), dtype=object)
+
+    @cached_property
+    def is_credit(self) -> np.ndarray:
+        return np.array(
+            [(value or "").upper() in _CREDIT_TYPES for value in self.transaction_types],
+            dtype=bool,
+        )
+
+    @cached_property
+    def narrations(self) -> np.ndarray:
+        return np.array(self.column("narration"), dtype=object)
+
+    @cached_property
+    def balance_missing(self) -> np.ndarray:
+        return np.array([value is None for value in self.column("balance")], dtype=bool)
+
+    @cached_property
+    def _receiver_fields(self) -> tuple[list, list, list]:
+        if self.transactions and isinstance(self.transactions[0], TransactionRecord):
+            return (
+                self.column("receiver_name"),
+                self.column("receiver_account"),
+                self.column("receiver_vpa"),
+            )
+        rows = [_receiver(txn) for txn in self.transactions]
+        return tuple([row[i] for row in rows] for i in range(3))
+
+    @property
+    def receiver_names(self) -> list:
+        return self._receiver_fields[0]
+
+    @cached_property
+    def has_receiver(self) -> np.ndarray:
+        """A receiver name, account or VPA is known."""
+        return np.array(
+            [bool(n or a or v) for n, a, v in zip(*self._receiver_fields)], dtype=bool
+        )
+
+    @cached_property
+    def _merchant_factors(self) -> tuple[np.ndarray, list]:
+        values = [value or None for value in self.column("merchant")]
+        codes, uniques = pd.factorize(pd.Series(values, dtype=object))
+        return codes, list(uniques)
+
+    @property
+    def merchant_codes(self) -> np.ndarray:
+        return self._merchant_factors[0]
+
+    @property
+    def merchants(self) -> list:
+        return self._merchant_factors[1]
+
+    @cached_property
+    def _category_factors(self) -> tuple[np.ndarray, np.ndarray, list]:
+        rows, labels = [], []
+        for i, value in enumerate(self.column("category")):
+            if isinstance(value, str):  # TransactionDB keeps the list as JSON
+                value = json.loads(value or "[]")
+            for category in value or ():
+                rows.append(i)
+                labels.append(category)
+        codes, uniques = pd.factorize(pd.Series(labels, dtype=object))
+        return np.array(rows, dtype=np.intp), codes, list(uniques)
+
+    @property
+    def category_rows(self) -> np.ndarray:
+        return self._category_factors[0]
+
+    @property
+    def category_codes(self) -> np.ndarray:
+        return self._category_factors[1]
+
+    @property
+    def categories(self) -> list:
+        return self._category_factors[2]
+
+    def category_totals(
+        self, mask: np.ndarray, amounts: np.ndarray, empty: str | None = None
+    ) -> dict:
+        """Sum of ``amounts`` per category over the rows where ``mask`` is set.
+
+        Each row counts once per category it carries; with ``empty`` set, a
+        row without categories counts under that label. Keys are in order of
+        first appearance among those rows; values are (total, count).
+        """
+        rows, codes, labels = self.category_rows, self.category_codes, self.categories
+        if empty is not None:
+            bare = np.ones(len(self), dtype=bool)
+            bare[rows] = False
+            if empty not in labels:
+                labels = labels + [empty]
+            bare_rows = np.flatnonzero(bare)
+            rows = np.concatenate([rows, bare_rows])
+            codes = np.concatenate(
+                [codes, np.full(len(bare_rows), labels.index(empty), dtype=codes.dtype)]
+            )
+            order = np.argsort(rows, kind="stable")
+            rows, codes = rows[order], codes[order]
+        return _group_totals(rows[mask[rows]], codes[mask[rows]], labels, amounts)
+
+    def merchant_totals(self, mask: np.ndarray, amounts: np.ndarray) -> dict:
+        """Like category_totals, per merchant; rows without one are left out."""
+        rows = np.flatnonzero(mask & (self.merchant_codes >= 0))
+        return _group_totals(rows, self.merchant_codes[rows], self.merchants, amounts)
+
+    def duplicated(self) -> np.ndarray:
+        """True for each repeat of an earlier (date, amount, narration[:100],
+        balance) — the dedup_key tuple, compared column-wise."""
+        key = pd.DataFrame(
+            {
+                "date": self.dates,
+                "amount": self.column("amount"),
+                "narration": [(n or "")[:100] for n in self.narrations],
+                "balance": self.column("balance"),
+            }
+        )
+        return key.duplicated().to_numpy()
+
+
+def _group_totals(rows, codes, labels, amounts) -> dict:
+    if not len(rows):
+        return {}
+    # bincount adds in row order, like the running totals it replaces.
+    totals = np.bincount(codes, weights=amounts[rows], minlength=len(labels))
+    counts = np.bincount(codes, minlength=len(labels))
+    return {
+        labels[code]: (float(totals[code]), int(counts[code]))
+        for code in pd.unique(codes)
+    }
+
+
+def as_frame(transactions) -> TransactionFrame:
+    """``transactions`` as a TransactionFrame; a frame passes through."""
+    if isinstance(transactions, TransactionFrame):
+        return transactions
+    return TransactionFrame(transactions)
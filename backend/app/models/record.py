@@ -0,0 +1,186 @@
+"""The parsed-transaction record passed between pipeline stages.
+
+A statement of 100k rows used to be 100k dicts of ~17 keys, each with a
+nested receiver_details dict and two lists. TransactionRecord keeps the same
+fields in __slots__: receiver details are flattened into three slots and
+empty category/remarks lists are not allocated until something writes to
+them. It reads and writes like the old dict (``txn["amount"]``,
+``txn.get("merchant")``, ``txn["category"] = [...]``), so every stage takes
+either; to_dict() turns it back into the JSON shape at the response edge.
+"""
+
+from collections.abc import MutableMapping
+
+# Dict keys in their former insertion order, which is the JSON order.
+FIELDS = (
+    "transaction_date",
+    "transaction_type",
+    "amount",
+    "narration",
+    "balance",
+    "account",
+    "payment_method",
+    "upi_id",
+    "transaction_reference",
+    "receiver_details",
+    "bank_peer",
+    "merchant",
+    "category",
+    "remarks",
+    "payment_gateway",
+)
+# Set by later stages; absent from the record (and its dict) until then.
+OPTIONAL_FIELDS = ("confidence_score", "llm_enriched")
+
+_KEYS = frozenset(FIELDS + OPTIONAL_FIELDS)
+# Slots holding a field that is None until first written.
+_STORED = {"category": "_category", "remarks": "_remarks"}
+
+
+class TransactionRecord(MutableMapping):
+    __slots__ = (
+        "transaction_date",
+        "transaction_type",
+        "amount",
+        "narration",
+        "balance",
+        "account",
+        "payment_method",
+        "upi_id",
+        "transaction_reference",
+        "receiver_name",
+        "receiver_account",
+        "receiver_vpa",
+        "bank_peer",
+        "merchant",
+        "_category",
+        "_remarks",
+        "payment_gateway",
+        "confidence_score",
+        "llm_enriched",
+    )
+
+    def __init__(
+        self,
+        transaction_date=None,
+        transaction_type=None,
+        amount=None,
+        narration=None,
+        balance=None,
+        account=None,
+        payment_method=None,
+        upi_id=None,
+        transaction_reference=None,
+        receiver_details=None,
+        bank_peer=None,
+        merchant=None,
+        category=None,
+        remarks=None,
+        payment_gateway=None,
+        **optional,
+    ):
+        self.transaction_date = transaction_date
+        self.transaction_type = transaction_type
+        self.amount = amount
+        self.narration = narration
+        self.balance = balance
+        self.account = account
+        self.payment_method = payment_method
+        self.upi_id = upi_id
+        self.transaction_reference = transaction_reference
+        self.receiver_details = receiver_details
+        self.bank_peer = bank_peer
+        self.merchant = merchant
+        self._category = category or None
+        self._remarks = remarks or None
+        self.payment_gateway = payment_gateway
+        for key, value in optional.items():
+            self[key] = value
+
+    @property
+    def receiver_details(self) -> dict:
+        """A fresh dict each time; assign a new one to change the record."""
+        return {
+            "name": self.receiver_name,
+            "account": self.receiver_account,
+            "vpa": self.receiver_vpa,
+        }
+
+    @receiver_details.setter
+    def receiver_details(self, details) -> None:
+        details = details or {}
+        self.receiver_name = details.get("name")
+        self.receiver_account = details.get("account")
+        self.receiver_vpa = details.get("vpa")
+
+    @property
+    def category(self) -> list:
+        if self._category is None:
+            self._category = []
+        return self._category
+
+    @category.setter
+    def category(self, value) -> None:
+        self._category = value or None
+
+    @property
+    def remarks(self) -> list:
+        if self._remarks is None:
+            self._remarks = []
+        return self._remarks
+
+    @remarks.setter
+    def remarks(self, value) -> None:
+        self._remarks = value or None
+
+    def __getitem__(self, key):
+        if key not in _KEYS:
+            raise KeyError(key)
+        try:
+            return getattr(self, key)
+        except AttributeError:  # optional field not set yet
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value) -> None:
+        if key not in _KEYS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __delitem__(self, key) -> None:
+        if key not in OPTIONAL_FIELDS:
+            raise KeyError(key)
+        try:
+            delattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __iter__(self):
+        yield from FIELDS
+        for key in OPTIONAL_FIELDS:
+            if hasattr(self, key):
+                yield key
+
+    def __len__(self) -> int:
+        return len(FIELDS) + sum(hasattr(self, key) for key in OPTIONAL_FIELDS)
+
+    def __repr__(self) -> str:
+        return f"TransactionRecord({self.to_dict()!r})"
+
+    def to_dict(self) -> dict:
+        """The transaction as the plain dict the API returns."""
+        txn = {key: getattr(self, _STORED.get(key, key)) for key in FIELDS}
+        # Untouched lists are created here, at the edge, not per parsed row.
+        txn["category"] = txn["category"] or []
+        txn["remarks"] = txn["remarks"] or []
+        for key in OPTIONAL_FIELDS:
+            if hasattr(self, key):
+                txn[key] = getattr(self, key)
+        return txn
+
+
+def as_dicts(transactions) -> list[dict]:
+    """Plain dicts for the response; dict inputs pass through unchanged."""
+    return [
+        txn.to_dict() if isinstance(txn, TransactionRecord) else txn
+        for txn in transactions
+    ]
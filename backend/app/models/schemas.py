@@ -64,11 +64,14 @@ class MerchantInsight(BaseModel):
 
 class AnalysisResult(BaseModel):
     account_info: AccountInfo
+    date_format: Optional[str] = None  # strptime format detected for the date column
     transactions: List[Transaction]
     confidence_summary: ConfidenceSummary
     merchant_insights: Dict[str, Any]
     insights: List[str] = []
     recurring_candidates: List[Dict[str, Any]] = []
+    truncated: bool = False  # parse budget ran out; transactions are partial
+    truncation_reason: Optional[str] = None  # max_pages / max_rows / max_seconds
 
 
 class AnalyzeResponse(BaseModel):
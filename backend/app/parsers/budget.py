@@ -0,0 +1,102 @@
+import logging
+import threading
+import time
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Nobody is waiting for the result any more; nginx's "client closed request".
+CANCELLED_RESPONSE = {
+    "success": 0,
+    "status_code": 499,
+    "message": "Parsing cancelled: the client disconnected",
+    "result": {},
+}
+
+
+class ParseBudget:
+    """Limits on one parse: pages, rows, wall-clock seconds and cancellation.
+
+    Parsers check it between pages or chunks, never mid-page, and stop
+    cleanly once it is spent: what was parsed so far is returned with
+    ``truncated`` set and ``reason`` saying which limit ran out. A limit of
+    None (or 0 from settings) is no limit. ``cancel`` is set from outside —
+    the analyze endpoint sets it when the client disconnects.
+    """
+
+    def __init__(
+        self,
+        max_pages: int | None = None,
+        max_rows: int | None = None,
+        max_seconds: float | None = None,
+        cancel: threading.Event | None = None,
+    ):
+        self.max_pages = max_pages or None
+        self.max_rows = max_rows or None
+        self.max_seconds = max_seconds or None
+        self.cancel = cancel or threading.Event()
+        self.started = time.monotonic()
+        self.reason: str | None = None
+
+    @classmethod
+    def from_settings(cls, cancel: threading.Event | None = None) -> "ParseBudget":
+        return cls(
+            settings.parse_max_pages,
+            settings.parse_max_rows,
+            settings.parse_max_seconds,
+            cancel,
+        )
+
+    @property
+    def truncated(self) -> bool:
+        return self.reason is not None
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel.is_set()
+
+    def stop(self, reason: str) -> None:
+        if self.reason is None:
+            self.reason = reason
+            logger.warning("[Budget] Parse stopped early: %s", reason)
+
+    def spent(self) -> bool:
+        """True once cancelled or out of time: parsing should stop now.
+
+        The page and row limits only trim what gets read; they never stop
+        the parse by themselves.
+        """
+        if self.cancel.is_set():
+            self.stop("cancelled")
+            return True
+        if (
+            self.max_seconds is not None
+            and time.monotonic() - self.started > self.max_seconds
+        ):
+            self.stop("max_seconds")
+            return True
+        return False
+
+    def page_limit(self, page_count: int) -> int:
+        """How many of ``page_count`` pages may be read."""
+        if self.max_pages is not None and page_count > self.max_pages:
+            self.stop("max_pages")
+            return self.max_pages
+        return page_count
+
+    def clip_rows(self, items: list) -> list:
+        """``items`` cut to the row limit."""
+        if self.max_rows is not None and len(items) > self.max_rows:
+            self.stop("max_rows")
+            return items[: self.max_rows]
+        return items
+
+    def rows_left(self, done: int) -> int | None:
+        if self.max_rows is None:
+            return None
+        return max(0, self.max_rows - done)
+
+    def flags(self) -> dict:
+        """The truncation fields every parse result carries."""
+        return {"truncated": self.truncated, "truncation_reason": self.reason}
@@ -1,30 +1,31 @@
-import csv as csv_mod
 import logging
 import re
+from collections import OrderedDict
 from datetime import datetime
+from itertools import chain, islice
 
+import numpy as np
 import pandas as pd
 
-from app.enrichers.narration_enricher import analyze_narration_details
-from app.scorers.confidence_scorer import calculate_confidence_score
+from app.enrichers.narration_grammars import GENERIC, NarrationGrammar, grammar_for
+from app.models.frame import TransactionFrame
+from app.models.record import TransactionRecord
+from app.parsers.budget import CANCELLED_RESPONSE, ParseBudget
+from app.parsers.headers import HeaderDetector, HeaderMatch, clean_column_name
+from app.parsers.ingest import (
+    frame_from_grid,
+    frame_from_rows,
+    grid_from_rows,
+    header_labels,
+    iter_statement_rows,
+    read_raw_grid,
+)
+from app.scorers.confidence_scorer import confidence_summary, score_frame
+from app.services.layout_profiles import header_signature, make_profile
 
 logger = logging.getLogger(__name__)
 
 
-def clean_column_name(col):
-    if not isinstance(col, str):
-        col = str(col)
-    return (
-        col.strip()
-        .lower()
-        .replace(" ", "_")
-        .replace(".", "")
-        .replace("/", "_")
-        .replace("\\", "_")
-        .replace("-", "_")
-    )
-
-
 def parse_amount(val):
     if (
         not val
@@ -72,6 +73,58 @@ def parse_amount(val):
         return None
 
 
+_AMOUNT_NULL_TOKENS = ["", "nan", "none", "n/a", "-"]
+_DATE_LIKE_RE = r"\d{4}[-/]\d{2}[-/]\d{2}"
+_CURRENCY_CHARS_RE = r"[,₹$€£]"
+_CR_DR_SUFFIX_RE = re.compile(r"\b(?:Cr\.?|Dr\.?)", re.IGNORECASE)
+_PLAIN_NUMBER_RE = r"[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?"
+
+
+def parse_amount_series(values: pd.Series) -> pd.Series:
+    """Vectorized parse_amount over a whole column.
+
+    Returns a float64 Series aligned with `values`; NaN marks every cell
+    parse_amount would turn into None. Same rules as the scalar version:
+    null tokens, date-like rejection, currency symbols, thousands separators,
+    Cr./Dr. suffixes and parenthesised negatives.
+    """
+    cells = values.to_numpy(dtype=object)
+    parsed = np.full(len(cells), np.nan)
+
+    is_str = np.fromiter((type(v) is str for v in cells), dtype=bool, count=len(cells))
+    for pos in np.flatnonzero(~is_str):
+        amount = parse_amount(cells[pos])
+        if amount is not None:
+            parsed[pos] = amount
+
+    # Statement columns repeat heavily (blank debit cells, fixed EMIs, ...),
+    # so each distinct string is parsed once.
+    codes, uniques = pd.factorize(cells[is_str])
+    parsed[is_str] = _parse_amount_strings(pd.Series(uniques, dtype=object))[codes]
+    return pd.Series(parsed, index=values.index)
+
+
+def _parse_amount_strings(text: pd.Series) -> np.ndarray:
+    parsed = np.full(len(text), np.nan)
+    text = text.str.strip()
+    text = text[~text.str.lower().isin(_AMOUNT_NULL_TOKENS)]
+    text = text[~text.str.match(_DATE_LIKE_RE)]
+    text = text.str.replace(_CURRENCY_CHARS_RE, "", regex=True)
+    text = text.str.replace(_CR_DR_SUFFIX_RE, "", regex=True).str.strip()
+
+    negative = text.str.startswith("(") & text.str.endswith(")")
+    text[negative] = "-" + text[negative].str[1:-1]
+
+    plain = text.str.fullmatch(_PLAIN_NUMBER_RE)
+    parsed[text.index[plain]] = text[plain].to_numpy(dtype=object).astype(float)
+    for pos, val_str in text[~plain].items():
+        try:
+            parsed[pos] = float(val_str)
+        except ValueError:
+            continue
+    return parsed
+
+
 def find_column(possible_keywords, columns):
     normalized_columns = [col.strip().lower() for col in columns]
 
@@ -90,40 +143,62 @@ def find_column(possible_keywords, columns):
     return None
 
 
+_TABULAR_HEADER_KEYWORDS = (
+    "date",
+    "transaction_date",
+    "value_date",
+    "description",
+    "narration",
+    "remark",
+    "particulars",
+    "credit",
+    "debit",
+    "balance",
+    "amount",
+    "txn_type",
+    "type",
+    "chq_no",
+    "cheque_number",
+    "withdrawals",
+    "deposits",
+)
+TABULAR_HEADER = HeaderDetector(_TABULAR_HEADER_KEYWORDS, min_hits=2, clean=True)
+
+
+def find_header(df_raw, max_rows_to_check=20) -> HeaderMatch:
+    """The header row of a raw CSV/Excel grid, scored, with its column roles.
+
+    The first of the leading rows with at least two header-keyword cells;
+    row 0 (score 0) when none qualifies. ``labels`` are the columns
+    normalize_columns will give the table under that header, so
+    ``roles`` equals resolve_columns on the normalized frame.
+    """
+    rows = df_raw.iloc[:max_rows_to_check].itertuples(index=False, name=None)
+    found = TABULAR_HEADER.find(rows)
+    if found is None:
+        logger.debug("No clear header row detected, defaulting to row 0.")
+        index, score = 0, 0.0
+    else:
+        index, score = found
+        logger.debug("Detected header row at index: %s (score %.2f)", index, score)
+    cells = df_raw.iloc[index].tolist() if index < len(df_raw) else []
+    return HeaderMatch(index, score, normalized_labels(cells), resolve_columns)
+
+
 def detect_header_row(df_raw, max_rows_to_check=20):
-    header_keywords = [
-        "date",
-        "transaction_date",
-        "value_date",
-        "description",
-        "narration",
-        "remark",
-        "particulars",
-        "credit",
-        "debit",
-        "balance",
-        "amount",
-        "txn_type",
-        "type",
-        "chq_no",
-        "cheque_number",
-        "withdrawals",
-        "deposits",
-    ]
+    return find_header(df_raw, max_rows_to_check).index
 
-    for i in range(min(max_rows_to_check, len(df_raw))):
-        row = df_raw.iloc[i]
-        match_count = 0
-        for cell in row:
-            if isinstance(cell, str):
-                cleaned_cell = clean_column_name(cell)
-                if any(keyword in cleaned_cell for keyword in header_keywords):
-                    match_count += 1
-        if match_count >= 2:
-            logger.debug("Detected header row at index: %s", i)
-            return i
-    logger.debug("No clear header row detected, defaulting to row 0.")
-    return 0
+
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+DATE_FORMATS = [
+    "%d-%m-%Y",
+    "%d/%m/%Y",
+    "%d-%b-%y",
+    "%d-%b-%Y",
+    "%d - %b - %Y",
+    "%Y-%m-%d",
+]
+_DATE_SAMPLE_SIZE = 50
 
 
 def normalize_date(date_input, row_index=None):
@@ -138,21 +213,12 @@ def normalize_date(date_input, row_index=None):
 
         if re.match(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}", date_input):
             try:
-                parsed = datetime.strptime(date_input, "%Y-%m-%d %H:%M:%S")
+                parsed = datetime.strptime(date_input, DATETIME_FORMAT)
                 return parsed.strftime("%Y-%m-%d")
             except ValueError:
                 pass
 
-        possible_formats = [
-            "%d-%m-%Y",
-            "%d/%m/%Y",
-            "%d-%b-%y",
-            "%d-%b-%Y",
-            "%d - %b - %Y",
-            "%Y-%m-%d",
-        ]
-
-        for fmt in possible_formats:
+        for fmt in DATE_FORMATS:
             try:
                 parsed = datetime.strptime(date_input, fmt)
                 logger.debug(
@@ -183,256 +249,456 @@ def normalize_date(date_input, row_index=None):
     return date_input
 
 
+def _strptime_ok(value: str, fmt: str) -> bool:
+    try:
+        datetime.strptime(value, fmt)
+        return True
+    except ValueError:
+        return False
+
+
+def infer_date_format(values) -> str | None:
+    """Pick the candidate format (DATETIME_FORMAT + DATE_FORMATS) that parses
+    the most of a small sample of the column. Ties go to the earlier format.
+    """
+    sample = []
+    for value in pd.unique(pd.Series(values, dtype=object).dropna()):
+        value = str(value).strip()
+        if value:
+            sample.append(value)
+        if len(sample) >= _DATE_SAMPLE_SIZE:
+            break
+
+    best_format, best_hits = None, 0
+    for fmt in [DATETIME_FORMAT, *DATE_FORMATS]:
+        hits = sum(_strptime_ok(value, fmt) for value in sample)
+        if hits > best_hits:
+            best_format, best_hits = fmt, hits
+    logger.debug(
+        "Inferred date format %s (%s/%s sampled)", best_format, best_hits, len(sample)
+    )
+    return best_format
+
+
+def normalize_date_series(values: pd.Series, date_format: str | None = None):
+    """Vectorized normalize_date over a date column.
+
+    The column is converted with a single `pd.to_datetime(format=...)` call
+    using `date_format` (inferred when not given); only values that fail that
+    conversion go through normalize_date one by one. Returns the normalized
+    Series (None for empty cells) and the format that was used.
+    """
+    if date_format is None:
+        date_format = infer_date_format(values)
+
+    present = values.notna()
+    stripped = values[present].astype(str).str.strip()
+    distinct = pd.Series(pd.unique(stripped[stripped != ""]), dtype=object)
+
+    lookup = {"": None}
+    if date_format and not distinct.empty:
+        converted = pd.to_datetime(distinct, format=date_format, errors="coerce")
+        hit = converted.notna()
+        lookup.update(zip(distinct[hit], converted[hit].dt.strftime("%Y-%m-%d")))
+        distinct = distinct[~hit]
+    for value in distinct:
+        lookup[value] = normalize_date(value)
+
+    normalized = [None] * len(values)
+    for pos, value in zip(np.flatnonzero(present.to_numpy()), stripped.tolist()):
+        normalized[pos] = lookup[value]
+    return pd.Series(normalized, index=values.index, dtype=object), date_format
+
+
+def dedup_key(txn: dict) -> tuple:
+    return (
+        txn.get("transaction_date"),
+        txn.get("amount"),
+        txn.get("narration", "")[:100],
+        txn.get("balance"),
+    )
+
+
 def deduplicate_transactions(transactions: list[dict]) -> list[dict]:
     """Remove exact duplicates by (date, amount, narration, balance). No logging — caller logs."""
-    seen: set[tuple] = set()
-    deduped: list[dict] = []
-    for txn in transactions:
-        key = (
-            txn.get("transaction_date"),
-            txn.get("amount"),
-            txn.get("narration", "")[:100],
-            txn.get("balance"),
-        )
-        if key not in seen:
-            seen.add(key)
-            deduped.append(txn)
-    return deduped
+    if not transactions:
+        return transactions
+    repeated = TransactionFrame(transactions).duplicated()
+    return [txn for txn, dup in zip(transactions, repeated.tolist()) if not dup]
+
+
+def score_transactions(transactions) -> list[float]:
+    """Set confidence_score on every transaction, scored as one frame."""
+    scores = score_frame(TransactionFrame(transactions))
+    for txn, score in zip(transactions, scores):
+        txn["confidence_score"] = score
+    return scores
+
+
+COLUMN_ROLES = (
+    "date",
+    "narration",
+    "credit",
+    "debit",
+    "amount",
+    "balance",
+    "account",
+    "dr_cr_type",
+)
+
+
+def _is_duplicated(df: pd.DataFrame, col) -> bool:
+    return col is not None and isinstance(df[col], pd.DataFrame)
+
+
+def _amount_column(df: pd.DataFrame, col) -> np.ndarray:
+    """Parse a whole amount column; NaN stands in for parse_amount's None."""
+    if col is None:
+        return np.full(len(df), np.nan)
+    return parse_amount_series(df[col]).to_numpy()
+
+
+def _text_column(df: pd.DataFrame, col, missing):
+    """str(cell).strip() for present cells, `missing` for null cells."""
+    if col is None:
+        return pd.Series([missing] * len(df), index=df.index, dtype=object)
+    values = df[col]
+    present = values.notna()
+    stripped = values[present].astype(str).str.strip()
+    out = pd.Series([missing] * len(df), index=df.index, dtype=object)
+    out[present] = stripped
+    return out
+
+
+def _resolve_types(credit, debit, general, dr_cr) -> tuple[np.ndarray, np.ndarray]:
+    is_credit = credit > 0
+    is_debit = ~is_credit & (debit > 0)
+    is_general = ~is_credit & ~is_debit & ~np.isnan(general)
+
+    amount = np.where(
+        is_credit,
+        credit,
+        np.where(is_debit, debit, np.where(is_general, np.abs(general), np.nan)),
+    )
 
+    signed = np.where(general >= 0, "CREDIT", "DEBIT")
+    if dr_cr is not None:
+        flag = dr_cr.str.lower().to_numpy(dtype=object)
+        has_cr = np.array(["cr" in v for v in flag], dtype=bool)
+        has_dr = np.array(["dr" in v for v in flag], dtype=bool)
+        general_type = np.where(has_cr, "CREDIT", np.where(has_dr, "DEBIT", signed))
+    else:
+        general_type = signed
 
-def read_csv_raw(file_path):
-    rows = []
-    for encoding in ("utf-8-sig", "utf-8", "latin-1", "cp1252"):
-        try:
-            with open(file_path, "r", encoding=encoding, newline="") as f:
-                rows = list(csv_mod.reader(f))
-            break
-        except (UnicodeDecodeError, Exception):
-            rows = []
-    if not rows:
-        return pd.DataFrame()
-    max_cols = max((len(r) for r in rows), default=0)
-    padded = [r + [""] * (max_cols - len(r)) for r in rows]
-    return pd.DataFrame(padded, dtype=str)
+    txn_type = np.where(
+        is_credit,
+        "CREDIT",
+        np.where(is_debit, "DEBIT", np.where(is_general, general_type, None)),
+    ).astype(object)
+    return amount, txn_type
 
 
-def process_excel_csv(file_path: str, extract_metadata_fn) -> dict:
-    try:
-        if file_path.endswith(".csv"):
-            raw_df = read_csv_raw(file_path)
-        else:
-            raw_df = pd.read_excel(file_path, header=None, dtype=str)
-
-        header_row_index = detect_header_row(raw_df)
-
-        if file_path.endswith(".csv"):
-            skip_rows = list(range(header_row_index))
-            df = pd.read_csv(
-                file_path,
-                skiprows=skip_rows,
-                header=0,
-                dtype=str,
-                on_bad_lines="skip",
-            )
-        else:
-            df = pd.read_excel(file_path, header=header_row_index, dtype=str)
+def _nullable(values: np.ndarray) -> list:
+    """Float array → list of Python floats, NaN back to None."""
+    return [None if np.isnan(v) else v for v in values.tolist()]
 
-        df = df.loc[:, ~df.columns.str.contains("^Unnamed", case=False, na=False)]
-        df.columns = [clean_column_name(col) for col in df.columns]
-        logger.debug("Excel/CSV Normalized Columns: %s", df.columns.tolist())
 
-        transaction_date_col = find_column(
-            ["date", "txn_date", "transaction_date", "value_date"], df.columns
-        )
-        credit_col = find_column(
-            [
-                "credit",
-                "cr",
-                "credit_amount",
-                "received",
-                "deposit",
-                "cr_amount",
-                "deposits",
-            ],
-            df.columns,
-        )
-        debit_col = find_column(
-            [
-                "debit",
-                "dr",
-                "debit_amount",
-                "withdraw",
-                "paid",
-                "dr_amount",
-                "withdrawals",
-            ],
-            df.columns,
-        )
-        amount_col = find_column(
-            ["amount", "transaction_amount", "value"],
-            [col for col in df.columns if "date" not in col.lower()],
-        )
-        narration_col = find_column(
-            ["narration", "description", "remark", "details", "transaction_details"],
-            df.columns,
-        )
-        balance_col = find_column(
-            ["balance", "closing_balance", "available_balance", "current_balance"],
-            df.columns,
+def detect_date_format(df: pd.DataFrame, roles: dict) -> str | None:
+    """Date format of the frame's date column, or None if it has no usable one."""
+    date_col = roles.get("date")
+    if date_col is None or _is_duplicated(df, date_col):
+        return None
+    return infer_date_format(df[date_col])
+
+
+def build_transactions(
+    df: pd.DataFrame,
+    roles: dict,
+    date_format: str | None = None,
+    grammar: NarrationGrammar = GENERIC,
+) -> list[TransactionRecord]:
+    """Turn a normalized statement frame into transaction records, column by column.
+
+    `roles` maps each name in COLUMN_ROLES to a column of `df` (or None).
+    Amounts, Dr/Cr type, balance and account are resolved for the whole frame
+    with Series operations; records are only created for rows that survive the
+    skip rules. Output is identical (compared as dicts) to the former per-row
+    `df.iterrows()` loop.
+    Dates go through normalize_date_series with `date_format` (inferred from
+    the column when None); narrations through `grammar`, the statement's
+    bank grammar (see grammar_for).
+    """
+    if df.empty:
+        return []
+
+    date_col = roles.get("date")
+    narration_col = roles.get("narration")
+    credit_col = roles.get("credit")
+    debit_col = roles.get("debit")
+    amount_col = roles.get("amount")
+    balance_col = roles.get("balance")
+    account_col = roles.get("account")
+    dr_cr_type_col = roles.get("dr_cr_type")
+
+    # A duplicated label makes row.get() return a Series, which the row loop
+    # could not parse — every row reaching that column was skipped.
+    for col in (credit_col, debit_col, amount_col):
+        if _is_duplicated(df, col):
+            logger.warning("Skipping %d rows: duplicated column '%s'", len(df), col)
+            return []
+
+    credit = _amount_column(df, credit_col)
+    debit = _amount_column(df, debit_col)
+    general = _amount_column(df, amount_col)
+
+    dr_cr = None
+    if dr_cr_type_col and not _is_duplicated(df, dr_cr_type_col):
+        dr_cr = _text_column(df, dr_cr_type_col, "")
+    amount, txn_type = _resolve_types(credit, debit, general, dr_cr)
+
+    keep = ~(np.isnan(credit) & np.isnan(debit) & np.isnan(general))
+    if dr_cr_type_col and _is_duplicated(df, dr_cr_type_col):
+        keep &= (credit > 0) | (debit > 0) | np.isnan(general)
+    if not keep.any():
+        return []
+
+    if _is_duplicated(df, narration_col):
+        logger.warning("Skipping rows: duplicated column '%s'", narration_col)
+        return []
+    narration = _text_column(df, narration_col, "").to_numpy(dtype=object)
+    keep &= (narration != "") | ~np.isnan(amount)
+    if not keep.any():
+        return []
+
+    if any(_is_duplicated(df, col) for col in (date_col, balance_col, account_col)):
+        logger.warning("Skipping rows: duplicated date/balance/account column")
+        return []
+
+    kept = df.loc[keep]
+    if date_col:
+        dates = normalize_date_series(kept[date_col], date_format)[0].tolist()
+    else:
+        dates = [None] * len(kept)
+    balances = _nullable(_amount_column(kept, balance_col))
+    accounts = (
+        _text_column(kept, account_col, None).tolist()
+        if account_col
+        else [None] * len(kept)
+    )
+
+    amounts = _nullable(amount[keep])
+    types = txn_type[keep].tolist()
+    narrations = narration[keep].tolist()
+
+    transactions = []
+    for i in range(len(kept)):
+        transactions.append(
+            TransactionRecord(
+                transaction_date=dates[i],
+                transaction_type=types[i],
+                amount=amounts[i],
+                narration=narrations[i],
+                balance=balances[i],
+                account=accounts[i],
+                **grammar.details(narrations[i]),
+            )
         )
-        account_col = find_column(["account", "acc_no", "account_number"], df.columns)
+    return transactions
 
-        reserved_non_amount_cols = {
-            transaction_date_col,
-            narration_col,
-            balance_col,
-            account_col,
-        }
-        if credit_col in reserved_non_amount_cols:
+
+def resolve_columns(columns) -> dict:
+    """Map the normalized CSV/Excel columns onto COLUMN_ROLES."""
+    transaction_date_col = find_column(
+        ["date", "txn_date", "transaction_date", "value_date"], columns
+    )
+    credit_col = find_column(
+        [
+            "credit",
+            "cr",
+            "credit_amount",
+            "received",
+            "deposit",
+            "cr_amount",
+            "deposits",
+        ],
+        columns,
+    )
+    debit_col = find_column(
+        [
+            "debit",
+            "dr",
+            "debit_amount",
+            "withdraw",
+            "paid",
+            "dr_amount",
+            "withdrawals",
+        ],
+        columns,
+    )
+    amount_col = find_column(
+        ["amount", "transaction_amount", "value"],
+        [col for col in columns if "date" not in col.lower()],
+    )
+    narration_col = find_column(
+        ["narration", "description", "remark", "details", "transaction_details"],
+        columns,
+    )
+    balance_col = find_column(
+        ["balance", "closing_balance", "available_balance", "current_balance"],
+        columns,
+    )
+    account_col = find_column(["account", "acc_no", "account_number"], columns)
+
+    reserved_non_amount_cols = {
+        transaction_date_col,
+        narration_col,
+        balance_col,
+        account_col,
+    }
+    if credit_col in reserved_non_amount_cols:
+        credit_col = None
+    if debit_col in reserved_non_amount_cols:
+        debit_col = None
+
+    dr_cr_type_col = None
+    for col in columns:
+        if "dr" in col and "cr" in col:
+            dr_cr_type_col = col
+            break
+    if dr_cr_type_col:
+        if credit_col == dr_cr_type_col:
             credit_col = None
-        if debit_col in reserved_non_amount_cols:
+        if debit_col == dr_cr_type_col:
             debit_col = None
 
-        dr_cr_type_col = None
-        for col in df.columns:
-            if "dr" in col and "cr" in col:
-                dr_cr_type_col = col
-                break
-        if dr_cr_type_col:
-            if credit_col == dr_cr_type_col:
-                credit_col = None
-            if debit_col == dr_cr_type_col:
-                debit_col = None
-
-        required_cols = [transaction_date_col, narration_col]
-        if not all(required_cols) or not (credit_col or debit_col or amount_col):
-            logger.warning(
-                "Missing critical columns in %s. Date: %s, Narration: %s, Amount: %s/%s/%s",
-                file_path,
-                transaction_date_col,
-                narration_col,
-                credit_col,
-                debit_col,
-                amount_col,
-            )
-            return {
-                "success": 0,
-                "status_code": 400,
-                "message": "Missing critical columns (Date, Narration, and at least one of Credit/Debit/Amount).",
-                "result": {},
-            }
+    return {
+        "date": transaction_date_col,
+        "narration": narration_col,
+        "credit": credit_col,
+        "debit": debit_col,
+        "amount": amount_col,
+        "balance": balance_col,
+        "account": account_col,
+        "dr_cr_type": dr_cr_type_col,
+    }
+
+
+_MISSING_COLUMNS_RESPONSE = {
+    "success": 0,
+    "status_code": 400,
+    "message": "Missing critical columns (Date, Narration, and at least one of Credit/Debit/Amount).",
+    "result": {},
+}
+
+
+def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.loc[:, ~df.columns.str.contains("^Unnamed", case=False, na=False)]
+    df.columns = [clean_column_name(col) for col in df.columns]
+    return df
+
+
+def normalized_labels(cells) -> list[str]:
+    """normalize_columns' column labels for a table under this raw header row."""
+    return [
+        clean_column_name(label)
+        for label in header_labels(cells)
+        if not label.lower().startswith("unnamed")
+    ]
 
-        transactions = []
 
-        for index, row in df.iterrows():
-            try:
-                amount = None
-                txn_type = None
+def _has_required_columns(roles: dict, file_path: str) -> bool:
+    if all([roles["date"], roles["narration"]]) and (
+        roles["credit"] or roles["debit"] or roles["amount"]
+    ):
+        return True
+    logger.warning(
+        "Missing critical columns in %s. Date: %s, Narration: %s, Amount: %s/%s/%s",
+        file_path,
+        roles["date"],
+        roles["narration"],
+        roles["credit"],
+        roles["debit"],
+        roles["amount"],
+    )
+    return False
 
-                credit = parse_amount(row.get(credit_col))
-                debit = parse_amount(row.get(debit_col))
-                general_amount = (
-                    parse_amount(row.get(amount_col)) if amount_col else None
-                )
 
-                if credit is not None and credit > 0:
-                    amount = credit
-                    txn_type = "CREDIT"
-                elif debit is not None and debit > 0:
-                    amount = debit
-                    txn_type = "DEBIT"
-                elif general_amount is not None:
-                    amount = abs(general_amount)
-                    if dr_cr_type_col:
-                        dr_cr_raw = row.get(dr_cr_type_col)
-                        dr_cr_val = (
-                            str(dr_cr_raw).strip().lower()
-                            if pd.notna(dr_cr_raw)
-                            else ""
-                        )
-                        txn_type = (
-                            "CREDIT"
-                            if "cr" in dr_cr_val
-                            else (
-                                "DEBIT"
-                                if "dr" in dr_cr_val
-                                else ("CREDIT" if general_amount >= 0 else "DEBIT")
-                            )
-                        )
-                    else:
-                        txn_type = "CREDIT" if general_amount >= 0 else "DEBIT"
-
-                if (
-                    amount is None
-                    and credit is None
-                    and debit is None
-                    and general_amount is None
-                ):
-                    logger.debug("Skipping row %s: No valid amount found.", index)
-                    continue
+def lookup_layout(profiles, source: str, columns) -> tuple[str, dict | None]:
+    """Header signature of ``columns`` and its cached layout profile, if any.
 
-                narration = (
-                    str(row.get(narration_col)).strip()
-                    if pd.notna(row.get(narration_col))
-                    else ""
-                )
+    ``profiles`` is a LayoutProfileStore or None (no caching).
+    """
+    signature = header_signature(source, columns)
+    profile = profiles.get(signature) if profiles is not None else None
+    return signature, profile
 
-                if not narration and amount is None:
-                    logger.debug(
-                        "Skipping row %s: No narration or amount present.", index
-                    )
-                    continue
 
-                transaction_date_str = (
-                    str(row.get(transaction_date_col)).strip()
-                    if pd.notna(row.get(transaction_date_col))
-                    else None
-                )
-                parsed_date = normalize_date(transaction_date_str, index)
+def remember_layout(profiles, signature: str, source: str, roles, date_format):
+    # Only complete layouts are worth replaying: without a date format the
+    # next file would skip detection and still come out worse.
+    if profiles is not None and date_format:
+        profiles.put(signature, source, make_profile(roles, date_format))
 
-                balance = parse_amount(row.get(balance_col))
-                account = (
-                    str(row.get(account_col)).strip()
-                    if account_col and pd.notna(row.get(account_col))
-                    else None
-                )
 
-                narration_details = analyze_narration_details(narration)
+STREAM_CHUNK_ROWS = 5000
 
-                txn_obj = {
-                    "transaction_date": parsed_date,
-                    "transaction_type": txn_type,
-                    "amount": amount,
-                    "narration": narration,
-                    "balance": balance,
-                    "account": account,
-                    **narration_details,
-                }
-                transactions.append(txn_obj)
-
-            except Exception as inner_err:
-                logger.warning(
-                    "Skipping row %s due to parsing error: %s",
-                    index,
-                    inner_err,
-                    exc_info=True,
-                )
 
-        meta_info = extract_metadata_fn(raw_df)
+def _build_within_budget(df, roles, date_format, meta_info, budget: ParseBudget) -> list:
+    """The deduplicated transactions of `df`, built STREAM_CHUNK_ROWS rows
+    at a time while `budget` lasts. No more rows are built than the row
+    limit leaves room for, so rows past it are never enriched."""
+    grammar = grammar_for(meta_info)
+    transactions: list = []
+    seen: set[tuple] = set()
+    start = 0
+    while start < len(df) and not budget.spent():
+        left = budget.rows_left(len(transactions))
+        if left == 0:
+            budget.stop("max_rows")
+            break
+        size = STREAM_CHUNK_ROWS if left is None else min(STREAM_CHUNK_ROWS, left)
+        chunk = df.iloc[start : start + size]
+        for txn in build_transactions(chunk, roles, date_format, grammar):
+            key = dedup_key(txn)
+            if key not in seen:
+                seen.add(key)
+                transactions.append(txn)
+        start += size
+    return transactions
+
+
+def process_excel_csv(
+    file_path: str,
+    extract_metadata_fn,
+    encoding: str | None = None,
+    profiles=None,
+    budget: ParseBudget | None = None,
+) -> dict:
+    budget = budget or ParseBudget()
+    try:
+        raw_df = read_raw_grid(file_path, encoding)
+        if budget.cancelled:
+            return CANCELLED_RESPONSE
+        header = find_header(raw_df)
+        df = normalize_columns(frame_from_grid(raw_df, header.index))
+        logger.debug("Excel/CSV Normalized Columns: %s", df.columns.tolist())
 
-        transactions = deduplicate_transactions(transactions)
+        signature, profile = lookup_layout(profiles, "tabular", df.columns)
+        if profile:
+            roles, date_format = profile["roles"], profile["date_format"]
+        else:
+            roles = header.roles
+            if not _has_required_columns(roles, file_path):
+                return _MISSING_COLUMNS_RESPONSE
+            date_format = detect_date_format(df, roles)
+            remember_layout(profiles, signature, "tabular", roles, date_format)
+        meta_info = extract_metadata_fn(raw_df, df, date_format)
 
-        for txn in transactions:
-            txn["confidence_score"] = calculate_confidence_score(txn)
+        transactions = _build_within_budget(df, roles, date_format, meta_info, budget)
+        if budget.cancelled:
+            return CANCELLED_RESPONSE
 
-        if transactions:
-            overall_confidence = round(
-                sum(txn["confidence_score"] for txn in transactions)
-                / len(transactions),
-                2,
-            )
-        else:
-            overall_confidence = 0.0
+        scores = score_transactions(transactions)
 
         return {
             "success": 1,
@@ -440,14 +706,10 @@ def process_excel_csv(file_path: str, extract_metadata_fn) -> dict:
             "message": f"{len(transactions)} transactions parsed from Excel/CSV",
             "result": {
                 "account_info": meta_info,
+                "date_format": date_format,
                 "transactions": transactions,
-                "confidence_summary": {
-                    "overall_score": overall_confidence,
-                    "total_transactions": len(transactions),
-                    "high_confidence_txns": sum(
-                        1 for txn in transactions if txn["confidence_score"] >= 0.85
-                    ),
-                },
+                "confidence_summary": confidence_summary(scores),
+                **budget.flags(),
             },
         }
 
@@ -464,3 +726,162 @@ def process_excel_csv(file_path: str, extract_metadata_fn) -> dict:
             "message": "Failed to analyze Excel/CSV bank statement",
             "result": {"error": str(e)},
         }
+
+
+# Distinct transaction dates whose dedup keys the stream keeps. Statements
+# are date-ordered, so a repeated row (a page or export boundary printed
+# twice) sits among rows of its own date; keys of dates this far back go.
+STREAM_DEDUP_DATES = 31
+# Rows buffered ahead of the table: covers find_header's scan window and
+# the metadata text block _extract_metadata_from_df reads.
+_STREAM_HEAD_ROWS = 30
+
+
+def _merge_period(period: dict, chunk_period: dict) -> dict:
+    if not chunk_period:
+        return period
+    if not period:
+        return dict(chunk_period)
+    return {
+        "from": min(period["from"], chunk_period["from"]),
+        "to": max(period["to"], chunk_period["to"]),
+    }
+
+
+def stream_excel_csv(
+    file_path: str,
+    extract_metadata_fn,
+    statement_range_fn,
+    chunk_size: int = STREAM_CHUNK_ROWS,
+    encoding: str | None = None,
+    profiles=None,
+    budget: ParseBudget | None = None,
+):
+    """Parse a CSV or .xlsx statement in bounded memory, one event per chunk.
+
+    Events are dicts keyed by ``event``:
+
+    - ``transactions``: the deduplicated, scored transactions of one chunk
+    - ``summary``: account info, date format, confidence summary and the
+      truncation flags, last
+    - ``error``: ``status_code`` and ``message``; ends the stream
+
+    ``budget`` is checked between chunks; once it is spent the summary
+    follows right away, flagged as truncated (cancellation ends the stream
+    with a 499 error instead).
+
+    Only ``_STREAM_HEAD_ROWS`` raw rows plus one chunk are held at a time.
+    Duplicates are dropped across chunk boundaries as
+    deduplicate_transactions does for a whole file, but only within the
+    last ``STREAM_DEDUP_DATES`` distinct transaction dates seen: the dedup
+    keys are kept per date, and the least recent date's are dropped. A
+    duplicate printed further from its original than that is kept.
+    """
+    budget = budget or ParseBudget()
+    try:
+        rows = iter_statement_rows(file_path, encoding)
+        head = list(islice(rows, _STREAM_HEAD_ROWS))
+        head_grid = grid_from_rows(head)
+        header = find_header(head_grid)
+        header_row_index = header.index
+
+        header_row = head[header_row_index] if header_row_index < len(head) else []
+        columns = header_labels(header_row)
+        signature, profile = lookup_layout(profiles, "tabular", header.labels)
+        if profile:
+            roles, date_format = profile["roles"], profile["date_format"]
+        else:
+            roles, date_format = header.roles, None
+            if not _has_required_columns(roles, file_path):
+                yield {
+                    "event": "error",
+                    "status_code": _MISSING_COLUMNS_RESPONSE["status_code"],
+                    "message": _MISSING_COLUMNS_RESPONSE["message"],
+                }
+                return
+
+        body = chain(head[header_row_index + 1 :], rows)
+        meta_info = None
+        seen: OrderedDict[str | None, set[tuple]] = OrderedDict()  # date → keys
+        score_total = 0.0
+        count = 0
+        high_confidence = 0
+
+        while True:
+            if meta_info is not None and budget.spent():
+                break
+            chunk = list(islice(body, chunk_size))
+            if not chunk and meta_info is not None:
+                break
+            df = normalize_columns(frame_from_rows(chunk, columns))
+
+            if meta_info is None:
+                if not profile:
+                    date_format = detect_date_format(df, roles)
+                    remember_layout(profiles, signature, "tabular", roles, date_format)
+                meta_info = extract_metadata_fn(head_grid, df, date_format)
+                grammar = grammar_for(meta_info)
+                period = meta_info.get("statement_period", {})
+            else:
+                period = _merge_period(period, statement_range_fn(df, date_format))
+
+            transactions = []
+            for txn in build_transactions(df, roles, date_format, grammar):
+                key = dedup_key(txn)
+                keys = seen.get(key[0])
+                if keys is not None and key in keys:
+                    continue
+                if budget.rows_left(count) == 0:
+                    budget.stop("max_rows")
+                    break
+                if keys is None:
+                    keys = seen[key[0]] = set()
+                    if len(seen) > STREAM_DEDUP_DATES:
+                        seen.popitem(last=False)
+                else:
+                    seen.move_to_end(key[0])
+                keys.add(key)
+                count += 1
+                transactions.append(txn)
+
+            for score in score_transactions(transactions):
+                score_total += score
+                high_confidence += score >= 0.85
+            if transactions:
+                yield {"event": "transactions", "transactions": transactions}
+            if len(chunk) < chunk_size or budget.truncated:
+                break
+
+        if budget.cancelled:
+            yield {
+                "event": "error",
+                "status_code": CANCELLED_RESPONSE["status_code"],
+                "message": CANCELLED_RESPONSE["message"],
+            }
+            return
+        if meta_info:
+            meta_info["statement_period"] = period
+        yield {
+            "event": "summary",
+            "account_info": meta_info,
+            "date_format": date_format,
+            "confidence_summary": {
+                "overall_score": round(score_total / count, 2) if count else 0.0,
+                "total_transactions": count,
+                "high_confidence_txns": high_confidence,
+            },
+            **budget.flags(),
+        }
+
+    except Exception as e:
+        logger.error(
+            "Failed to stream Excel/CSV bank statement: %s — %s",
+            file_path,
+            e,
+            exc_info=True,
+        )
+        yield {
+            "event": "error",
+            "status_code": 500,
+            "message": "Failed to analyze Excel/CSV bank statement",
+        }
@@ -0,0 +1,86 @@
+"""Header-row detection shared by the CSV/Excel and PDF parsers.
+
+Each keyword set is compiled once into a single alternation regex, so a
+cell is checked against every keyword in one scan instead of one
+``keyword in cell`` test per keyword.
+"""
+
+import re
+
+# clean_column_name's replacements as one translation table. Every
+# replacement is a single character whose result is never itself replaced,
+# so one translate() pass equals the former chain of str.replace calls.
+_CLEAN_TABLE = str.maketrans({" ": "_", ".": None, "/": "_", "\\": "_", "-": "_"})
+
+
+def clean_column_name(col):
+    if not isinstance(col, str):
+        col = str(col)
+    return col.strip().lower().translate(_CLEAN_TABLE)
+
+
+class HeaderDetector:
+    """Scores rows as header candidates against one precompiled keyword set.
+
+    ``clean=True`` looks at string cells only, normalized with
+    clean_column_name (the CSV/Excel rules); ``clean=False`` looks at every
+    non-empty cell, lower-cased (the PDF rules). A row is a header once
+    ``min_hits`` of its cells contain a keyword.
+    """
+
+    def __init__(self, keywords, min_hits: int = 1, clean: bool = True):
+        # Longest first, so overlapping keywords report the most specific.
+        alternation = "|".join(
+            re.escape(k) for k in sorted(keywords, key=len, reverse=True)
+        )
+        self.pattern = re.compile(alternation)
+        self.min_hits = min_hits
+        self.clean = clean
+
+    def _texts(self, cells):
+        if self.clean:
+            return [clean_column_name(c) for c in cells if isinstance(c, str)]
+        return [str(c).lower() for c in cells if c]
+
+    def score(self, cells) -> tuple[int, float]:
+        """Keyword-matching cells and their share of the cells looked at."""
+        texts = self._texts(cells)
+        search = self.pattern.search
+        hits = sum(1 for text in texts if search(text))
+        return hits, (hits / len(texts) if texts else 0.0)
+
+    def is_header(self, cells) -> bool:
+        if not cells:
+            return False
+        return self.score(cells)[0] >= self.min_hits
+
+    def find(self, rows) -> tuple[int, float] | None:
+        """Index and score of the first header row among ``rows``."""
+        for i, cells in enumerate(rows):
+            hits, score = self.score(cells)
+            if hits >= self.min_hits:
+                return i, score
+        return None
+
+
+class HeaderMatch:
+    """A detected header row: its index, the detector's confidence (share of
+    its cells that matched a header keyword) and the normalized column labels.
+
+    ``roles`` maps the labels onto COLUMN_ROLES with the parser's resolver.
+    It is computed on first access only, so a caller that already has the
+    roles (a cached layout profile) never pays for the mapping.
+    """
+
+    def __init__(self, index: int, score: float, labels: list[str], resolve):
+        self.index = index
+        self.score = score
+        self.labels = labels
+        self._resolve = resolve
+        self._roles = None
+
+    @property
+    def roles(self) -> dict:
+        if self._roles is None:
+            self._roles = self._resolve(self.labels)
+        return self._roles
@@ -0,0 +1,264 @@
+import codecs
+import csv as csv_mod
+import io
+import logging
+from collections.abc import Iterator
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+logger = logging.getLogger(__name__)
+
+# pandas.read_csv's default NA tokens. frame_from_grid applies them so a frame
+# sliced from the raw grid matches what read_csv(header=N) used to return.
+_CSV_NA_VALUES = frozenset(
+    {
+        "",
+        "#N/A",
+        "#N/A N/A",
+        "#NA",
+        "-1.#IND",
+        "-1.#QNAN",
+        "-NaN",
+        "-nan",
+        "1.#IND",
+        "1.#QNAN",
+        "<NA>",
+        "N/A",
+        "NA",
+        "NULL",
+        "NaN",
+        "None",
+        "n/a",
+        "nan",
+        "null",
+    }
+)
+
+
+_CSV_ENCODINGS = ("utf-8-sig", "utf-8", "latin-1", "cp1252")
+_CSV_DELIMITERS = ",;\t|"
+_SNIFF_BYTES = 64 * 1024
+_LATIN1_FALLBACK = "statement-latin1-fallback"
+
+
+def _latin1_fallback(err: UnicodeDecodeError):
+    return err.object[err.start : err.end].decode("latin-1"), err.end
+
+
+codecs.register_error(_LATIN1_FALLBACK, _latin1_fallback)
+
+
+def _sniff_encoding(prefix: bytes) -> str:
+    """Pick the first of _CSV_ENCODINGS that decodes the prefix.
+
+    The incremental decoder tolerates a multi-byte character cut off at the
+    end of the sample. latin-1 maps every byte, so cp1252 is never reached —
+    the same order the former try-each-encoding loop used.
+    """
+    for encoding in _CSV_ENCODINGS:
+        try:
+            codecs.getincrementaldecoder(encoding)().decode(prefix, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return _CSV_ENCODINGS[-1]
+
+
+def _sniff_delimiter(sample: str) -> str:
+    # Only complete lines: a cut-off last line skews the per-line counts.
+    sample = sample[: sample.rfind("\n") + 1] or sample
+    try:
+        return csv_mod.Sniffer().sniff(sample, delimiters=_CSV_DELIMITERS).delimiter
+    except csv_mod.Error:
+        return ","
+
+
+def sniff_csv(prefix: bytes, encoding: str | None = None) -> tuple[str, str]:
+    """Encoding and delimiter of a CSV, judged from the first bytes of the file.
+
+    ``encoding`` overrides the detected encoding.
+    """
+    encoding = encoding or _sniff_encoding(prefix)
+    sample = prefix.decode(encoding, errors="ignore")
+    return encoding, _sniff_delimiter(sample)
+
+
+def iter_csv_rows(file_path, encoding: str | None = None) -> Iterator[list[str]]:
+    """Yield CSV rows one at a time without holding the file in memory.
+
+    A stream cannot restart mid-file, so bytes that break the sniffed
+    encoding past the sample are decoded as latin-1 in place.
+    """
+    with open(file_path, "rb") as f:
+        prefix = f.read(_SNIFF_BYTES)
+    encoding, delimiter = sniff_csv(prefix, encoding)
+    with open(
+        file_path, "r", encoding=encoding, errors=_LATIN1_FALLBACK, newline=""
+    ) as f:
+        yield from csv_mod.reader(f, delimiter=delimiter)
+
+
+def grid_from_rows(rows: list[list[str]], fill="") -> pd.DataFrame:
+    """Pad ragged rows into an all-string grid."""
+    if not rows:
+        return pd.DataFrame()
+    max_cols = max((len(r) for r in rows), default=0)
+    padded = [r + [fill] * (max_cols - len(r)) for r in rows]
+    return pd.DataFrame(padded, dtype=str)
+
+
+def _xlsx_value(cell):
+    """Cell value as pandas' openpyxl reader returns it.
+
+    Empty → ``""``, errors → NaN, integral numbers → int (so ``5.0`` reads
+    as ``"5"`` once stringified).
+    """
+    value = cell.value
+    if value is None:
+        return ""
+    if cell.data_type == "e":
+        return np.nan
+    if cell.data_type == "n":
+        as_int = int(value)
+        return as_int if as_int == value else float(value)
+    return value
+
+
+def _xlsx_text(value):
+    if isinstance(value, float) and np.isnan(value):
+        return value
+    text = str(value)
+    return np.nan if text in _CSV_NA_VALUES else text
+
+
+def iter_xlsx_rows(file_path) -> Iterator[list]:
+    """Yield the first sheet's rows from a read-only openpyxl workbook.
+
+    Rows are read lazily from the open workbook, so a caller that only needs
+    the header window stops after a few rows. Cells match
+    pd.read_excel(header=None, dtype=str): strings, NaN for blanks and NA
+    tokens, trailing empty cells trimmed. Trailing empty rows are left to
+    the caller.
+    """
+    wb = load_workbook(file_path, read_only=True, data_only=True, keep_links=False)
+    try:
+        sheet = wb.worksheets[0]
+        # The stored dimensions can be stale; pandas resets them too.
+        sheet.reset_dimensions()
+        for row in sheet.rows:
+            values = [_xlsx_value(cell) for cell in row]
+            while values and values[-1] == "":
+                values.pop()
+            yield [_xlsx_text(v) for v in values]
+    finally:
+        wb.close()
+
+
+def read_xlsx_raw(file_path) -> pd.DataFrame:
+    rows = list(iter_xlsx_rows(file_path))
+    while rows and not rows[-1]:
+        rows.pop()
+    return grid_from_rows(rows, fill=np.nan)
+
+
+def _decode(data: bytes, encoding: str, forced: bool) -> str:
+    if forced:
+        return data.decode(encoding, errors="replace")
+    candidates = _CSV_ENCODINGS[_CSV_ENCODINGS.index(encoding) :]
+    for candidate in candidates:
+        try:
+            return data.decode(candidate)
+        except UnicodeDecodeError:
+            logger.debug("CSV body is not valid %s, trying the next encoding", candidate)
+    return data.decode(_CSV_ENCODINGS[-1], errors="replace")
+
+
+def read_csv_raw(file_path, encoding: str | None = None):
+    """Read a CSV once and decode it with the sniffed (or given) encoding.
+
+    If the body breaks an encoding the sample passed, the next candidate is
+    tried on the bytes already in memory rather than by re-reading the file.
+    """
+    with open(file_path, "rb") as f:
+        data = f.read()
+    sniffed, delimiter = sniff_csv(data[:_SNIFF_BYTES], encoding)
+    text = _decode(data, sniffed, forced=encoding is not None)
+    rows = list(csv_mod.reader(io.StringIO(text, newline=""), delimiter=delimiter))
+    return grid_from_rows(rows)
+
+
+def read_raw_grid(file_path: str, encoding: str | None = None) -> pd.DataFrame:
+    """Decode a CSV/Excel statement once into an all-string grid with no header.
+
+    Every later stage (header detection, transaction rows, metadata) works on
+    slices of this grid instead of going back to the file. ``encoding`` only
+    applies to CSV.
+    """
+    if file_path.endswith(".csv"):
+        return read_csv_raw(file_path, encoding)
+    if file_path.endswith(".xlsx"):
+        return read_xlsx_raw(file_path)
+    return pd.read_excel(file_path, header=None, dtype=str)
+
+
+def iter_statement_rows(file_path: str, encoding: str | None = None) -> Iterator[list]:
+    """Raw rows of a CSV or .xlsx statement, one at a time."""
+    if file_path.endswith(".xlsx"):
+        return iter_xlsx_rows(file_path)
+    return iter_csv_rows(file_path, encoding)
+
+
+def header_labels(cells) -> list[str]:
+    """Turn a raw header row into column labels the way pandas' readers do."""
+    labels = []
+    seen: dict[str, int] = {}
+    for i, cell in enumerate(cells):
+        label = "" if pd.isna(cell) else str(cell)
+        if label == "":
+            label = f"Unnamed: {i}"
+        base = label
+        while label in seen:
+            seen[base] += 1
+            label = f"{base}.{seen[base]}"
+        seen[label] = 0
+        labels.append(label)
+    return labels
+
+
+def _table_body(body: pd.DataFrame, columns: list[str]) -> pd.DataFrame:
+    blank = body.isna() | (body == "")
+    body = body.loc[~blank.all(axis=1)]
+    body = body.mask(body.isin(_CSV_NA_VALUES))
+
+    df = body.copy()
+    df.columns = columns
+    df.reset_index(drop=True, inplace=True)
+    return df
+
+
+def frame_from_grid(raw_df: pd.DataFrame, header_row_index: int) -> pd.DataFrame:
+    """Slice the transaction table out of a raw grid.
+
+    Equivalent to re-reading the file with ``header=header_row_index``: the
+    header row becomes the column labels (blank → ``Unnamed: N``, duplicates
+    mangled to ``name.1``), fully blank rows are dropped and pandas' default
+    NA tokens become NaN.
+    """
+    if raw_df.empty or header_row_index >= len(raw_df):
+        return pd.DataFrame(columns=pd.Index([], dtype=object))
+
+    columns = header_labels(raw_df.iloc[header_row_index].tolist())
+    return _table_body(raw_df.iloc[header_row_index + 1 :], columns)
+
+
+def frame_from_rows(rows: list[list[str]], columns: list[str]) -> pd.DataFrame:
+    """Build a table chunk from raw rows under already-known column labels.
+
+    Rows are padded or cut to the header width; cells past the header would
+    only have landed in dropped ``Unnamed`` columns.
+    """
+    width = len(columns)
+    fitted = [(r + [""] * (width - len(r)))[:width] for r in rows]
+    return _table_body(pd.DataFrame(fitted, columns=range(width), dtype=str), columns)
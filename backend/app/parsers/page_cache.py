@@ -0,0 +1,149 @@
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+
+import pdfplumber
+from pdfminer.pdftypes import PDFObjRef, PDFStream
+from pdfminer.psparser import PSKeyword, PSLiteral
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever page extraction changes what it returns for the same page.
+_CACHE_VERSION = 1
+_MAX_DEPTH = 24
+# Sweeps trim to this share of the limit so every put doesn't trigger one.
+_EVICT_TO = 0.9
+
+
+def _feed(h, obj, seen: dict, depth: int = 0) -> None:
+    """Hash a PDF object tree: streams by decoded bytes, refs once each."""
+    if depth > _MAX_DEPTH:
+        return
+    if isinstance(obj, PDFObjRef):
+        if obj.objid in seen:
+            h.update(b"R%d;" % seen[obj.objid])
+            return
+        seen[obj.objid] = len(seen)
+        obj = obj.resolve()
+    if isinstance(obj, PDFStream):
+        h.update(b"S")
+        _feed(h, obj.attrs, seen, depth + 1)
+        h.update(obj.get_data())
+    elif isinstance(obj, dict):
+        h.update(b"D")
+        for key in sorted(obj):
+            if key != "Parent":  # back to the page tree: every other page
+                h.update(str(key).encode() + b"=")
+                _feed(h, obj[key], seen, depth + 1)
+        h.update(b";")
+    elif isinstance(obj, list):
+        h.update(b"L")
+        for item in obj:
+            _feed(h, item, seen, depth + 1)
+        h.update(b";")
+    elif isinstance(obj, (PSLiteral, PSKeyword)):
+        h.update(b"N" + str(obj.name).encode() + b";")
+    elif isinstance(obj, bytes):
+        h.update(b"B%d:" % len(obj) + obj)
+    else:
+        h.update(repr(obj).encode() + b";")
+
+
+def page_digest(page) -> str:
+    """SHA-256 over everything that shapes a page's extracted tables.
+
+    Content streams, fonts (widths, ToUnicode), form XObjects and the page
+    boxes — the page dictionary minus its link back to the page tree. Two
+    byte-identical pages in different files hash the same.
+    """
+    h = hashlib.sha256()
+    _feed(h, page.page_obj.attrs, {})
+    return h.hexdigest()
+
+
+class PageTableCache:
+    """Extracted tables per page, in files named by key under ``directory``.
+
+    Keyed by page_digest plus the engine and the layout/region carried in
+    from the previous page, so a hit returns exactly what extraction would
+    have. Least-recently-used files (by mtime, touched on every hit) are
+    evicted once the directory passes ``max_bytes``. Holds only a path and
+    counters, so it pickles into PDF pool workers; each process tracks its
+    own running size, and every sweep re-measures the directory.
+    """
+
+    def __init__(self, directory, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._size: int | None = None
+
+    def key(self, page, engine: str, layout: dict | None) -> str:
+        carried = json.dumps(layout, sort_keys=True)
+        tag = f"{_CACHE_VERSION}:{pdfplumber.__version__}:{engine}:{carried}:"
+        return hashlib.sha256(tag.encode() + page_digest(page).encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> tuple[list, dict | None] | None:
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return entry["tables"], entry["layout"]
+
+    def put(self, key: str, tables: list, layout: dict | None) -> None:
+        data = json.dumps({"tables": tables, "layout": layout}).encode()
+        path = self._path(key)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp.write_bytes(data)
+            os.replace(tmp, path)  # readers never see a half-written entry
+        except OSError as e:
+            logger.warning("[PDF] Page cache write failed: %s", e)
+            return
+        if self._size is None:
+            self._size = self._measure()[0]
+        else:
+            self._size += len(data)
+        if self._size > self.max_bytes:
+            self._evict()
+
+    def _measure(self) -> tuple[int, list]:
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(".json"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+        return total, entries
+
+    def _evict(self) -> None:
+        total, entries = self._measure()
+        target = self.max_bytes * _EVICT_TO
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue  # another process got there first
+            total -= size
+        self._size = total
+
+
+page_cache = (
+    PageTableCache(settings.pdf_page_cache_dir, settings.pdf_page_cache_mb * 1024 * 1024)
+    if settings.pdf_page_cache_mb > 0
+    else None
+)
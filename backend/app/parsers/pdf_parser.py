@@ -1,258 +1,858 @@
+import bisect
 import logging
+import math
+import multiprocessing
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 import pandas as pd
 import pdfplumber
+import pypdfium2 as pdfium
+import pypdfium2.raw as pdfium_c
 
-from app.enrichers.narration_enricher import analyze_narration_details
+from app.config.settings import settings
+from app.enrichers.narration_grammars import grammar_for
+from app.parsers.budget import CANCELLED_RESPONSE, ParseBudget
 from app.parsers.excel_parser import (
-    clean_column_name,
+    build_transactions,
     deduplicate_transactions,
+    detect_date_format,
     find_column,
-    normalize_date,
+    lookup_layout,
     parse_amount,
+    remember_layout,
+    score_transactions,
 )
-from app.scorers.confidence_scorer import calculate_confidence_score
+from app.parsers.headers import HeaderDetector, clean_column_name
+from app.parsers.page_cache import PageTableCache
+from app.scorers.confidence_scorer import confidence_summary
+from app.services.layout_profiles import make_profile
 
 logger = logging.getLogger(__name__)
 
 
+_PDF_HEADER_KEYWORDS = (
+    "date",
+    "narration",
+    "description",
+    "debit",
+    "credit",
+    "amount",
+    "balance",
+    "particulars",
+    "withdrawal",
+    "deposit",
+    "txn",
+    "transaction",
+    "ref",
+    "details",
+    "chq",
+)
+PDF_HEADER = HeaderDetector(_PDF_HEADER_KEYWORDS, min_hits=1, clean=False)
+
+
 def looks_like_header(row) -> bool:
-    if not row:
-        return False
-    header_keywords = {
-        "date",
-        "narration",
-        "description",
-        "debit",
-        "credit",
-        "amount",
-        "balance",
-        "particulars",
-        "withdrawal",
-        "deposit",
-        "txn",
-        "transaction",
-        "ref",
-        "details",
-        "chq",
+    return PDF_HEADER.is_header(row)
+
+
+def resolve_pdf_columns(columns) -> dict:
+    """Map a PDF table's normalized columns onto COLUMN_ROLES."""
+    return {
+        "date": find_column(
+            ["date", "txn_date", "transaction_date", "value_date"], columns
+        ),
+        "narration": find_column(
+            [
+                "narration",
+                "description",
+                "details",
+                "remark",
+                "particulars",
+                "transaction_details",
+            ],
+            columns,
+        ),
+        "credit": find_column(
+            [
+                "credit",
+                "cr",
+                "credit_amount",
+                "received",
+                "deposit",
+                "cr_amount",
+                "deposits",
+            ],
+            columns,
+        ),
+        "debit": find_column(
+            [
+                "debit",
+                "dr",
+                "debit_amount",
+                "withdraw",
+                "paid",
+                "dr_amount",
+                "withdrawals",
+            ],
+            columns,
+        ),
+        "amount": find_column(["amount", "transaction_amount", "value"], columns),
+        "balance": find_column(
+            ["balance", "closing_balance", "available_balance", "current_balance"],
+            columns,
+        ),
+        "account": find_column(["account", "acc_no", "account_number"], columns),
+        "dr_cr_type": None,
     }
-    row_text = " ".join(str(cell).lower() for cell in row if cell)
-    return any(kw in row_text for kw in header_keywords)
 
 
-def process_pdf_transactions(file_path: str, extract_metadata_fn) -> dict:
-    try:
-        transactions = []
-        all_text = ""
-        tables_df_list = []
-        last_known_headers = None
+PDF_ENGINES = ("tables", "text")
 
-        with pdfplumber.open(file_path) as pdf:
-            for page_num, page in enumerate(pdf.pages):
-                text = page.extract_text(x_tolerance=1) or ""
-                all_text += text + "\n"
+# Text-layout engine. Words whose tops differ by less than this share a line.
+_LINE_TOLERANCE = 3
+# Header words further apart than this fraction of the line height start a
+# new header cell ("Value Date" stays one cell, "Date   Narration" is two).
+_HEADER_GAP_RATIO = 0.6
+# A line starting further than this many line heights below the previous one
+# is never merged into it as a wrapped narration.
+_WRAP_GAP_RATIO = 1.0
+# Share of rows that must carry a date and an amount for a page to pass.
+_LAYOUT_MIN_ROW_SHARE = 0.5
 
-                tables = page.extract_tables()
-                for table_idx, table in enumerate(tables):
-                    if not table or len(table) < 2:
-                        continue
-                    try:
-                        if looks_like_header(table[0]):
-                            headers = table[0]
-                            rows = table[1:]
-                            last_known_headers = headers
-                        elif last_known_headers is not None:
-                            logger.debug(
-                                "[PDF] Continuation table detected on page %s — reusing header from previous page",
-                                page_num + 1,
-                            )
-                            headers = last_known_headers
-                            rows = table
-                        else:
-                            logger.warning(
-                                "[PDF] First PDF table on page %s has no recognizable header — skipping",
-                                page_num + 1,
-                            )
-                            continue
-
-                        df = pd.DataFrame(rows, columns=headers)
-                        df.columns = [clean_column_name(col) for col in df.columns]
-                        tables_df_list.append(df)
-                        logger.debug(
-                            "Page %s, Table %s extracted with columns: %s",
-                            page_num + 1,
-                            table_idx + 1,
-                            df.columns.tolist(),
-                        )
-                    except Exception as df_create_err:
-                        logger.warning(
-                            "Could not create DataFrame from PDF table on page %s, table %s: %s",
-                            page_num + 1,
-                            table_idx + 1,
-                            df_create_err,
-                        )
 
-        if not tables_df_list:
-            logger.warning("No tables found or extracted from PDF: %s", file_path)
-            meta_info = extract_metadata_fn(all_text)
-            return {
-                "success": 0,
-                "status_code": 400,
-                "message": "No structured transaction tables could be extracted from the PDF.",
-                "result": {"account_info": meta_info, "transactions": []},
+def _page_lines(page) -> list[list[dict]]:
+    words = sorted(
+        page.extract_words(x_tolerance=1, y_tolerance=_LINE_TOLERANCE),
+        key=lambda w: (w["top"], w["x0"]),
+    )
+    lines: list[list[dict]] = []
+    for word in words:
+        if lines and word["top"] - lines[-1][0]["top"] <= _LINE_TOLERANCE:
+            lines[-1].append(word)
+        else:
+            lines.append([word])
+    return [sorted(line, key=lambda w: w["x0"]) for line in lines]
+
+
+def _header_cells(line: list[dict]) -> list[dict]:
+    gap = _HEADER_GAP_RATIO * (line[0]["bottom"] - line[0]["top"])
+    cells = []
+    for word in line:
+        if cells and word["x0"] - cells[-1]["x1"] <= gap:
+            cells[-1]["text"] += " " + word["text"]
+            cells[-1]["x1"] = word["x1"]
+        else:
+            cells.append({"text": word["text"], "x0": word["x0"], "x1": word["x1"]})
+    return cells
+
+
+def _column_bounds(cells: list[dict], data_lines: list[list[dict]]) -> list[float]:
+    """x positions separating adjacent header cells.
+
+    Between two header cells, the boundary goes in the middle of the widest
+    stretch that no data word crosses; narrations run right, amounts are
+    often right-aligned, so the header edges alone are not enough.
+    """
+    words = [w for line in data_lines for w in line]
+    bounds = []
+    for left, right in zip(cells, cells[1:]):
+        lo, hi = int(left["x1"]), int(right["x0"])
+        if hi <= lo:
+            bounds.append((left["x1"] + right["x0"]) / 2)
+            continue
+        covered = [False] * (hi - lo + 1)
+        for w in words:
+            for x in range(max(lo, math.ceil(w["x0"])), min(hi, int(w["x1"])) + 1):
+                covered[x - lo] = True
+        best_start, best_len, run_start = lo, 0, None
+        for offset, hit in enumerate(covered + [True]):
+            if not hit and run_start is None:
+                run_start = offset
+            elif hit and run_start is not None:
+                if offset - run_start > best_len:
+                    best_start, best_len = lo + run_start, offset - run_start
+                run_start = None
+        bounds.append(best_start + best_len / 2 if best_len else (lo + hi) / 2)
+    return bounds
+
+
+def find_text_layout(lines: list[list[dict]]) -> tuple[int, dict] | None:
+    """Locate the header line and derive the column layout from it.
+
+    Returns ``(line_index, layout)`` with ``layout = {"headers", "bounds"}``,
+    or None when no line reads as a header with date, narration and amount
+    columns.
+    """
+    for i, line in enumerate(lines):
+        cells = _header_cells(line)
+        if len(cells) < 3:
+            continue
+        headers = [cell["text"] for cell in cells]
+        labels = [clean_column_name(h) for h in headers]
+        # Cheap pre-check: a line with no header keyword has no date column.
+        if not PDF_HEADER.is_header(labels):
+            continue
+        roles = resolve_pdf_columns(labels)
+        if not (
+            roles["date"]
+            and roles["narration"]
+            and (roles["credit"] or roles["debit"] or roles["amount"])
+        ):
+            continue
+        bounds = _column_bounds(cells, lines[i + 1 :])
+        return i, {"headers": headers, "bounds": bounds}
+    return None
+
+
+def _layout_rows(lines: list[list[dict]], layout: dict) -> list[list[str]]:
+    width = len(layout["headers"])
+    rows: list[list[str]] = []
+    prev_bottom = None
+    for line in lines:
+        cells = [[] for _ in range(width)]
+        for word in line:
+            center = (word["x0"] + word["x1"]) / 2
+            cells[bisect.bisect(layout["bounds"], center)].append(word["text"])
+        row = [" ".join(words) for words in cells]
+        height = line[0]["bottom"] - line[0]["top"]
+        close = (
+            prev_bottom is not None
+            and line[0]["top"] - prev_bottom <= _WRAP_GAP_RATIO * height
+        )
+        # A line with nothing in the first (date) column right under a row is
+        # that row's wrapped text; joined with "\n" as extract_tables does.
+        if rows and close and not row[0]:
+            for k, text in enumerate(row):
+                if text:
+                    rows[-1][k] = f"{rows[-1][k]}\n{text}" if rows[-1][k] else text
+        else:
+            rows.append(row)
+        prev_bottom = max(w["bottom"] for w in line)
+    return rows
+
+
+def _layout_ok(rows: list[list[str]], layout: dict) -> bool:
+    if not rows:
+        return False
+    roles = resolve_pdf_columns([clean_column_name(h) for h in layout["headers"]])
+    labels = [clean_column_name(h) for h in layout["headers"]]
+    date_col = labels.index(roles["date"])
+    amount_cols = [
+        labels.index(roles[role])
+        for role in ("credit", "debit", "amount")
+        if roles[role]
+    ]
+    good = sum(
+        1
+        for row in rows
+        if any(ch.isdigit() for ch in row[date_col])
+        and any(parse_amount(row[k]) is not None for k in amount_cols)
+    )
+    return good / len(rows) >= _LAYOUT_MIN_ROW_SHARE
+
+
+def text_layout_tables(page, layout: dict | None) -> tuple[list | None, dict | None]:
+    """Rebuild a page's statement table from word positions.
+
+    Returns ``(tables, layout)`` shaped like ``page.extract_tables()``: the
+    header row leads the table when the page has its own header line;
+    otherwise ``layout`` carried over from an earlier page slices the rows
+    and the table is a continuation. ``tables`` is None when the page fails
+    the layout check, for the caller to fall back to extract_tables.
+    """
+    lines = _page_lines(page)
+    found = find_text_layout(lines)
+    if found is not None:
+        index, layout = found
+        rows = _layout_rows(lines[index + 1 :], layout)
+        table = [layout["headers"], *rows]
+    elif layout is not None:
+        rows = _layout_rows(lines, layout)
+        table = rows
+    else:
+        return None, None
+    if not _layout_ok(rows, layout):
+        return None, layout
+    return [table], layout
+
+
+# Page ranges per worker: several per worker so one dense range doesn't hold
+# up the merge while the other workers sit idle.
+_CHUNKS_PER_WORKER = 4
+# Pages read one by one to learn the layout before the range is split; a
+# file with none learned by then is split anyway.
+_LEARN_MAX_PAGES = 3
+
+_page_pool: ProcessPoolExecutor | None = None
+_page_pool_workers = 0
+# Requests parse in worker threads; two of them finding no pool must not
+# both create one, nor one replace the pool the other just made.
+_page_pool_lock = threading.Lock()
+
+
+# Slack around the learned table's x-range so edge strokes stay in the crop.
+_CROP_MARGIN = 2
+
+
+def _learn_table_region(found) -> dict | None:
+    """x-range and column separators of the first table led by a header row."""
+    for table in found:
+        rows = table.extract()
+        if len(rows) < 2 or not looks_like_header(rows[0]):
+            continue
+        columns = sorted({c[0] for c in table.cells} | {c[2] for c in table.cells})
+        return {"x0": table.bbox[0], "x1": table.bbox[2], "columns": columns}
+    return None
+
+
+def region_tables(page, region: dict | None) -> tuple[list, dict | None]:
+    """extract_tables, narrowed to the table region learned on an earlier page.
+
+    The region is the first header-led table's x-range plus its column
+    separators. Later pages crop to that x-range at full page height (the
+    table's vertical extent changes page to page) and pass the separators
+    as explicit vertical lines, so only horizontal rules are detected. A
+    page that yields no rows this way gets full-page detection.
+    """
+    if region is not None:
+        x0 = max(page.bbox[0], region["x0"] - _CROP_MARGIN)
+        x1 = min(page.bbox[2], region["x1"] + _CROP_MARGIN)
+        cropped = page.crop((x0, page.bbox[1], x1, page.bbox[3]))
+        tables = cropped.extract_tables(
+            {
+                "vertical_strategy": "explicit",
+                "explicit_vertical_lines": region["columns"],
+                "horizontal_strategy": "lines",
             }
+        )
+        if any(len(table) >= 2 for table in tables):
+            return tables, region
+        logger.debug(
+            "[PDF] No rows in the learned table region on page %s — full page",
+            page.page_number,
+        )
+    found = page.find_tables()
+    if region is None:
+        region = _learn_table_region(found)
+    return [table.extract() for table in found], region
 
-        for df in tables_df_list:
-            date_col = find_column(
-                ["date", "txn_date", "transaction_date", "value_date"], df.columns
-            )
-            credit_col = find_column(
-                [
-                    "credit",
-                    "cr",
-                    "credit_amount",
-                    "received",
-                    "deposit",
-                    "cr_amount",
-                    "deposits",
-                ],
-                df.columns,
-            )
-            debit_col = find_column(
-                [
-                    "debit",
-                    "dr",
-                    "debit_amount",
-                    "withdraw",
-                    "paid",
-                    "dr_amount",
-                    "withdrawals",
-                ],
-                df.columns,
-            )
-            amount_col = find_column(
-                ["amount", "transaction_amount", "value"], df.columns
+
+def _page_tables(
+    page, engine: str, layout: dict | None, cache: PageTableCache | None = None
+) -> tuple[list, dict | None]:
+    """Tables of one page plus the state carried to the next page: the text
+    layout for ``engine="text"``, the learned table region otherwise.
+
+    With a ``cache``, a page already extracted under the same engine and
+    carried-in state is read back instead of going through pdfplumber.
+    """
+    key = None
+    if cache is not None:
+        key = cache.key(page, engine, layout)
+        hit = cache.get(key)
+        if hit is not None:
+            page.close()
+            return hit
+    tables, layout = _extract_tables(page, engine, layout)
+    if key is not None:
+        cache.put(key, tables, layout)
+    return tables, layout
+
+
+def _extract_tables(page, engine: str, layout: dict | None) -> tuple[list, dict | None]:
+    tables = None
+    if engine == "text":
+        tables, layout = text_layout_tables(page, layout)
+        if tables is None:
+            logger.debug(
+                "[PDF] Page %s failed the text-layout check — using extract_tables",
+                page.page_number,
             )
-            narration_col = find_column(
-                [
-                    "narration",
-                    "description",
-                    "details",
-                    "remark",
-                    "particulars",
-                    "transaction_details",
-                ],
-                df.columns,
+            tables = page.extract_tables()
+    else:
+        tables, layout = region_tables(page, layout)
+    page.close()
+    return tables, layout
+
+
+def _extract_page_range(
+    file_path: str,
+    start: int,
+    stop: int,
+    engine: str = "tables",
+    layout=None,
+    cache: PageTableCache | None = None,
+) -> tuple[list[list], list]:
+    """Tables of pages [start, stop), each with the state it carries to the
+    next page. Runs inside pool workers."""
+    pages, layouts = [], []
+    with pdfplumber.open(file_path) as pdf:
+        for page in pdf.pages[start:stop]:
+            tables, layout = _page_tables(page, engine, layout, cache)
+            pages.append(tables)
+            layouts.append(layout)
+    return pages, layouts
+
+
+def _continue_range(
+    file_path: str,
+    start: int,
+    pages: list[list],
+    layouts: list,
+    layout,
+    engine: str,
+    cache: PageTableCache | None,
+) -> None:
+    """Re-read the leading pages of a range extracted from a different state
+    than the pages before it carried out (``layout``), until the state
+    agrees with the worker's; from there on the worker's pages stand."""
+    with pdfplumber.open(file_path) as pdf:
+        for i, page in enumerate(pdf.pages[start : start + len(pages)]):
+            pages[i], layout = _page_tables(page, engine, layout, cache)
+            if layout == layouts[i]:
+                return
+            layouts[i] = layout
+
+
+def _get_page_pool(workers: int) -> ProcessPoolExecutor:
+    global _page_pool, _page_pool_workers
+    with _page_pool_lock:
+        if _page_pool is None or _page_pool_workers != workers:
+            if _page_pool is not None:
+                _page_pool.shutdown(wait=False)
+            # spawn, not fork: the API process runs request threads, and forking
+            # a threaded process can leave locks held in the child.
+            _page_pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
             )
-            balance_col = find_column(
-                ["balance", "closing_balance", "available_balance", "current_balance"],
-                df.columns,
+            _page_pool_workers = workers
+        return _page_pool
+
+
+def extract_page_tables(
+    file_path: str,
+    workers: int = 0,
+    engine: str = "tables",
+    cache: PageTableCache | None = None,
+    budget: ParseBudget | None = None,
+) -> list[list]:
+    """The tables of every page, in page order.
+
+    ``engine="tables"`` runs extract_tables, cropped to the learned table
+    region after the first header-led table (see region_tables).
+    ``engine="text"`` rebuilds tables from word positions (see
+    text_layout_tables), page by page falling back to extract_tables.
+    With ``workers`` ≥ 2 and at least ``settings.pdf_parallel_min_pages``
+    pages, page ranges are extracted in a shared process pool and merged
+    back in order; otherwise pages are read one after another. Each range
+    starts from the layout learned before the split; a range whose pages
+    before it carried out another (a section re-headed under new columns)
+    has its leading pages re-read with that one, so the result is the
+    sequential one. ``cache`` skips pages seen before (see PageTableCache).
+
+    ``budget`` is checked before every page (between ranges in the pool,
+    whose pending ranges are then cancelled); once it is spent, the pages
+    read so far are returned.
+    """
+    global _page_pool
+    budget = budget or ParseBudget()
+    layout = None
+    pages = []
+    with pdfplumber.open(file_path) as pdf:
+        page_count = budget.page_limit(len(pdf.pages))
+        if workers < 2 or page_count < settings.pdf_parallel_min_pages:
+            for page in pdf.pages[:page_count]:
+                if budget.spent():
+                    break
+                tables, layout = _page_tables(page, engine, layout, cache)
+                pages.append(tables)
+            return pages
+        # Learn the column layout / table region before splitting the range,
+        # so every worker starts from it.
+        while layout is None and len(pages) < min(page_count, _LEARN_MAX_PAGES):
+            if budget.spent():
+                return pages
+            tables, layout = _page_tables(
+                pdf.pages[len(pages)], engine, layout, cache
             )
-            account_col = find_column(
-                ["account", "acc_no", "account_number"], df.columns
+            pages.append(tables)
+        if layout is None:
+            logger.info(
+                "[PDF] No layout learned from the first %s pages of %s — splitting anyway",
+                len(pages),
+                file_path,
             )
 
-            required_cols_pdf = [date_col, narration_col]
-            if not all(required_cols_pdf) or not (
-                credit_col or debit_col or amount_col
-            ):
-                logger.warning(
-                    "Skipping PDF table: missing critical columns. Date: %s, Narration: %s, Amount: %s/%s/%s",
-                    date_col,
-                    narration_col,
-                    credit_col,
-                    debit_col,
-                    amount_col,
+    first = len(pages)
+    chunk = max(1, math.ceil((page_count - first) / (workers * _CHUNKS_PER_WORKER)))
+    starts = range(first, page_count, chunk)
+    pool = _get_page_pool(workers)
+    try:
+        futures = [
+            pool.submit(
+                _extract_page_range,
+                file_path,
+                start,
+                min(start + chunk, page_count),
+                engine,
+                layout,
+                cache,
+            )
+            for start in starts
+        ]
+        carried = layout
+        for start, future in zip(starts, futures):
+            if budget.spent():
+                for pending in futures:
+                    pending.cancel()  # ranges already running finish in the worker
+                break
+            range_pages, layouts = future.result()
+            if carried != layout:
+                _continue_range(
+                    file_path, start, range_pages, layouts, carried, engine, cache
                 )
+            pages.extend(range_pages)
+            carried = layouts[-1] if layouts else carried
+    except BrokenProcessPool:
+        with _page_pool_lock:
+            if _page_pool is pool:
+                _page_pool = None  # recreated on the next request
+        raise
+    logger.debug(
+        "[PDF] %s pages extracted in %s ranges across %s workers",
+        len(pages),
+        len(futures),
+        workers,
+    )
+    return pages
+
+
+# Account details sit in the first page or two. Text of later pages is only
+# extracted while one of these is still missing, up to the page cap.
+_METADATA_LEAD_PAGES = 2
+_METADATA_MAX_PAGES = 5
+_METADATA_KEY_FIELDS = ("account_number", "account_holder", "bank_name", "ifsc_code")
+
+
+def _pdfplumber_page_texts(file_path: str):
+    with pdfplumber.open(file_path) as pdf:
+        for page in pdf.pages:
+            text = page.extract_text(x_tolerance=1) or ""
+            page.close()
+            yield text
+
+
+# PDFium is not thread-safe and requests parse in worker threads; the lock is
+# taken per call, never held across a yield.
+_pdfium_lock = threading.Lock()
+
+
+def _pdfium_page_text(pdf, index: int) -> str:
+    with _pdfium_lock:
+        page = pdf[index]
+        textpage = page.get_textpage()
+        text = textpage.get_text_bounded()
+        textpage.close()
+        page.close()
+    return text.replace("\r\n", "\n")
+
+
+def _pdfium_page_texts(file_path: str):
+    with _pdfium_lock:
+        pdf = pdfium.PdfDocument(file_path)
+        page_count = len(pdf)
+    try:
+        for index in range(page_count):
+            yield _pdfium_page_text(pdf, index)
+    finally:
+        with _pdfium_lock:
+            pdf.close()
+
+
+# Text extraction for metadata and page checks only; tables always come from
+# pdfplumber. pdfium (C, already installed with pdfplumber) is much faster
+# than pdfminer's layout analysis; line order can differ on complex layouts.
+TEXT_BACKENDS = {
+    "pdfplumber": _pdfplumber_page_texts,
+    "pdfium": _pdfium_page_texts,
+}
+
+
+def iter_page_texts(file_path: str, backend: str | None = None):
+    """Yield page texts one at a time; nothing is extracted until asked for.
+
+    ``backend`` names a TEXT_BACKENDS entry, ``settings.pdf_text_backend``
+    when omitted.
+    """
+    return TEXT_BACKENDS[backend or settings.pdf_text_backend](file_path)
+
+
+def extract_pdf_metadata(
+    file_path: str, extract_metadata_fn, backend: str | None = None
+) -> dict:
+    """Run extract_metadata_fn over as few leading pages as it takes."""
+    text = ""
+    metadata = {}
+    pages = iter_page_texts(file_path, backend)
+    try:
+        for page_num, page_text in enumerate(pages, start=1):
+            text += page_text + "\n"
+            if page_num < _METADATA_LEAD_PAGES:
                 continue
+            metadata = extract_metadata_fn(text)
+            if page_num >= _METADATA_MAX_PAGES or all(
+                metadata.get(field) for field in _METADATA_KEY_FIELDS
+            ):
+                return metadata
+            logger.debug(
+                "[PDF] Metadata incomplete after %s pages — reading on", page_num
+            )
+    finally:
+        pages.close()
+    # Ran out of pages before the cap (or before the lead window filled).
+    return extract_metadata_fn(text) if not metadata else metadata
 
-            for _, row in df.iterrows():
+
+# A scanner writes every page as a picture, so the first few pages decide.
+_SCAN_CHECK_PAGES = 3
+
+_SCANNED_PDF_RESPONSE = {
+    "success": 0,
+    "status_code": 422,
+    "error_code": "SCANNED_PDF",
+    "message": "This PDF is a scanned image with no text layer. Upload the statement downloaded from your bank, or run it through OCR first.",
+    "result": {},
+}
+
+
+def _pdfium_page_kind(page) -> str:
+    """Classify a pdfium page as ``"text"``, ``"image"`` or ``"blank"``."""
+    textpage = page.get_textpage()
+    try:
+        if textpage.get_text_bounded().strip():
+            return "text"
+    finally:
+        textpage.close()
+    images = page.get_objects(filter=(pdfium_c.FPDF_PAGEOBJ_IMAGE,))
+    return "image" if next(images, None) is not None else "blank"
+
+
+def is_image_only_pdf(file_path: str, pages: int = _SCAN_CHECK_PAGES) -> bool:
+    """True when the leading pages carry images and no text at all.
+
+    Reads pdfium's page objects only — no pdfminer layout pass — so a scan
+    is turned away in milliseconds instead of after every page went through
+    table detection. An OCR text layer counts as text, and a PDF of blank
+    pages is left to the normal path. Files pdfium cannot open are too.
+    """
+    with _pdfium_lock:
+        try:
+            pdf = pdfium.PdfDocument(file_path)
+        except pdfium.PdfiumError:
+            return False
+        try:
+            kinds = set()
+            for index in range(min(pages, len(pdf))):
+                page = pdf[index]
                 try:
-                    amount = None
-                    txn_type = None
-
-                    credit = parse_amount(row.get(credit_col))
-                    debit = parse_amount(row.get(debit_col))
-                    general_amount = parse_amount(row.get(amount_col))
-
-                    if credit is not None and credit > 0:
-                        amount = credit
-                        txn_type = "CREDIT"
-                    elif debit is not None and debit > 0:
-                        amount = debit
-                        txn_type = "DEBIT"
-                    elif general_amount is not None:
-                        amount = general_amount
-                        txn_type = "CREDIT" if amount >= 0 else "DEBIT"
-                        amount = abs(amount)
-
-                    if (
-                        amount is None
-                        and credit is None
-                        and debit is None
-                        and general_amount is None
-                    ):
-                        logger.debug("Skipping PDF row: no amount information found.")
-                        continue
+                    kinds.add(_pdfium_page_kind(page))
+                finally:
+                    page.close()
+                if "text" in kinds:
+                    return False
+            return "image" in kinds
+        finally:
+            pdf.close()
 
-                    narration = (
-                        str(row.get(narration_col)).strip()
-                        if pd.notna(row.get(narration_col))
-                        else ""
-                    )
-                    if not narration and amount is None:
+
+_ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def _iso_date(value) -> str | None:
+    """`value` as YYYY-MM-DD, day first unless it already is; None when it
+    isn't a date."""
+    if not value:
+        return None
+    if _ISO_DATE.fullmatch(value):
+        return value
+    parsed = pd.to_datetime(value, errors="coerce", dayfirst=True)
+    return None if pd.isna(parsed) else parsed.strftime("%Y-%m-%d")
+
+
+def with_transaction_period(meta_info: dict, transactions: list[dict]) -> dict:
+    """Widen statement_period to cover the transaction dates.
+
+    Only the leading pages' text feeds extract_metadata_fn, so the period it
+    finds there is completed from the parsed rows. Dates are compared as
+    YYYY-MM-DD strings; one that can't be read as a date is left out.
+    """
+    period = meta_info.get("statement_period") or {}
+    values = [t.get("transaction_date") for t in transactions]
+    values += [period.get("from"), period.get("to"), period.get("date")]
+    dates = [d for d in map(_iso_date, values) if d]
+    if len(dates) >= 2:
+        meta_info["statement_period"] = {"from": min(dates), "to": max(dates)}
+    elif dates:
+        meta_info["statement_period"] = {"date": dates[0]}
+    return meta_info
+
+
+def merge_fragments(frames: list[pd.DataFrame]) -> list[pd.DataFrame]:
+    """Concatenate runs of consecutive table fragments that share a header.
+
+    Page order is kept: a fragment under a different header ends the run.
+    """
+    merged = []
+    run: list[pd.DataFrame] = []
+    for df in frames:
+        if run and tuple(df.columns) != tuple(run[0].columns):
+            merged.append(pd.concat(run, ignore_index=True) if len(run) > 1 else run[0])
+            run = []
+        run.append(df)
+    if run:
+        merged.append(pd.concat(run, ignore_index=True) if len(run) > 1 else run[0])
+    return merged
+
+
+def _fragment_layout(profiles, header: tuple, df: pd.DataFrame) -> dict | None:
+    """Layout profile for one table header, or None if it lacks the
+    required columns. Cached profiles skip resolution and date probing."""
+    signature, profile = lookup_layout(profiles, "pdf", header)
+    if profile:
+        return profile
+
+    roles = resolve_pdf_columns(header)
+    required_cols_pdf = [roles["date"], roles["narration"]]
+    if not all(required_cols_pdf) or not (
+        roles["credit"] or roles["debit"] or roles["amount"]
+    ):
+        logger.warning(
+            "Skipping PDF table: missing critical columns. Date: %s, Narration: %s, Amount: %s/%s/%s",
+            roles["date"],
+            roles["narration"],
+            roles["credit"],
+            roles["debit"],
+            roles["amount"],
+        )
+        return None
+
+    date_format = detect_date_format(df, roles)
+    remember_layout(profiles, signature, "pdf", roles, date_format)
+    return make_profile(roles, date_format)
+
+
+def process_pdf_transactions(
+    file_path: str,
+    extract_metadata_fn,
+    workers: int | None = None,
+    engine: str = "tables",
+    profiles=None,
+    page_cache: PageTableCache | None = None,
+    budget: ParseBudget | None = None,
+) -> dict:
+    if workers is None:
+        workers = settings.pdf_parallel_workers
+    budget = budget or ParseBudget()
+    try:
+        if is_image_only_pdf(file_path):
+            logger.warning("[PDF] No text layer on the leading pages of %s", file_path)
+            return _SCANNED_PDF_RESPONSE
+
+        transactions = []
+        tables_df_list = []
+        last_known_headers = None
+
+        # Continuation headers are resolved here, after the merge, so a table
+        # at the start of one worker's range still sees the header from the
+        # previous range.
+        for page_num, tables in enumerate(
+            extract_page_tables(file_path, workers, engine, page_cache, budget)
+        ):
+            for table_idx, table in enumerate(tables):
+                if not table or len(table) < 2:
+                    continue
+                try:
+                    if looks_like_header(table[0]):
+                        headers = table[0]
+                        rows = table[1:]
+                        last_known_headers = headers
+                    elif last_known_headers is not None:
                         logger.debug(
-                            "Skipping PDF row: no narration or amount present."
+                            "[PDF] Continuation table detected on page %s — reusing header from previous page",
+                            page_num + 1,
+                        )
+                        headers = last_known_headers
+                        rows = table
+                    else:
+                        logger.warning(
+                            "[PDF] First PDF table on page %s has no recognizable header — skipping",
+                            page_num + 1,
                         )
                         continue
 
-                    transaction_date_str = (
-                        str(row.get(date_col)).strip()
-                        if pd.notna(row.get(date_col))
-                        else None
+                    df = pd.DataFrame(rows, columns=headers)
+                    df.columns = [clean_column_name(col) for col in df.columns]
+                    tables_df_list.append(df)
+                    logger.debug(
+                        "Page %s, Table %s extracted with columns: %s",
+                        page_num + 1,
+                        table_idx + 1,
+                        df.columns.tolist(),
                     )
-                    parsed_date = normalize_date(transaction_date_str)
-
-                    balance = parse_amount(row.get(balance_col))
-                    account = (
-                        str(row.get(account_col)).strip()
-                        if account_col and pd.notna(row.get(account_col))
-                        else None
+                except Exception as df_create_err:
+                    logger.warning(
+                        "Could not create DataFrame from PDF table on page %s, table %s: %s",
+                        page_num + 1,
+                        table_idx + 1,
+                        df_create_err,
                     )
 
-                    narration_details = analyze_narration_details(narration)
+        if budget.cancelled:
+            return CANCELLED_RESPONSE
 
-                    txn_obj = {
-                        "transaction_date": parsed_date,
-                        "transaction_type": txn_type,
-                        "amount": amount,
-                        "narration": narration,
-                        "balance": balance,
-                        "account": account,
-                        **narration_details,
-                    }
-                    transactions.append(txn_obj)
-
-                except Exception as row_err:
-                    logger.warning(
-                        "Skipping PDF row due to error: %s", row_err, exc_info=True
-                    )
+        if not tables_df_list:
+            logger.warning("No tables found or extracted from PDF: %s", file_path)
+            meta_info = extract_pdf_metadata(file_path, extract_metadata_fn)
+            return {
+                "success": 0,
+                "status_code": 400,
+                "message": "No structured transaction tables could be extracted from the PDF.",
+                "result": {
+                    "account_info": meta_info,
+                    "transactions": [],
+                    **budget.flags(),
+                },
+            }
 
-        meta_info = extract_metadata_fn(all_text)
+        meta_info = extract_pdf_metadata(file_path, extract_metadata_fn)
+        grammar = grammar_for(meta_info)
+        date_format = None
+        # Roles are resolved (or looked up) once per distinct header, and
+        # consecutive fragments under one header go through the builder as
+        # a single frame.
+        layouts: dict[tuple, dict | None] = {}
+        for df in merge_fragments(tables_df_list):
+            header = tuple(df.columns)
+            if header not in layouts:
+                layouts[header] = _fragment_layout(profiles, header, df)
+            layout = layouts[header]
+            if layout is None:
+                continue
+            roles = layout["roles"]
+            # Each header's tables are read with that header's own date
+            # format; the result reports the first.
+            fragment_format = layout["date_format"] or detect_date_format(df, roles)
+            if date_format is None:
+                date_format = fragment_format
+            transactions.extend(build_transactions(df, roles, fragment_format, grammar))
 
-        transactions = deduplicate_transactions(transactions)
+        transactions = budget.clip_rows(deduplicate_transactions(transactions))
 
-        for txn in transactions:
-            txn["confidence_score"] = calculate_confidence_score(txn)
+        meta_info = with_transaction_period(meta_info, transactions)
 
-        overall_confidence = (
-            round(
-                sum(t["confidence_score"] for t in transactions) / len(transactions),
-                2,
-            )
-            if transactions
-            else 0.0
-        )
+        scores = score_transactions(transactions)
 
         return {
             "success": 1,
@@ -260,14 +860,10 @@ def process_pdf_transactions(file_path: str, extract_metadata_fn) -> dict:
             "message": f"{len(transactions)} transactions parsed from PDF",
             "result": {
                 "account_info": meta_info,
+                "date_format": date_format,
                 "transactions": transactions,
-                "confidence_summary": {
-                    "overall_score": overall_confidence,
-                    "total_transactions": len(transactions),
-                    "high_confidence_txns": sum(
-                        1 for t in transactions if t["confidence_score"] >= 0.85
-                    ),
-                },
+                "confidence_summary": confidence_summary(scores),
+                **budget.flags(),
             },
         }
 
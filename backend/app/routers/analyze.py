@@ -1,9 +1,11 @@
 import asyncio
+import codecs
 import logging
+import threading
 import uuid
 from pathlib import Path
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
 from fastapi.responses import JSONResponse
 from sqlmodel import Session
 
@@ -11,8 +13,14 @@ from app.config.settings import settings
 from app.db.crud import find_statement_by_hash, fingerprint_transaction, get_correction, hash_file, save_statement
 from app.db.database import get_session
 from app.models.analyzer import BankStatementAnalyzer, TransactionPatternTrainer
+from app.models.frame import TransactionFrame
+from app.models.record import as_dicts
 from app.models.schemas import AnalyzeResponse
+from app.parsers.budget import ParseBudget
+from app.parsers.page_cache import page_cache
+from app.parsers.pdf_parser import PDF_ENGINES
 from app.services.insights import detect_recurring, generate_insights
+from app.services.layout_profiles import layout_profiles
 from app.services.llm_enricher import enrich_with_llm
 
 router = APIRouter()
@@ -44,10 +52,44 @@ def validate_magic_bytes(file_path: Path, extension: str) -> bool:
         return False
 
 
+_DISCONNECT_POLL_S = 0.5
+
+
+async def _cancel_on_disconnect(request: Request, cancel: threading.Event) -> None:
+    """Set ``cancel`` once the client goes away, so the parse thread stops."""
+    while not cancel.is_set():
+        if await request.is_disconnected():
+            logger.warning("Client disconnected — cancelling parse")
+            cancel.set()
+            return
+        await asyncio.sleep(_DISCONNECT_POLL_S)
+
+
+async def _parse_in_thread(analyzer: BankStatementAnalyzer, request: Request) -> dict:
+    """Run the parse in a worker thread, cancelling it if the client leaves."""
+    cancel = analyzer.budget.cancel
+    watcher = asyncio.create_task(_cancel_on_disconnect(request, cancel))
+    try:
+        return await asyncio.to_thread(analyzer.extract_transactions)
+    except asyncio.CancelledError:
+        cancel.set()  # the thread can't be killed; make it wind down
+        raise
+    finally:
+        watcher.cancel()
+
+
 @router.post("/api/analyze/bank/statement", response_model=AnalyzeResponse)
 async def analyze_statement(
+    request: Request,
     file: UploadFile = File(...),
     persist: bool = False,
+    encoding: str | None = Query(
+        default=None, description="CSV text encoding; detected from the file when omitted"
+    ),
+    pdf_engine: str = Query(
+        default="tables",
+        description="PDF extraction: 'tables' (pdfplumber table finder) or 'text' (word-position layout, falls back to tables per page)",
+    ),
     session: Session = Depends(get_session),
 ):
     suffix = Path(file.filename).suffix.lower()
@@ -57,6 +99,18 @@ async def analyze_statement(
             detail=f"Unsupported file type: {suffix}. Allowed: PDF, CSV, XLSX, XLS.",
         )
 
+    if encoding is not None:
+        try:
+            codecs.lookup(encoding)
+        except LookupError:
+            raise HTTPException(status_code=400, detail=f"Unknown encoding: {encoding}")
+
+    if pdf_engine not in PDF_ENGINES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown pdf_engine: {pdf_engine}. Allowed: {', '.join(PDF_ENGINES)}.",
+        )
+
     content = await file.read()
     if len(content) > MAX_BYTES:
         raise HTTPException(
@@ -88,10 +142,27 @@ async def analyze_statement(
                 detail=f"File content does not match extension '{suffix}'. Upload a real {suffix.upper()} file.",
             )
 
-        result = await asyncio.to_thread(
-            lambda: BankStatementAnalyzer(str(file_path)).extract_transactions()
+        analyzer = BankStatementAnalyzer(
+            str(file_path),
+            encoding=encoding,
+            pdf_engine=pdf_engine,
+            layout_profiles=layout_profiles,
+            # Cached pages are statement contents left on disk; only a
+            # statement the client asked to store may leave them.
+            page_cache=page_cache if persist else None,
+            budget=ParseBudget.from_settings(),
         )
+        result = await _parse_in_thread(analyzer, request)
         http_status = result.get("status_code", 200)
+        if http_status != 200 and result.get("error_code"):
+            # Machine-readable reason alongside the usual detail string.
+            return JSONResponse(
+                status_code=http_status,
+                content={
+                    "detail": result.get("message", "Analysis failed"),
+                    "error_code": result["error_code"],
+                },
+            )
         if http_status != 200:
             raise HTTPException(
                 status_code=http_status, detail=result.get("message", "Analysis failed")
@@ -100,17 +171,27 @@ async def analyze_statement(
         if result.get("result", {}).get("transactions"):
             enriched = await enrich_with_llm(result["result"]["transactions"])
             result["result"]["transactions"] = enriched
+            # One columnar view of the enriched list for both aggregations.
+            frame = TransactionFrame(enriched)
             result["result"]["merchant_insights"] = TransactionPatternTrainer().analyze(
-                enriched
+                frame
             )
             result["result"]["insights"] = generate_insights(
-                enriched, result["result"]["merchant_insights"]
+                frame, result["result"]["merchant_insights"]
             )
             result["result"]["recurring_candidates"] = detect_recurring(
                 result["result"]["merchant_insights"]
             )
 
-        if persist:
+        if persist and result.get("result", {}).get("truncated"):
+            # Saved under the whole file's hash, a partial parse would answer
+            # every later upload of the file; it is returned but not kept.
+            logger.warning(
+                "Not persisting %s: parse truncated (%s)",
+                file.filename,
+                result["result"].get("truncation_reason"),
+            )
+        elif persist:
             # Apply stored category corrections before saving and returning.
             for txn in result.get("result", {}).get("transactions", []):
                 fp = fingerprint_transaction(
@@ -136,6 +217,9 @@ async def analyze_statement(
                 recurring_candidates=result.get("result", {}).get("recurring_candidates", []),
             )
 
+        if "transactions" in result.get("result", {}):
+            # Records travel through the pipeline; the response wants dicts.
+            result["result"]["transactions"] = as_dicts(result["result"]["transactions"])
         return result
     except HTTPException:
         raise
@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+
+from app.enrichers.narration_cache import narration_cache
+from app.services.layout_profiles import layout_profiles
+
+router = APIRouter()
+
+
+@router.get("/api/metrics")
+def get_metrics():
+    return {
+        "layout_profiles": layout_profiles.stats(),
+        "narration_cache": narration_cache.stats(),
+    }
@@ -1,9 +1,10 @@
 import logging
-from collections import defaultdict
 
+import numpy as np
 from fastapi import APIRouter
 from pydantic import BaseModel
 
+from app.models.frame import TransactionFrame
 from app.models.schemas import CategoryBreakdown, StatementPeriod, SummaryResponse, TopMerchant, Transaction
 
 router = APIRouter()
@@ -16,40 +17,21 @@ class SummaryRequest(BaseModel):
 
 @router.post("/api/analyze/bank/summary", response_model=SummaryResponse)
 def summarize_transactions(body: SummaryRequest):
-    transactions = body.transactions
-
-    total_income = 0.0
-    total_expenses = 0.0
-    category_totals: dict[str, dict] = defaultdict(lambda: {"total": 0.0, "count": 0})
-    merchant_totals: dict[str, dict] = defaultdict(lambda: {"total": 0.0, "count": 0})
-    amounts = []
-    dates = []
-
-    for txn in transactions:
-        amount = txn.amount
-        if not amount or amount == 0:
-            continue
-
-        txn_type = (txn.transaction_type or "").upper()
-        amount = abs(amount)
-        amounts.append(amount)
-
-        if txn_type in ("CREDIT", "CR"):
-            total_income += amount
-        else:
-            total_expenses += amount
-            # category is a list; spend counted once per category (totals may exceed 100% — intentional)
-            categories = txn.category or ["Uncategorized"]
-            for cat in categories:
-                category_totals[cat]["total"] += amount
-                category_totals[cat]["count"] += 1
-
-            if txn.merchant:
-                merchant_totals[txn.merchant]["total"] += amount
-                merchant_totals[txn.merchant]["count"] += 1
-
-        if txn.transaction_date:
-            dates.append(txn.transaction_date)
+    frame = TransactionFrame(body.transactions)
+
+    amount = np.abs(frame.amount)
+    counted = np.nan_to_num(amount) > 0  # a missing or zero amount is skipped
+    expense = counted & ~frame.is_credit
+    # bincount adds in row order, like the running totals it replaces.
+    total_income, total_expenses = np.bincount(
+        expense.astype(np.intp), weights=np.where(counted, amount, 0.0), minlength=2
+    ).tolist()
+
+    # category is a list; spend counted once per category (totals may exceed 100% — intentional)
+    category_totals = frame.category_totals(expense, amount, empty="Uncategorized")
+    merchant_totals = frame.merchant_totals(expense, amount)
+    amounts = amount[counted]
+    dates = [d for d in frame.dates[counted].tolist() if d]
 
     net = total_income - total_expenses
 
@@ -60,11 +42,11 @@ def summarize_transactions(body: SummaryRequest):
             [
                 CategoryBreakdown(
                     category=cat,
-                    total=round(data["total"], 2),
-                    count=data["count"],
-                    percentage=round((data["total"] / total_expenses) * 100, 1),
+                    total=round(total, 2),
+                    count=count,
+                    percentage=round((total / total_expenses) * 100, 1),
                 )
-                for cat, data in category_totals.items()
+                for cat, (total, count) in category_totals.items()
             ],
             key=lambda x: x.total,
             reverse=True,
@@ -72,12 +54,8 @@ def summarize_transactions(body: SummaryRequest):
 
     top_merchants = sorted(
         [
-            TopMerchant(
-                merchant=merchant,
-                total=round(data["total"], 2),
-                count=data["count"],
-            )
-            for merchant, data in merchant_totals.items()
+            TopMerchant(merchant=merchant, total=round(total, 2), count=count)
+            for merchant, (total, count) in merchant_totals.items()
         ],
         key=lambda x: x.total,
         reverse=True,
@@ -95,6 +73,6 @@ def summarize_transactions(body: SummaryRequest):
         date_range=date_range,
         by_category=by_category,
         top_merchants=top_merchants,
-        transaction_count=len(transactions),
-        avg_transaction_amount=round(sum(amounts) / len(amounts), 2) if amounts else 0.0,
+        transaction_count=len(frame),
+        avg_transaction_amount=round(sum(amounts.tolist()) / len(amounts), 2) if len(amounts) else 0.0,
     )
@@ -1,3 +1,6 @@
+import numpy as np
+
+
 def calculate_confidence_score(txn: dict) -> float:
     score = 1.0
 
@@ -30,3 +33,65 @@ def calculate_confidence_score(txn: dict) -> float:
         score -= 0.05
 
     return max(0.0, min(round(score, 2), 1.0))
+
+
+# (penalty, applies when the mask is False) in calculate_confidence_score's order.
+_PENALTIES = (
+    (0.25, True),  # transaction_date missing or not a string
+    (0.25, True),  # amount missing, non-numeric or <= 0
+    (0.15, False),  # no narration
+    (0.05, False),  # narration shorter than 5 characters
+    (0.10, False),  # no transaction_type
+    (0.10, True),  # no receiver name, account or VPA
+    (0.05, False),  # balance missing
+)
+
+
+def _score_table() -> list[float]:
+    """The score for every combination of penalties, indexed by bitmask."""
+    table = []
+    for code in range(1 << len(_PENALTIES)):
+        score = 1.0
+        for bit, (penalty, _) in enumerate(_PENALTIES):
+            if code >> bit & 1:
+                score -= penalty
+        table.append(max(0.0, min(round(score, 2), 1.0)))
+    return table
+
+
+_SCORE_TABLE = np.array(_score_table())
+
+
+def score_frame(frame) -> list[float]:
+    """calculate_confidence_score for every transaction of a TransactionFrame.
+
+    A score depends only on which penalties apply, so each row's penalties
+    become a bitmask that indexes a table of the 128 possible scores, each
+    computed exactly as the per-row function computes it.
+    """
+    narrations = frame.narrations
+    masks = (
+        np.array([bool(d) and isinstance(d, str) for d in frame.dates], dtype=bool),
+        frame.amount > 0,  # NaN (missing / non-numeric) compares False
+        np.array([not n for n in narrations], dtype=bool),
+        np.array(
+            [bool(n) and isinstance(n, str) and len(n.strip()) < 5 for n in narrations],
+            dtype=bool,
+        ),
+        np.array([not t for t in frame.transaction_types], dtype=bool),
+        frame.has_receiver,
+        frame.balance_missing,
+    )
+    code = np.zeros(len(frame), dtype=np.intp)
+    for bit, (mask, (_, when_false)) in enumerate(zip(masks, _PENALTIES)):
+        code |= (~mask if when_false else mask).astype(np.intp) << bit
+    return _SCORE_TABLE[code].tolist()
+
+
+def confidence_summary(scores: list[float]) -> dict:
+    """The result's confidence_summary block for the per-transaction scores."""
+    return {
+        "overall_score": round(sum(scores) / len(scores), 2) if scores else 0.0,
+        "total_transactions": len(scores),
+        "high_confidence_txns": sum(1 for s in scores if s >= 0.85),
+    }
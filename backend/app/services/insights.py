@@ -1,46 +1,39 @@
-from collections import defaultdict
 from typing import Any
 
+import numpy as np
+
+from app.models.frame import as_frame
+
 LARGE_TXN_THRESHOLD = 10_000
 
 
 def generate_insights(
-    transactions: list[dict[str, Any]],
+    transactions,
     merchant_insights: dict[str, Any],
 ) -> list[str]:
     """
     Derive plain-language descriptive callouts from already-computed data.
     Pure function — no I/O, no side effects. Returns [] for empty/sparse input.
+    `transactions` is a transaction list or a TransactionFrame.
     """
-    if not transactions:
+    frame = as_frame(transactions)
+    if not len(frame):
         return []
 
     insights: list[str] = []
 
-    category_totals: dict[str, float] = defaultdict(float)
-    total_debit = 0.0
-    total_credit = 0.0
-    large_txn_count = 0
-
-    for txn in transactions:
-        amount = txn.get("amount")
-        txn_type = (txn.get("transaction_type") or "").upper()
-        categories = txn.get("category") or []
-
-        if not isinstance(amount, (int, float)) or amount == 0:
-            continue
-
-        amount = abs(amount)
-
-        if amount > LARGE_TXN_THRESHOLD:
-            large_txn_count += 1
-
-        if txn_type in ("CREDIT", "CR"):
-            total_credit += amount
-        else:
-            total_debit += amount
-            for cat in categories:
-                category_totals[cat] += amount
+    amount = np.abs(frame.amount)
+    counted = np.nan_to_num(amount) > 0  # numeric and non-zero
+    debit = counted & ~frame.is_credit
+    large_txn_count = int(np.count_nonzero(counted & (amount > LARGE_TXN_THRESHOLD)))
+    # bincount adds in row order, like the running totals it replaces;
+    # rows that are not counted add 0.0 to the credit bin.
+    total_credit, total_debit = np.bincount(
+        debit.astype(np.intp), weights=np.where(counted, amount, 0.0), minlength=2
+    ).tolist()
+    category_totals = {
+        cat: total for cat, (total, _) in frame.category_totals(debit, amount).items()
+    }
 
     # 1. Top spending category + share of spend
     if category_totals and total_debit > 0:
@@ -0,0 +1,109 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import Session
+
+from app.config.settings import settings
+from app.db.crud import get_layout_profile, save_layout_profile
+
+logger = logging.getLogger(__name__)
+
+
+def header_signature(source: str, columns) -> str:
+    """SHA-256 of the source kind and the normalized header row."""
+    raw = source + "\x1f" + "\x1f".join(str(col) for col in columns)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def amount_convention(roles: dict) -> str:
+    if roles.get("credit") or roles.get("debit"):
+        return "credit_debit"
+    if roles.get("dr_cr_type"):
+        return "amount_with_dr_cr"
+    return "signed_amount"
+
+
+def make_profile(roles: dict, date_format: str | None) -> dict:
+    return {
+        "roles": roles,
+        "date_format": date_format,
+        "amount_convention": amount_convention(roles),
+    }
+
+
+class LayoutProfileStore:
+    """Resolved layouts (column roles, date format) keyed by header signature.
+
+    An in-memory LRU in front of the ``layout_profiles`` table. Until
+    attach() hands it a database engine (the app does so at startup), it is
+    memory-only. Database errors degrade to memory-only for that call — a
+    profile is an optimization, never a reason to fail a parse.
+    """
+
+    def __init__(self, max_entries: int = settings.layout_profile_cache_size):
+        self.max_entries = max_entries
+        self._engine = None
+        self._cache: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def attach(self, engine) -> None:
+        self._engine = engine
+
+    def _remember(self, signature: str, profile: dict) -> None:
+        self._cache[signature] = profile
+        self._cache.move_to_end(signature)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    def get(self, signature: str) -> dict | None:
+        with self._lock:
+            profile = self._cache.get(signature)
+            if profile is not None:
+                self._cache.move_to_end(signature)
+        if profile is None and self._engine is not None:
+            try:
+                with Session(self._engine) as session:
+                    profile = get_layout_profile(session, signature)
+            except SQLAlchemyError as e:
+                logger.warning("[LayoutProfile] Lookup failed: %s", e)
+        with self._lock:
+            if profile is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(signature, profile)
+        return profile
+
+    def put(self, signature: str, source: str, profile: dict) -> None:
+        with self._lock:
+            self._remember(signature, profile)
+        if self._engine is None:
+            return
+        try:
+            with Session(self._engine) as session:
+                save_layout_profile(session, signature, source, profile)
+        except SQLAlchemyError as e:
+            logger.warning("[LayoutProfile] Save failed: %s", e)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "cached_profiles": len(self._cache),
+            }
+
+
+layout_profiles = LayoutProfileStore()
@@ -0,0 +1,76 @@
+"""Merchant catalogue cost as it grows: load time and per-row lookup.
+
+Run from backend/:  python -m benchmarks.merchant_rules [rules ...]
+
+Writes a catalogue of synthetic merchants (one to three aliases each, a
+random canonical category) to a temporary JSON file, loads it through
+MerchantRules.refresh() and times apply() over the test corpus plus rows
+naming catalogue merchants, with the enricher's details left empty so
+every row is looked up. Best of three runs.
+"""
+
+import json
+import random
+import string
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from app.enrichers.merchant_rules import MerchantRules
+from app.enrichers.narration_enricher import blank_details
+from app.services.categories import CANONICAL_CATEGORIES
+from tests.test_narration_enricher import CORPUS
+
+DEFAULT_SIZES = (1_000, 10_000, 50_000)
+REPEATS = 3
+
+
+def _name(rng) -> str:
+    words = rng.randint(1, 3)
+    return " ".join(
+        "".join(rng.choices(string.ascii_uppercase, k=rng.randint(4, 9))) for _ in range(words)
+    )
+
+
+def _catalogue(size: int) -> list[dict]:
+    rng = random.Random(size)
+    return [
+        {
+            "merchant": _name(rng),
+            "category": rng.choice(CANONICAL_CATEGORIES),
+            "aliases": [_name(rng) for _ in range(rng.randint(0, 2))],
+        }
+        for _ in range(size)
+    ]
+
+
+def main(sizes) -> None:
+    print("| rules | aliases | load (s) | apply (µs/row) |")
+    print("| ----- | ------- | -------- | -------------- |")
+    for size in sizes:
+        rules = _catalogue(size)
+        rng = random.Random(-size)
+        rows = CORPUS + [
+            f"UPI/{rng.randint(10**11, 10**12)}/{rule['merchant']}/PAYMENT"
+            for rule in rng.sample(rules, 40)
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "merchants.json"
+            path.write_text(json.dumps({"merchants": rules}))
+            catalogue = MerchantRules(path=str(path), reload_s=3600)
+            start = time.perf_counter()
+            catalogue.refresh()
+            load = time.perf_counter() - start
+
+            best = float("inf")
+            for _ in range(REPEATS):
+                start = time.perf_counter()
+                for row in rows:
+                    catalogue.apply(row, blank_details())
+                best = min(best, time.perf_counter() - start)
+        print(f"| {size} | {len(catalogue)} | {load:.2f} | {best / len(rows) * 1e6:.1f} |")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
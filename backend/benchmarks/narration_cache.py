@@ -0,0 +1,80 @@
+"""Narration analysis cost per row with and without NarrationCache.
+
+Run from backend/:  python -m benchmarks.narration_cache [rows ...]
+
+Builds a salary-account statement: a month's repeating shapes (salary
+credit, rent, SIP, card bill, UPI spends at a few merchants), each row
+with its own reference and UPI digits. Times analyze_narration_details()
+over it and a fresh NarrationCache over it, best of three runs, in
+microseconds per row, and reports the cache's hit rates.
+"""
+
+import random
+import sys
+import time
+
+from app.enrichers.narration_cache import NarrationCache
+from app.enrichers.narration_enricher import analyze_narration_details
+
+DEFAULT_ROWS = (1_000, 10_000)
+REPEATS = 3
+
+_SHAPES = [
+    "NEFT/SALARY/ACME SOFTWARE PVT LTD/{month}",
+    "UPI/{n12}/Rent {month}/HDFC BANK/YBL{n10}",
+    "ACH D- NACH SIP MUTUAL FUND {n10}",
+    "CRED CLUB CC BILLPAY REF {n10}",
+    "UPI/{n12}/Payment from Phone/ICICI BANK/YBL{n10}",
+    "UPI/{n12}/SWIGGY/AXIS BANK/AXL{n8}",
+    "UPI/{n12}/ZOMATO/AXIS BANK/AXL{n8}",
+    "GROCERY BIGBASKET RRN {n12}",
+    "JIO RECHARGE UTR NO {n13}",
+    "ATM CASH WDL/SBI ATM/{n8}",
+    "INT PAID TILL 31-03-2024",
+]
+
+
+def _statement(rows: int) -> list[str]:
+    rng = random.Random(rows)
+
+    def digits(k: int) -> str:
+        return "".join(rng.choices("0123456789", k=k))
+
+    return [
+        rng.choice(_SHAPES).format(
+            month=rng.choice(["JAN24", "FEB24", "MAR24"]),
+            n8=digits(8), n10=digits(10), n12=digits(12), n13=digits(13),
+        )
+        for _ in range(rows)
+    ]
+
+
+def _per_row(make_fn, narrations) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        fn = make_fn()
+        start = time.perf_counter()
+        for narration in narrations:
+            fn(narration)
+        best = min(best, time.perf_counter() - start)
+    return best / len(narrations) * 1e6
+
+
+def main(sizes) -> None:
+    print("| rows | uncached (µs/row) | cached (µs/row) | exact hits | template hits |")
+    print("| ---- | ----------------- | --------------- | ---------- | ------------- |")
+    for rows in sizes:
+        narrations = _statement(rows)
+        uncached = _per_row(lambda: analyze_narration_details, narrations)
+        cached = _per_row(lambda: NarrationCache().details, narrations)
+        cache = NarrationCache()
+        for narration in narrations:
+            cache.details(narration)
+        print(
+            f"| {rows} | {uncached:.1f} | {cached:.1f} "
+            f"| {cache.hits / rows:.0%} | {cache.template_hits / rows:.0%} |"
+        )
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_ROWS)
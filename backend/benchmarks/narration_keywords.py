@@ -0,0 +1,57 @@
+"""Keyword lookup cost per narration as the keyword tables grow.
+
+Run from backend/:  python -m benchmarks.narration_keywords [keywords ...]
+
+Pads the enricher's keyword tables with synthetic merchant names and times
+one lookup over the test corpus two ways: the former ``kw in narration``
+scan over every keyword and KeywordAutomaton.find(). Best of three runs,
+in microseconds per narration.
+"""
+
+import random
+import string
+import sys
+import time
+
+from app.enrichers import narration_enricher
+from app.enrichers.keyword_automaton import KeywordAutomaton
+from tests.test_narration_enricher import CORPUS
+
+DEFAULT_SIZES = (100, 1_000, 10_000)
+REPEATS = 3
+
+
+def _keywords(size: int) -> list[str]:
+    base = list(narration_enricher._KEYWORDS.keywords)
+    rng = random.Random(size)
+    extra = {
+        "".join(rng.choices(string.ascii_uppercase, k=rng.randint(5, 12)))
+        for _ in range(max(0, size - len(base)))
+    }
+    return base + sorted(extra)
+
+
+def _per_row(fn, narrations) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for narration in narrations:
+            fn(narration)
+        best = min(best, time.perf_counter() - start)
+    return best / len(narrations) * 1e6
+
+
+def main(sizes) -> None:
+    narrations = [n.upper() for n in CORPUS] * 20
+    print("| keywords | scan (µs/row) | automaton (µs/row) |")
+    print("| -------- | ------------- | ------------------ |")
+    for size in sizes:
+        keywords = _keywords(size)
+        automaton = KeywordAutomaton(keywords)
+        scan = _per_row(lambda n: [kw for kw in keywords if kw in n], narrations)
+        find = _per_row(automaton.find, narrations)
+        print(f"| {len(keywords)} | {scan:.1f} | {find:.1f} |")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,50 @@
+"""Compare the PDF text backends on synthetic statements.
+
+Run from backend/:  python -m benchmarks.pdf_text_backends [pages ...]
+
+Times a full pass over every page's text (what a whole-document scan costs)
+and extract_pdf_metadata (what a request actually pays) for each backend in
+TEXT_BACKENDS, best of three runs.
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from app.models.analyzer import BankStatementAnalyzer
+from app.parsers.pdf_parser import TEXT_BACKENDS, extract_pdf_metadata, iter_page_texts
+from tests.pdf_factory import statement_pages, write_pdf
+
+DEFAULT_PAGE_COUNTS = (10, 50, 200)
+ROWS_PER_PAGE = 30
+REPEATS = 3
+
+
+def _best(fn) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(page_counts) -> None:
+    print("| pages | backend | all pages (s) | metadata (s) |")
+    print("| ----- | ------- | ------------- | ------------ |")
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in page_counts:
+            pdf = write_pdf(
+                Path(tmp) / f"{pages}.pdf", statement_pages(pages, ROWS_PER_PAGE)
+            )
+            path = str(pdf)
+            extract = BankStatementAnalyzer(path)._extract_metadata_from_text
+            for backend in TEXT_BACKENDS:
+                full = _best(lambda: sum(1 for _ in iter_page_texts(path, backend)))
+                meta = _best(lambda: extract_pdf_metadata(path, extract, backend))
+                print(f"| {pages} | {backend} | {full:.3f} | {meta:.3f} |")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_PAGE_COUNTS)
@@ -0,0 +1,150 @@
+"""Minimal PDF writer for parser tests: text lines plus tables.
+
+Tables are drawn with full grid lines by default so pdfplumber's lattice
+table finder picks them up the way it does on real bank statements; unruled
+tables stand in for plain fixed-column text layouts. A page with ``image``
+gets a full-page greyscale picture, the way a scanner writes it.
+"""
+
+from pathlib import Path
+
+PAGE_WIDTH = 612
+PAGE_HEIGHT = 792
+ROW_HEIGHT = 16
+FONT_SIZE = 8
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _page_stream(lines, table, col_widths, ruled=True, left=36, top=756) -> bytes:
+    ops = []
+    y = top
+    for line in lines:
+        ops.append(f"BT /F1 {FONT_SIZE + 2} Tf {left} {y} Td ({_escape(line)}) Tj ET")
+        y -= ROW_HEIGHT
+    if table:
+        y -= ROW_HEIGHT // 2
+        xs = [left]
+        for width in col_widths:
+            xs.append(xs[-1] + width)
+        # a cell with "\n" wraps onto extra text lines inside one taller row
+        heights = [
+            ROW_HEIGHT * max(str(cell or "").count("\n") + 1 for cell in row)
+            for row in table
+        ]
+        row_tops = [y]
+        for height in heights:
+            row_tops.append(row_tops[-1] - height)
+        if ruled:
+            for ry in row_tops:
+                ops.append(f"{xs[0]} {ry} m {xs[-1]} {ry} l S")
+            for x in xs:
+                ops.append(f"{x} {row_tops[0]} m {x} {row_tops[-1]} l S")
+        for r, row in enumerate(table):
+            for c, cell in enumerate(row):
+                for k, part in enumerate(str(cell or "").split("\n")):
+                    if part:
+                        ty = row_tops[r] - ROW_HEIGHT * (k + 1) + 5
+                        ops.append(
+                            f"BT /F1 {FONT_SIZE} Tf {xs[c] + 2} {ty} Td ({_escape(part)}) Tj ET"
+                        )
+    return "\n".join(ops).encode("latin-1")
+
+
+def write_pdf(path, pages, col_widths=(70, 250, 70, 70, 80), ruled=True) -> Path:
+    """Write ``pages`` — a list of ``{"lines": [...], "table": [[...], ...]}``.
+
+    Either key may be missing; a page with neither is blank. ``"image": True``
+    adds a full-page image under any text, ``"col_widths"`` overrides the
+    column widths for that page. ``ruled=False`` leaves out the grid
+    lines: a plain fixed-column text layout.
+    """
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page ids are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    for page in pages:
+        stream = _page_stream(
+            page.get("lines", []), page.get("table"), page.get("col_widths", col_widths), ruled
+        )
+        xobjects = ""
+        if page.get("image"):
+            objects.append(
+                b"<< /Type /XObject /Subtype /Image /Width 8 /Height 8 "
+                b"/ColorSpace /DeviceGray /BitsPerComponent 8 /Length 64 >>\n"
+                b"stream\n" + bytes(range(0, 256, 4)) + b"\nendstream"
+            )
+            xobjects = f" /XObject << /Im1 {len(objects)} 0 R >>"
+            stream = (
+                f"q {PAGE_WIDTH} 0 0 {PAGE_HEIGHT} 0 0 cm /Im1 Do Q\n".encode() + stream
+            )
+        objects.append(
+            b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+        )
+        content_id = len(objects)
+        objects.append(
+            (
+                f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+                f"/Resources << /Font << /F1 3 0 R >>{xobjects} >> /Contents {content_id} 0 R >>"
+            ).encode()
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{i} 0 R" for i in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    path = Path(path)
+    path.write_bytes(bytes(out))
+    return path
+
+
+HEADER = ["Date", "Narration", "Debit", "Credit", "Balance"]
+
+
+def statement_pages(page_count, rows_per_page=20, header_every_page=False):
+    """Pages of a synthetic statement; only page 1 repeats the header unless
+    ``header_every_page`` — later pages are continuation tables."""
+    pages = []
+    balance = 100000.0
+    n = 0
+    for p in range(page_count):
+        table = [HEADER] if p == 0 or header_every_page else []
+        for _ in range(rows_per_page):
+            n += 1
+            debit = float(n % 90 + 10)
+            balance -= debit
+            table.append(
+                [
+                    f"{n % 28 + 1:02d}/{n // 28 % 12 + 1:02d}/2024",
+                    f"UPI/{400000000000 + n}/Shop{n % 9}/HDFC",
+                    f"{debit:.2f}",
+                    "",
+                    f"{balance:.2f}",
+                ]
+            )
+        lines = []
+        if p == 0:
+            lines = [
+                "HDFC BANK LTD",
+                "Account Name: JOHN DOE",
+                "Account No: 50100123456789",
+                "IFSC: HDFC0001234",
+            ]
+        pages.append({"lines": lines, "table": table})
+    return pages
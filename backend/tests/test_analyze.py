@@ -97,3 +97,26 @@ async def test_analyze_transactions_have_required_fields(client):
         assert "amount" in txn
         assert "transaction_type" in txn
         assert "confidence_score" in txn
+
+
+async def test_analyze_rejects_unknown_encoding(client):
+    response = await client.post(
+        "/api/analyze/bank/statement?encoding=not-a-codec",
+        files={"file": ("s.csv", b"Date,Narration,Amount\n", "text/csv")},
+    )
+    assert response.status_code == 400
+    assert "not-a-codec" in response.json()["detail"]
+
+
+async def test_analyze_encoding_override(client):
+    csv_content = (
+        "Date;Narration;Debit;Credit;Balance\n"
+        "01/01/2025;UPI/12345/Café Noir;100.00;;4900.00\n"
+    ).encode("cp1252")
+    response = await client.post(
+        "/api/analyze/bank/statement?encoding=cp1252",
+        files={"file": ("legacy.csv", csv_content, "text/csv")},
+    )
+    assert response.status_code == 200
+    txns = response.json()["result"]["transactions"]
+    assert txns[0]["narration"] == "UPI/12345/Café Noir"
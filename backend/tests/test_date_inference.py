@@ -0,0 +1,63 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from app.parsers.excel_parser import (
+    DATE_FORMATS,
+    DATETIME_FORMAT,
+    infer_date_format,
+    normalize_date,
+    normalize_date_series,
+)
+
+# normalize_date's own pd.to_datetime fallback warns on dayfirst-looking input.
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+_FORMATS = [DATETIME_FORMAT, *DATE_FORMATS, "%d.%m.%Y", "%d %b %Y", "%Y/%m/%d"]
+
+formatted_dates = st.builds(
+    lambda dt, fmt: dt.strftime(fmt),
+    st.datetimes(min_value=datetime(1950, 1, 1), max_value=datetime(2060, 12, 31)),
+    st.sampled_from(_FORMATS),
+)
+date_cells = st.one_of(
+    formatted_dates,
+    formatted_dates.map(lambda s: f"  {s} "),
+    st.sampled_from(["", "31/02/2024", "5-1-2024", "2024-1-5", "05-JAN-24", "N/A", "x"]),
+    st.none(),
+)
+
+
+@settings(max_examples=150, deadline=None)
+@given(st.lists(date_cells, max_size=15), st.sampled_from([None, *_FORMATS[:7]]))
+def test_series_matches_scalar(cells, date_format):
+    series = pd.Series(cells, dtype=object)
+    normalized, _ = normalize_date_series(series, date_format)
+    expected = [
+        normalize_date(cell.strip()) if isinstance(cell, str) else None
+        for cell in cells
+    ]
+    assert normalized.tolist() == expected
+
+
+@pytest.mark.parametrize(
+    "values, expected",
+    [
+        (["05/01/2024", "17/01/2024", "31/01/2024"], "%d/%m/%Y"),
+        (["05-Jan-24", "17-Jan-24"], "%d-%b-%y"),
+        (["2024-01-05", "2024-01-17", "bad"], "%Y-%m-%d"),
+        (["2024-01-05 00:00:00"], DATETIME_FORMAT),
+        (["not a date", None, ""], None),
+    ],
+)
+def test_infer_date_format(values, expected):
+    assert infer_date_format(values) == expected
+
+
+def test_series_reports_detected_format():
+    normalized, fmt = normalize_date_series(pd.Series(["05/01/2024", None, "06/01/2024"]))
+    assert fmt == "%d/%m/%Y"
+    assert normalized.tolist() == ["2024-01-05", None, "2024-01-06"]
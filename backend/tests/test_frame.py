@@ -0,0 +1,125 @@
+import math
+
+import numpy as np
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from app.models.frame import TransactionFrame, as_frame
+from app.models.record import TransactionRecord
+from app.models.schemas import Transaction
+from app.parsers.excel_parser import dedup_key, deduplicate_transactions
+from app.scorers.confidence_scorer import calculate_confidence_score, score_frame
+
+TXNS = [
+    {
+        "transaction_date": "2025-01-05",
+        "transaction_type": "DEBIT",
+        "amount": 1200.0,
+        "narration": "Amazon order",
+        "merchant": "AMAZON",
+        "category": ["E-COMMERCE", "RETAIL"],
+    },
+    {
+        "transaction_date": None,
+        "transaction_type": "cr",
+        "amount": None,
+        "narration": "",
+        "merchant": None,
+        "category": [],
+        "receiver_details": {"name": "Ravi", "account": None, "vpa": None},
+    },
+    {
+        "transaction_date": "2025-01-07",
+        "transaction_type": "DEBIT",
+        "amount": 300.0,
+        "narration": "Swiggy",
+        "merchant": "SWIGGY",
+        "category": ["RETAIL"],
+    },
+]
+
+
+def test_typed_columns():
+    frame = TransactionFrame(TXNS)
+    assert np.isnan(frame.amount[1])
+    assert frame.is_credit.tolist() == [False, True, False]
+    assert frame.merchant_codes.tolist() == [0, -1, 1]
+    assert frame.merchants == ["AMAZON", "SWIGGY"]
+    assert frame.category_rows.tolist() == [0, 0, 2]
+    assert [frame.categories[c] for c in frame.category_codes] == [
+        "E-COMMERCE", "RETAIL", "RETAIL",
+    ]
+    assert frame.parsed_dates.isna().tolist() == [False, True, False]
+    assert frame.receiver_names == [None, "Ravi", None]
+
+
+def test_category_totals_in_first_seen_order():
+    frame = TransactionFrame(TXNS)
+    debit = ~frame.is_credit
+    assert frame.category_totals(debit, frame.amount) == {
+        "E-COMMERCE": (1200.0, 1),
+        "RETAIL": (1500.0, 2),
+    }
+    everything = np.ones(3, dtype=bool)
+    totals = frame.category_totals(everything, np.ones(3), empty="Other")
+    assert list(totals) == ["E-COMMERCE", "RETAIL", "Other"]
+    assert totals["Other"] == (1.0, 1)
+
+
+def test_same_columns_from_records_and_models():
+    records = [TransactionRecord(**txn) for txn in TXNS]
+    models = [Transaction(**txn) for txn in TXNS]
+    expected = TransactionFrame(TXNS)
+    for frame in (TransactionFrame(records), TransactionFrame(models)):
+        assert frame.column("merchant") == expected.column("merchant")
+        assert frame.category_rows.tolist() == expected.category_rows.tolist()
+        assert frame.has_receiver.tolist() == expected.has_receiver.tolist()
+
+
+def test_to_dicts_and_as_frame():
+    records = [TransactionRecord(**txn) for txn in TXNS]
+    frame = as_frame(records)
+    assert as_frame(frame) is frame
+    assert all(type(txn) is dict for txn in frame.to_dicts())
+    assert TransactionFrame([]).to_dicts() == []
+
+
+transactions = st.lists(
+    st.fixed_dictionaries(
+        {
+            "transaction_date": st.sampled_from([None, "", "2025-01-01", "2025-01-02"]),
+            "transaction_type": st.sampled_from([None, "", "DEBIT", "CR"]),
+            "amount": st.sampled_from([None, 0, 0.0, -4.5, 10.0, 10, 99.99]),
+            "narration": st.sampled_from(["", "abc", "  ab  ", "UPI/123/SHOP"]),
+            "balance": st.sampled_from([None, 0.0, 5.0]),
+            "receiver_details": st.sampled_from(
+                [{}, {"name": "A"}, {"account": "12"}, {"vpa": None}]
+            ),
+        }
+    ),
+    max_size=30,
+)
+
+
+@settings(max_examples=200, deadline=None)
+@given(transactions)
+def test_scores_match_per_row_scorer(txns):
+    expected = [calculate_confidence_score(txn) for txn in txns]
+    assert score_frame(TransactionFrame(txns)) == expected
+
+
+@settings(max_examples=200, deadline=None)
+@given(transactions)
+def test_dedup_matches_key_set(txns):
+    seen, expected = set(), []
+    for txn in txns:
+        if dedup_key(txn) not in seen:
+            seen.add(dedup_key(txn))
+            expected.append(txn)
+    assert [id(t) for t in deduplicate_transactions(txns)] == [id(t) for t in expected]
+
+
+def test_string_amount_is_not_numeric():
+    frame = TransactionFrame([{"amount": "12.5"}, {"amount": math.inf}])
+    assert np.isnan(frame.amount[0])
+    assert frame.amount[1] == math.inf
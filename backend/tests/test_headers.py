@@ -0,0 +1,112 @@
+import pandas as pd
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from app.parsers.excel_parser import (
+    detect_header_row,
+    find_header,
+    normalize_columns,
+    resolve_columns,
+)
+from app.parsers.headers import clean_column_name
+from app.parsers.ingest import frame_from_grid
+from app.parsers.pdf_parser import looks_like_header
+
+# The scans the shared detector replaced, kept as oracles.
+_TABULAR_KEYWORDS = [
+    "date", "transaction_date", "value_date", "description", "narration",
+    "remark", "particulars", "credit", "debit", "balance", "amount",
+    "txn_type", "type", "chq_no", "cheque_number", "withdrawals", "deposits",
+]
+_PDF_KEYWORDS = {
+    "date", "narration", "description", "debit", "credit", "amount", "balance",
+    "particulars", "withdrawal", "deposit", "txn", "transaction", "ref",
+    "details", "chq",
+}
+
+
+def _legacy_clean(col):
+    if not isinstance(col, str):
+        col = str(col)
+    return (
+        col.strip().lower().replace(" ", "_").replace(".", "").replace("/", "_")
+        .replace("\\", "_").replace("-", "_")
+    )
+
+
+def _legacy_detect_header_row(df_raw, max_rows_to_check=20):
+    for i in range(min(max_rows_to_check, len(df_raw))):
+        match_count = 0
+        for cell in df_raw.iloc[i]:
+            if isinstance(cell, str):
+                cleaned = _legacy_clean(cell)
+                if any(keyword in cleaned for keyword in _TABULAR_KEYWORDS):
+                    match_count += 1
+        if match_count >= 2:
+            return i
+    return 0
+
+
+def _legacy_looks_like_header(row):
+    if not row:
+        return False
+    row_text = " ".join(str(cell).lower() for cell in row if cell)
+    return any(kw in row_text for kw in _PDF_KEYWORDS)
+
+
+_FRAGMENTS = [
+    "Date", "Txn Date", "Value-Date", "Narration", "Chq./Ref.No.", "Withdrawal Amt.",
+    "Deposit", "Closing Balance", "Dr/Cr", "Type", "Remarks", "HDFC BANK", "12/01/2024",
+    "UPI/123/Shop", "1,200.00", "", " ", "Account No", "Particulars", "TXN",
+    "De.bit", "cheque number", "\\", "-", "Unnamed: 3",
+]
+cells = st.one_of(
+    st.lists(st.sampled_from(_FRAGMENTS), max_size=3).map(" ".join),
+    st.text(max_size=8),
+    st.floats(allow_nan=True),
+    st.none(),
+)
+rows = st.lists(cells, max_size=7)
+
+
+@settings(max_examples=300, deadline=None)
+@given(st.one_of(cells, st.integers()))
+def test_clean_matches_legacy(cell):
+    assert clean_column_name(cell) == _legacy_clean(cell)
+
+
+@settings(max_examples=300, deadline=None)
+@given(rows)
+def test_pdf_header_matches_legacy(row):
+    assert looks_like_header(row) == _legacy_looks_like_header(row)
+
+
+@settings(max_examples=200, deadline=None)
+@given(st.lists(rows, min_size=1, max_size=25))
+def test_header_row_and_roles_match_legacy(grid_rows):
+    width = max(len(r) for r in grid_rows)
+    raw = pd.DataFrame([r + [""] * (width - len(r)) for r in grid_rows], dtype=object)
+
+    header = find_header(raw)
+    assert header.index == detect_header_row(raw) == _legacy_detect_header_row(raw)
+    df = normalize_columns(frame_from_grid(raw, header.index))
+    assert header.labels == list(df.columns)
+    assert header.roles == resolve_columns(df.columns)
+
+
+def test_header_score():
+    raw = pd.DataFrame(
+        [
+            ["HDFC BANK LTD", "", "", ""],
+            ["Date", "Narration", "Withdrawal Amt.", "Closing Balance"],
+        ]
+    )
+    header = find_header(raw)
+    assert (header.index, header.score) == (1, 0.75)  # "withdrawal" isn't a keyword
+    assert header.roles["date"] == "date"
+    assert header.roles["balance"] == "closing_balance"
+
+
+def test_no_header_defaults_to_first_row():
+    header = find_header(pd.DataFrame([["a", "b"], ["c", "d"]]))
+    assert (header.index, header.score) == (0, 0.0)
@@ -0,0 +1,145 @@
+from datetime import date, datetime, time
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+from app.models.analyzer import BankStatementAnalyzer
+from app.parsers import ingest
+from app.parsers.ingest import (
+    frame_from_grid,
+    iter_csv_rows,
+    iter_xlsx_rows,
+    read_raw_grid,
+    sniff_csv,
+)
+
+PREAMBLE_CSV = (
+    "HDFC BANK LTD,,,\n"
+    "Account No: 50100123456789,,,\n"
+    "\n"
+    "Date,Narration,Debit,Credit,Balance\n"
+    "01/01/2024,UPI/123456789012/Swiggy/HDFC/REF1,450.00,,10000.00\n"
+    "\n"
+    "02/01/2024,NEFT CR-SALARY,NA,50000.00,60000.00\n"
+)
+
+
+@pytest.fixture
+def preamble_csv(tmp_path):
+    path = tmp_path / "statement.csv"
+    path.write_text(PREAMBLE_CSV)
+    return str(path)
+
+
+def test_frame_from_grid_uses_detected_header(preamble_csv):
+    raw_df = read_raw_grid(preamble_csv)
+    df = frame_from_grid(raw_df, 3)
+    assert df.columns.tolist() == ["Date", "Narration", "Debit", "Credit", "Balance"]
+    assert len(df) == 2  # blank line dropped
+    assert pd.isna(df.loc[1, "Debit"])  # "NA" token → NaN, as read_csv did
+
+
+def test_frame_from_grid_labels_blank_and_duplicate_headers():
+    raw_df = pd.DataFrame([["Date", "", "Balance", "Balance"], ["x", "y", "1", "2"]])
+    df = frame_from_grid(raw_df, 0)
+    assert df.columns.tolist() == ["Date", "Unnamed: 1", "Balance", "Balance.1"]
+
+
+def test_frame_from_grid_empty_grid():
+    df = frame_from_grid(pd.DataFrame(), 0)
+    assert df.empty
+    assert list(df.columns) == []
+
+
+def test_csv_is_decoded_once(preamble_csv, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("statement file re-read")
+
+    monkeypatch.setattr(pd, "read_csv", fail)
+    result = BankStatementAnalyzer(preamble_csv).extract_transactions()
+    assert result["status_code"] == 200
+    assert len(result["result"]["transactions"]) == 2
+    assert result["result"]["account_info"]["statement_period"] == {
+        "from": "2024-01-01",
+        "to": "2024-01-02",
+    }
+
+
+def test_sniff_csv_encoding_and_delimiter():
+    assert sniff_csv(b"\xef\xbb\xbfDate,Narration\n1,2\n") == ("utf-8-sig", ",")
+    assert sniff_csv(b"Date;Narration;Amount\n01/01;A, B;1,5\n02/01;C;2\n") == (
+        "utf-8-sig",
+        ";",
+    )
+    assert sniff_csv("Date\tNarration\nx\tCafé\n".encode("cp1252")) == ("latin-1", "\t")
+    assert sniff_csv(b"Date,Narration\n", encoding="cp1252") == ("cp1252", ",")
+
+
+def test_sniff_csv_ignores_character_split_at_sample_end():
+    prefix = "Date,Narration\n01/01,₹".encode("utf-8")[:-1]
+    assert sniff_csv(prefix)[0] == "utf-8-sig"
+
+
+def test_csv_read_once_falls_back_when_body_breaks_sniffed_encoding(
+    tmp_path, monkeypatch
+):
+    monkeypatch.setattr(ingest, "_SNIFF_BYTES", 16)
+    path = tmp_path / "late.csv"
+    path.write_bytes(b"Date,Narration\n01/01/2024,Caf\xe9\n")
+
+    opened = []
+    real_open = open
+    monkeypatch.setattr(
+        "builtins.open", lambda *a, **k: opened.append(a[0]) or real_open(*a, **k)
+    )
+    raw_df = read_raw_grid(str(path))
+    assert opened == [str(path)]
+    assert raw_df.iloc[1, 1] == "Café"
+
+
+def test_iter_csv_rows_semicolon(tmp_path):
+    path = tmp_path / "semi.csv"
+    path.write_text("Date;Narration;Amount\n01/01/2024;NEFT, SALARY;10\n")
+    assert list(iter_csv_rows(str(path))) == [
+        ["Date", "Narration", "Amount"],
+        ["01/01/2024", "NEFT, SALARY", "10"],
+    ]
+
+
+XLSX_ROWS = [
+    ["HDFC BANK LTD", None, None],
+    [None, None, None],
+    ["Date", "Narration", "Debit", None, None],
+    [datetime(2024, 1, 5), "UPI/1", 450.0],
+    [date(2024, 1, 6), "NA", 1.5, None, "note"],
+    ["n/a", "", 3, "#N/A"],
+    [True, "None", 1e20, -0.0],
+    [time(10, 5), 7, "=1+1"],
+    [None, None, None],
+]
+
+
+def test_xlsx_grid_matches_read_excel(tmp_path):
+    path = tmp_path / "statement.xlsx"
+    wb = Workbook()
+    for row in XLSX_ROWS:
+        wb.active.append(row)
+    wb.create_sheet("second").append(["ignored"])
+    wb.active = 1
+    wb.save(path)
+
+    expected = pd.read_excel(path, header=None, dtype=str)
+    pd.testing.assert_frame_equal(read_raw_grid(str(path)), expected)
+
+
+def test_xlsx_rows_are_read_lazily(tmp_path):
+    path = tmp_path / "statement.xlsx"
+    wb = Workbook()
+    for i in range(1000):
+        wb.active.append(["01/01/2024", f"row {i}", i + 0.5])
+    wb.save(path)
+
+    rows = iter_xlsx_rows(str(path))
+    assert next(rows) == ["01/01/2024", "row 0", "0.5"]
+    rows.close()  # releases the workbook without reading the rest
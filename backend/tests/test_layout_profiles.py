@@ -0,0 +1,154 @@
+import pytest
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, create_engine
+
+from app.models.analyzer import BankStatementAnalyzer
+from app.parsers import excel_parser
+from app.enrichers.narration_cache import narration_cache
+from app.services.layout_profiles import LayoutProfileStore, layout_profiles
+from tests.pdf_factory import statement_pages, write_pdf
+
+CSV = (
+    "HDFC BANK LTD,,,\n"
+    "Date,Narration,Debit,Credit,Balance\n"
+    "01/02/2024,UPI/1234/Shop/HDFC,100.00,,900.00\n"
+    "02/02/2024,NEFT/SALARY,,5000.00,5900.00\n"
+)
+
+
+@pytest.fixture
+def statement(tmp_path):
+    path = tmp_path / "statement.csv"
+    path.write_text(CSV)
+    return str(path)
+
+
+@pytest.fixture
+def resolve_calls(monkeypatch):
+    calls = []
+    real = excel_parser.resolve_columns
+
+    def spy(columns):
+        calls.append(list(columns))
+        return real(columns)
+
+    monkeypatch.setattr(excel_parser, "resolve_columns", spy)
+    return calls
+
+
+def test_hit_skips_detection(statement, resolve_calls):
+    store = LayoutProfileStore()
+    first = BankStatementAnalyzer(statement, layout_profiles=store).extract_transactions()
+    second = BankStatementAnalyzer(statement, layout_profiles=store).extract_transactions()
+
+    assert len(resolve_calls) == 1
+    assert second == first
+    assert store.stats() == {
+        "hits": 1,
+        "misses": 1,
+        "hit_rate": 0.5,
+        "cached_profiles": 1,
+    }
+
+
+def test_cached_result_matches_uncached(statement):
+    store = LayoutProfileStore()
+    expected = BankStatementAnalyzer(statement).extract_transactions()
+    for _ in range(2):
+        assert (
+            BankStatementAnalyzer(statement, layout_profiles=store).extract_transactions()
+            == expected
+        )
+
+
+def test_stream_uses_profile(statement, resolve_calls):
+    store = LayoutProfileStore()
+    BankStatementAnalyzer(statement, layout_profiles=store).extract_transactions()
+    events = list(
+        BankStatementAnalyzer(statement, layout_profiles=store).stream_transactions()
+    )
+    assert len(resolve_calls) == 1
+    assert events[-1]["date_format"] == "%d/%m/%Y"
+
+
+def test_missing_columns_not_cached(tmp_path):
+    path = tmp_path / "bad.csv"
+    path.write_text("Foo,Bar\n1,2\n")
+    store = LayoutProfileStore()
+    result = BankStatementAnalyzer(str(path), layout_profiles=store).extract_transactions()
+    assert result["status_code"] == 400
+    assert store.stats()["cached_profiles"] == 0
+
+
+def test_pdf_profile_reused(tmp_path):
+    path = str(write_pdf(tmp_path / "s.pdf", statement_pages(3, rows_per_page=5)))
+    store = LayoutProfileStore()
+    first = BankStatementAnalyzer(path, layout_profiles=store).extract_transactions()
+    second = BankStatementAnalyzer(path, layout_profiles=store).extract_transactions()
+
+    assert second == first
+    # one header across all pages: one lookup per document
+    assert (store.misses, store.hits) == (1, 1)
+
+
+def test_profiles_persist_in_sqlite(statement, resolve_calls):
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+
+    writer = LayoutProfileStore()
+    writer.attach(engine)
+    BankStatementAnalyzer(statement, layout_profiles=writer).extract_transactions()
+
+    reader = LayoutProfileStore()  # fresh process: empty memory tier
+    reader.attach(engine)
+    BankStatementAnalyzer(statement, layout_profiles=reader).extract_transactions()
+
+    assert len(resolve_calls) == 1
+    assert reader.hits == 1
+
+
+def test_database_errors_fall_back_to_memory(statement):
+    store = LayoutProfileStore()
+    store.attach(create_engine("sqlite://"))  # no tables
+    result = BankStatementAnalyzer(statement, layout_profiles=store).extract_transactions()
+    assert result["status_code"] == 200
+    assert store.get(next(iter(store._cache))) is not None
+
+
+def test_lru_eviction():
+    store = LayoutProfileStore(max_entries=2)
+    for sig in ("a", "b"):
+        store.put(sig, "tabular", {"roles": {}, "date_format": None})
+    store.get("a")
+    store.put("c", "tabular", {"roles": {}, "date_format": None})
+
+    assert store.get("b") is None
+    assert store.get("a") is not None
+    assert store.get("c") is not None
+
+
+async def test_metrics_endpoint(client):
+    layout_profiles.clear()
+    narration_cache.clear()
+    resp = await client.get("/api/metrics")
+    assert resp.status_code == 200
+    assert resp.json() == {
+        "layout_profiles": {
+            "hits": 0,
+            "misses": 0,
+            "hit_rate": 0.0,
+            "cached_profiles": 0,
+        },
+        "narration_cache": {
+            "hits": 0,
+            "template_hits": 0,
+            "misses": 0,
+            "hit_rate": 0.0,
+            "cached_narrations": 0,
+            "cached_templates": 0,
+        },
+    }
@@ -0,0 +1,118 @@
+import json
+import os
+import time
+
+import pytest
+
+from app.enrichers import narration_grammars
+from app.enrichers.keyword_automaton import KeywordAutomaton
+from app.enrichers.merchant_rules import MerchantRules, compile_rules
+from app.enrichers.narration_enricher import analyze_narration_details, blank_details
+
+RULES = [
+    {"merchant": "DMART", "category": "Groceries", "aliases": ["D MART", "AVENUE SUPERMARTS"]},
+    {"merchant": "OLA", "category": "TRANSPORT"},
+    {"merchant": "OLA ELECTRIC", "category": "Travel"},
+]
+
+
+def _write(path, rules):
+    path.write_text(json.dumps({"merchants": rules}))
+
+
+def test_find_words_respects_word_boundaries():
+    automaton = KeywordAutomaton(["OLA", "OLA ELECTRIC", "7-ELEVEN", "@YBL"])
+    assert automaton.find_words("COLA OLA ELECTRICALS") == {"OLA"}
+    assert automaton.find_words("OLA ELECTRIC/7-ELEVEN") == {"OLA", "OLA ELECTRIC", "7-ELEVEN"}
+    assert automaton.find_words("ravi@YBL") == {"@YBL"}
+    assert automaton.find_words("") == set()
+
+
+def test_apply_fills_only_what_the_enricher_left_empty():
+    rules = MerchantRules(path="")
+    rules.load(RULES)
+    details = rules.apply("upi/avenue supermarts/pune", blank_details())
+    assert (details["merchant"], details["category"]) == ("DMART", ["Groceries"])
+
+    # The longest alias wins; category codes map to canonical labels.
+    assert rules.apply("OLA ELECTRIC SCOOTER", blank_details())["merchant"] == "OLA ELECTRIC"
+    assert rules.apply("OLA CABS", blank_details())["category"] == ["Travel"]
+
+    known = analyze_narration_details("AMAZON D MART")
+    assert rules.apply("AMAZON D MART", dict(known)) == known
+
+    # Another merchant's category is never attached to the enricher's one.
+    named = {**blank_details(), "merchant": "SWIGGY"}
+    assert rules.apply("SWIGGY D MART", dict(named))["category"] == []
+    named = {**blank_details(), "merchant": "DMART"}
+    details = rules.apply("OLA AVENUE SUPERMARTS", dict(named))
+    assert (details["merchant"], details["category"]) == ("DMART", ["Groceries"])
+
+
+def test_unknown_category_is_rejected():
+    with pytest.raises(ValueError, match="rule 0"):
+        compile_rules([{"merchant": "X", "category": "Snacks"}])
+
+
+def test_hot_reload(tmp_path):
+    path = tmp_path / "merchants.json"
+    _write(path, RULES[:1])
+    rules = MerchantRules(path=str(path), reload_s=0)
+    assert rules.refresh() is True
+    assert rules.apply("DMART", blank_details())["merchant"] == "DMART"
+    assert rules.apply("OLA CABS", blank_details())["merchant"] is None
+    assert rules.refresh() is False  # unchanged
+
+    _write(path, RULES)
+    assert rules.apply("OLA CABS", blank_details())["merchant"] is None  # lookup only
+    assert rules.refresh() is True
+    assert rules.apply("OLA CABS", blank_details())["merchant"] == "OLA"
+
+    # A broken file (caught half-written) keeps the rules already loaded,
+    # and is read again even if it then completes with the same mtime/size.
+    complete = json.dumps({"merchants": RULES[:1]})
+    path.write_text(complete[:20].ljust(len(complete)))
+    os.utime(path, ns=(1, 1))
+    assert rules.refresh() is False
+    assert rules.apply("OLA CABS", blank_details())["merchant"] == "OLA"
+    path.write_text(complete)
+    os.utime(path, ns=(1, 1))
+    assert rules.refresh() is True
+    assert rules.apply("OLA CABS", blank_details())["merchant"] is None
+
+
+def test_watcher_reloads_in_the_background(tmp_path):
+    path = tmp_path / "merchants.json"
+    _write(path, RULES[:1])
+    rules = MerchantRules(path=str(path), reload_s=0.01)
+    rules.start()
+    try:
+        assert len(rules) > 0  # loaded before start() returns
+        _write(path, RULES)
+        deadline = time.monotonic() + 5
+        while rules.apply("OLA CABS", blank_details())["merchant"] is None:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+    finally:
+        rules.stop()
+    assert rules._watcher is None
+
+
+def test_grammars_apply_the_catalogue(monkeypatch):
+    rules = MerchantRules(path="")
+    rules.load(RULES)
+    monkeypatch.setattr(narration_grammars, "merchant_rules", rules)
+    details = narration_grammars.GENERIC.details("POS 4123XXXXXXXX1234 D MART PUNE")
+    assert details["merchant"] == "DMART"
+    assert details["category"] == ["Groceries"]
+    hdfc = narration_grammars.GRAMMARS["HDFC"]
+    assert hdfc.details("UPI-DMART-dmart@ybl-YESB0000001-412345678901-")["category"] == [
+        "Groceries"
+    ]
+
+
+def test_example_catalogue_loads():
+    path = os.path.join(os.path.dirname(__file__), "..", "merchant_rules.example.json")
+    with open(path, encoding="utf-8") as f:
+        automaton, by_alias = compile_rules(json.load(f)["merchants"])
+    assert by_alias["AVENUE SUPERMARTS"][:2] == ("DMART", "Groceries")
@@ -0,0 +1,99 @@
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from app.enrichers.narration_cache import NarrationCache, masked_runs
+from app.enrichers.narration_enricher import analyze_narration_details
+from tests import legacy_narration
+from tests.test_narration_enricher import CORPUS, _EDGE_FRAGMENTS, _FRAGMENTS
+
+SALARY = [
+    "NEFT/SALARY/ACME SOFTWARE PVT LTD/JAN24",
+    "UPI/412345678901/Payment from Phone/HDFC BANK/YBL1234567890",
+    "UPI/498765432109/Payment from Phone/HDFC BANK/YBL9876543210",
+    "IMPS/412345678901/RAVI KUMAR/ICICI BANK/REF",
+    "IMPS/487654321098/RAVI KUMAR/ICICI BANK/REF",
+    "GROCERY BIGBASKET RRN 123456789012",
+    "GROCERY BIGBASKET RRN 987654321098",
+]
+
+
+def test_tiers_and_stats():
+    cache = NarrationCache(max_entries=16)
+    for narration in SALARY + SALARY:
+        assert cache.details(narration) == analyze_narration_details(narration)
+    assert cache.stats() == {
+        "hits": 7,
+        "template_hits": 3,
+        "misses": 4,
+        "hit_rate": 0.7143,
+        "cached_narrations": 7,
+        "cached_templates": 4,
+    }
+    cache.clear()
+    assert cache.stats()["cached_narrations"] == cache.stats()["misses"] == 0
+
+
+def test_refills_digits_from_the_narration():
+    cache = NarrationCache(max_entries=16)
+    cache.details(SALARY[1])
+    details = cache.details(SALARY[2])
+    assert details["upi_id"] == "498765432109"
+    assert details["transaction_reference"] == "YBL9876543210"
+    assert cache.template_hits == 1
+
+
+def test_results_are_not_shared():
+    cache = NarrationCache(max_entries=16)
+    first = cache.details(SALARY[0])
+    first["remarks"].append("EDITED")
+    first["receiver_details"]["name"] = "EDITED"
+    second = cache.details(SALARY[0])
+    assert second == analyze_narration_details(SALARY[0])
+    assert second["remarks"] is not cache.details(SALARY[0])["remarks"]
+
+
+def test_lru_eviction():
+    cache = NarrationCache(max_entries=2)
+    for narration in ("CASH DEP BY SELF", "DIVIDEND TCS LTD", "CASH DEP BY SELF", "TAX PAID"):
+        cache.details(narration)
+    assert list(cache._exact) == ["CASH DEP BY SELF", "TAX PAID"]
+
+
+def test_disabled_cache_analyzes_every_row():
+    cache = NarrationCache(max_entries=0)
+    cache.details(SALARY[0])
+    cache.details(SALARY[0])
+    assert cache.stats()["hits"] == cache.stats()["misses"] == 0
+
+
+def test_masked_runs_follow_keyword_digits():
+    assert masked_runs(["UPI", "IMPS/P2M"]).pattern == "[0-9]{2,}"
+    assert masked_runs(["7 ELEVEN"]) is None
+    assert masked_runs(["HDFC"]).pattern == "[0-9]{1,}"
+
+
+_DIGITS = st.text(alphabet="0123456789", min_size=1, max_size=14)
+narration_shapes = st.lists(
+    st.one_of(st.sampled_from(_FRAGMENTS + _EDGE_FRAGMENTS), _DIGITS), max_size=10
+)
+
+
+@settings(max_examples=500, deadline=None)
+@given(narration_shapes, st.randoms(use_true_random=False))
+def test_template_hits_match_legacy(parts, rng):
+    """Narrations sharing a shape but not their digits, through one cache."""
+    cache = NarrationCache(max_entries=64)
+    for _ in range(4):
+        narration = "".join(
+            "".join(rng.choice("0123456789") for _ in part) if part.isdigit() else part
+            for part in parts
+        )
+        expected = legacy_narration.analyze_narration_details(narration)
+        assert cache.details(narration) == expected
+
+
+def test_corpus_matches_legacy():
+    cache = NarrationCache(max_entries=64)
+    for narration in CORPUS + CORPUS:
+        expected = legacy_narration.analyze_narration_details(narration)
+        assert cache.details(narration) == expected, narration
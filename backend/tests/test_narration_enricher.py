@@ -0,0 +1,125 @@
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from app.enrichers.keyword_automaton import KeywordAutomaton
+from app.enrichers.narration_enricher import (
+    analyze_narration_details,
+    extract_possible_account_numbers,
+)
+from tests import legacy_narration
+
+# Statement narrations in the shapes banks print them.
+CORPUS = [
+    "UPI/412345678901/Payment from Phone/HDFC BANK/YBL1234567890",
+    "UPI/RAVI KUMAR/412345678901/UPI/SBIN/AXL98765432",
+    "VSI/AMAZON PAY INDIA/2024-01-03 10:22/412398765432",
+    "IMPS/412345678901/RAVI KUMAR/ICICI BANK/REF",
+    "IMPS/P2A/412345678901/RAVI KUMAR/KKBK",
+    "IMPS/P2M/ZOMATO/412345678901",
+    "NEFT/SALARY/ACME SOFTWARE PVT LTD/JAN24",
+    "NEFT CR-HDFC0000123-ACME CORP-SALARY FOR JAN",
+    "RTGS/UTIB0001234/AXIS BANK/RENT MAY",
+    "POS 4123XXXXXXXX1234 SWIGGY BANGALORE",
+    "DEBIT CARD ATM WDL 1234 MG ROAD",
+    "ATM CASH WDL/SBI ATM/12345678",
+    "CASH DEP BY SELF AT BRANCH",
+    "CHQ DEP 000123 CLR INWARD",
+    "BBPS/ELECTRICITY/BESCOM/REF 1234567890",
+    "ECS/LIC INSURANCE PREMIUM/123456789012",
+    "ACH D- NACH SIP MUTUAL FUND 9876543210",
+    "INT PAID TILL 31-03-2024",
+    "DIVIDEND TCS LTD 2024",
+    "TO TRANSFER RAVI KUMAR A/C 123456789012",
+    "TRANSFER TO SUNITA SHARMA",
+    "CR BY NEFT PAYMENT FROM PHONEPE",
+    "BY CLG INWARD 12345678",
+    "REFUND FROM FLIPKART REF NO 1234567890",
+    "PAYTM WALLET LOAD 9123456789@PAYTM",
+    "GPAY ravi.kumar@okicici UPI",
+    "payment to netflix.com via card",
+    "CRED CLUB CC BILLPAY 1234 5678 9012 3456",
+    "JIO RECHARGE UTR NO 1234567890123",
+    "IRCTC TICKET 1234-5678-9012",
+    "FUEL HPCL PUMP 12 PUNJAB NATIONAL BANK",
+    "LOAN EMI 1234 KOTAK MAHINDRA BANK",
+    "MEDICAL PHARMACY CHEMIST YESB0001234",
+    "GROCERY BIGBASKET RRN 123456789012",
+    "TAX PAID CBDT ITNS 280",
+    "LOAN DISB 998877665544",
+    "SCHOOL FEES DPS 2024 DEBITED",
+    "CREDITED BY UBER INDIA",
+    "OLA CABS TXN:ABCDE12345XYZ",
+    "",
+    "   ",
+    "12345678",
+    "A/C XX1234 DEBITED",
+]
+
+_FRAGMENTS = [
+    "UPI", "IMPS", "NEFT", "RTGS", "VSI", "POS", "ATM", "CHQ", "/", " ", "-",
+    ":", "TO", "FROM", "BY", "CR BY", "TRANSFER TO", "PAYMENT TO", "HDFC",
+    "HDFC BANK", "SBI", "AXIS", "BOB", "UNION", "AMAZON", "SWIGGY", "PHONEPE",
+    "GOOGLE PAY", "GAS", "SALARY", "RENT", "REFUND", "TRANSFER", "DEBITED",
+    "CREDITED", "REF", "RRN", "UTR NO", "YBL", "ravi@okaxis", "a.b-c_d@ybl",
+    "123", "1234567890", "412345678901", "1234 5678 9012", "1234-5678-90123",
+    "RAVI KUMAR", "A/C", "ACC 123456", "Café", "ñ", "IMPS/P2M", "VPA/MMT",
+]
+narrations = st.lists(st.sampled_from(_FRAGMENTS), max_size=10).map("".join)
+# Where the lexer's character classes could drift from the regexes': case
+# folding (İ, K), \s versus " ", word boundaries and overlapping labels.
+_EDGE_FRAGMENTS = [
+    "İ", "ı", "K", "ſ", "\t", "\u00a0", "_", "-", ":", ".", "@", "@ok", "/",
+    "1234 5678 9012", "12345678", "١٢٣", "UTR NO", "IDFC", "KOTO ", "PNBY ",
+    "neft", "imps-", "upi:", "TXN", "FROM ", "CR BY ", "A/C 9",
+]
+edge_narrations = st.lists(
+    st.sampled_from(_EDGE_FRAGMENTS + _FRAGMENTS), max_size=12
+).map("".join)
+
+
+def test_corpus_matches_legacy():
+    for narration in CORPUS:
+        assert analyze_narration_details(
+            narration
+        ) == legacy_narration.analyze_narration_details(narration), narration
+
+
+@settings(max_examples=1000, deadline=None)
+@given(st.one_of(narrations, st.text(max_size=40)))
+def test_matches_legacy(narration):
+    expected = legacy_narration.analyze_narration_details(narration)
+    assert analyze_narration_details(narration) == expected
+
+
+@settings(max_examples=1000, deadline=None)
+@given(edge_narrations)
+def test_lexer_edge_cases_match_legacy(narration):
+    expected = legacy_narration.analyze_narration_details(narration)
+    assert analyze_narration_details(narration) == expected
+    assert extract_possible_account_numbers(
+        narration
+    ) == legacy_narration.extract_possible_account_numbers(narration)
+
+
+def test_account_numbers_match_legacy():
+    for narration in CORPUS:
+        assert extract_possible_account_numbers(
+            narration
+        ) == legacy_narration.extract_possible_account_numbers(narration), narration
+
+
+@settings(max_examples=500, deadline=None)
+@given(
+    st.lists(st.text(alphabet="ABC/ ", min_size=1, max_size=5), max_size=12),
+    st.text(alphabet="ABCD/ ", max_size=30),
+)
+def test_automaton_finds_every_substring_keyword(keywords, text):
+    assert KeywordAutomaton(keywords).find(text) == {k for k in keywords if k in text}
+
+
+def test_automaton_overlapping_keywords():
+    automaton = KeywordAutomaton(["HDFC", "HDFC BANK", "BANK", "DFC B", "IMPS", "IMPS/P2A"])
+    assert automaton.find("IMPS/P2A/HDFC BANK") == {
+        "HDFC", "HDFC BANK", "BANK", "DFC B", "IMPS", "IMPS/P2A",
+    }
+    assert automaton.find("") == set()
@@ -0,0 +1,159 @@
+import pytest
+
+from app.enrichers.narration_enricher import _BANK_KEYWORDS, analyze_narration_details
+from app.enrichers.narration_grammars import GENERIC, GRAMMARS, grammar_for
+from app.models.analyzer import BankStatementAnalyzer
+from tests.test_narration_enricher import CORPUS
+
+
+@pytest.mark.parametrize(
+    "account_info, code",
+    [
+        ({"bank_name": "HDFC BANK"}, "HDFC"),
+        ({"bank_name": "Kotak Mahindra Bank"}, "KKBK"),
+        ({"bank_name": "STATE BANK OF INDIA", "ifsc_code": "HDFC0000123"}, "HDFC"),
+        ({"bank_name": None, "ifsc_code": "utib0001234"}, "UTIB"),
+        ({"bank_name": "HDFC BANK", "ifsc_code": "CNRB0001234"}, ""),
+        ({}, ""),
+        (None, ""),
+    ],
+)
+def test_grammar_for(account_info, code):
+    assert grammar_for(account_info).code == code
+
+
+@pytest.mark.parametrize(
+    "code, narration, expected",
+    [
+        (
+            "HDFC",
+            "UPI-SWIGGY-swiggy@icici-ICIC0DC0099-412345678901-Dinner",
+            {"payment_method": "UPI", "upi_id": "SWIGGY@ICICI", "transaction_reference": "412345678901",
+             "name": "SWIGGY", "vpa": "SWIGGY@ICICI", "bank_peer": "ICICI", "remarks": ["DINNER"]},
+        ),
+        (
+            "HDFC",
+            "NEFT CR-HDFC0000123-ACME CORP-SALARY FOR JAN",
+            {"payment_method": "NEFT", "transaction_reference": None, "name": "ACME CORP",
+             "bank_peer": "HDFC", "remarks": ["SALARY FOR JAN"]},
+        ),
+        (
+            "ICIC",
+            "UPI/412345678901/Rent/ravi@okaxis/Axis Bank/UPI",
+            {"payment_method": "UPI", "upi_id": "RAVI@OKAXIS", "transaction_reference": "412345678901",
+             "vpa": "RAVI@OKAXIS", "bank_peer": "AXIS BANK", "remarks": ["RENT"]},
+        ),
+        (
+            "ICIC",
+            "MMT/IMPS/412345678901/Loan/RAVI KUMAR/HDFC Bank",
+            {"payment_method": "IMPS", "transaction_reference": "412345678901", "name": "RAVI KUMAR",
+             "bank_peer": "HDFC BANK", "remarks": ["IMPS TRANSFER"]},
+        ),
+        (
+            "SBIN",
+            "TO TRANSFER-UPI/DR/412345678901/RAVI KUMAR/SBIN/ravi@oksbi/Rent",
+            {"payment_method": "UPI", "transaction_reference": "412345678901", "name": "RAVI KUMAR",
+             "vpa": "RAVI@OKSBI", "bank_peer": "SBI", "remarks": ["RENT", "TRANSFER"]},
+        ),
+        (
+            "KKBK",
+            "UPI/RAVI KUMAR/412345678901/Groceries",
+            {"payment_method": "UPI", "transaction_reference": "412345678901", "name": "RAVI KUMAR",
+             "remarks": ["GROCERIES"]},
+        ),
+        (
+            "UTIB",
+            "IMPS/P2A/412345678901/RAVI KUMAR/KKBK",
+            {"payment_method": "IMPS", "transaction_reference": "412345678901", "name": "RAVI KUMAR",
+             "bank_peer": "KOTAK", "remarks": ["IMPS TRANSFER"]},
+        ),
+    ],
+)
+def test_bank_layouts(code, narration, expected):
+    details = GRAMMARS[code].details(narration)
+    receiver = details["receiver_details"]
+    for key, value in expected.items():
+        assert (receiver[key] if key in ("name", "vpa") else details[key]) == value, key
+
+
+_BANK_ROWS = [
+    "UPI-SWIGGY LIMITED-swiggy@icici-ICIC0DC0099-412345678901-Food order",
+    "UPI-ZOMATO-zomato@hdfcbank-HDFC0MERUPI-412345678901-Dinner",
+    "IMPS-412345678901-RAVI KUMAR-SBIN-12345678901-Rent",
+    "NEFT DR-UTIB0001234-ACME SOFTWARE-SALARY ADVANCE REFUND-N123456789012",
+    "UPI/412345678901/Amazon order/amazon@apl/Axis Bank/UPI",
+    "MMT/IMPS/412345678901/Loan/RAVI KUMAR/HDFC Bank",
+    "TO TRANSFER-UPI/DR/412345678901/UBER INDIA/YESB/uber@ybl/Ride",
+    "BY TRANSFER-UPI/CR/412345678901/RAVI KUMAR/KKBK/ravi@kotak/Refund",
+    "UPI/NETFLIX/412345678901/Subscription",
+    "UPI/P2M/412345678901/FLIPKART/ICICI/Order",
+    "IMPS/P2A/412345678901/ACME LTD/PUNB",
+]
+
+
+def test_bank_layouts_keep_the_generic_categorization():
+    # Whatever merchant, categories and bank name the generic reading
+    # finds, a bank's layout finds too; it may find more where the generic
+    # layouts misread the row (an ICICI VPA read as the bank).
+    matched = 0
+    for narration in CORPUS + _BANK_ROWS:
+        generic = analyze_narration_details(narration)
+        for grammar in GRAMMARS.values():
+            details = grammar.details(narration)
+            if details == generic:
+                continue
+            matched += 1
+            for key in ("merchant", "category", "bank_peer"):
+                if generic[key] and (key != "bank_peer" or generic[key] in _BANK_KEYWORDS):
+                    assert details[key] == generic[key], (grammar.code, narration, key)
+    assert matched >= len(_BANK_ROWS)
+
+
+@pytest.mark.parametrize(
+    "code, narration",
+    [
+        ("HDFC", "UPI/412345678901/Payment from Phone/HDFC BANK/YBL1234567890"),  # not HDFC's prefix
+        ("HDFC", "UPI-GPAY"),  # too few fields
+        ("ICIC", "UPI/RAVI KUMAR/412345678901/UPI/SBIN/AXL98765432"),  # no RRN first
+        ("KKBK", "UPI/412345678901/Payment/HDFC BANK/YBL1234567890"),  # five fields
+        ("UTIB", "UPI/P2M/ZOMATO/412345678901"),  # no RRN after P2M
+    ],
+)
+def test_rows_outside_the_bank_layouts_read_generically(code, narration):
+    assert GRAMMARS[code].details(narration) == analyze_narration_details(narration)
+
+
+def test_generic_grammar_is_analyze_narration_details():
+    for narration in CORPUS:
+        assert GENERIC.details(narration) == analyze_narration_details(narration)
+
+
+def test_statement_rows_use_the_detected_bank(tmp_path):
+    path = tmp_path / "statement.csv"
+    path.write_text(
+        "HDFC BANK LTD,,,\n"
+        "Date,Narration,Debit,Credit,Balance\n"
+        "01/02/2024,UPI-SWIGGY-swiggy@icici-ICIC0DC0099-412345678901-Dinner,100.00,,900.00\n"
+        "02/02/2024,NEFT/SALARY/ACME,,5000.00,5900.00\n"
+    )
+    result = BankStatementAnalyzer(str(path)).extract_transactions()["result"]
+    upi, neft = result["transactions"]
+    assert upi["receiver_details"]["vpa"] == "SWIGGY@ICICI"
+    assert upi["transaction_reference"] == "412345678901"
+    assert neft["payment_method"] == "NEFT"
+
+
+def test_statement_ifsc_wins_over_a_bank_named_in_a_narration(tmp_path):
+    path = tmp_path / "statement.csv"
+    path.write_text(
+        "IFSC: ICIC0001234,,,\n"
+        "Date,Narration,Debit,Credit,Balance\n"
+        "01/02/2024,IMPS/412345678901/RAVI KUMAR/HDFC BANK/REF,100.00,,900.00\n"
+        "02/02/2024,UPI/412345678901/rent/ravi@okicici/ICICI/xyz,200.00,,700.00\n"
+    )
+    result = BankStatementAnalyzer(str(path)).extract_transactions()["result"]
+    assert result["account_info"]["ifsc_code"] == "ICIC0001234"
+    upi = result["transactions"][1]
+    assert upi["transaction_reference"] == "412345678901"
+    assert upi["upi_id"] == "RAVI@OKICICI"
+    assert upi["bank_peer"] == "ICICI"
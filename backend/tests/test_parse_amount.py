@@ -0,0 +1,49 @@
+import math
+
+import pandas as pd
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from app.parsers.excel_parser import parse_amount, parse_amount_series
+
+_FRAGMENTS = [
+    "0", "1", "7", "12", "999", ",", ".", "-", "+", "(", ")", " ", "₹", "$", "€",
+    "£", "Cr", "Cr.", "Dr", "DR.", "cr", "e", "E5", "/", "nan", "NaN", "n/a",
+    "none", "inf", "_", "abc", "2024-01-05", "1,23,456.78",
+]
+
+amount_cells = st.one_of(
+    st.lists(st.sampled_from(_FRAGMENTS), max_size=6).map("".join),
+    st.text(alphabet="0123456789.,-()₹$ CrDr/e", max_size=12),
+    st.floats(allow_nan=True, allow_infinity=True).map(str),
+    st.floats(allow_nan=True),
+    st.integers(min_value=-10**9, max_value=10**9),
+    st.none(),
+)
+
+
+def _same(scalar, vector):
+    if scalar is None:
+        return math.isnan(vector)
+    return scalar == vector and math.copysign(1, scalar) == math.copysign(1, vector)
+
+
+@settings(max_examples=200, deadline=None)
+@given(st.lists(amount_cells, max_size=20))
+def test_series_matches_scalar(cells):
+    series = pd.Series(cells, dtype=object)
+    parsed = parse_amount_series(series)
+    assert len(parsed) == len(cells)
+    for cell, value in zip(cells, parsed.tolist()):
+        assert _same(parse_amount(cell), value), cell
+
+
+def test_series_known_values():
+    series = pd.Series(
+        ["₹1,200.50", "(300)", "45 Cr.", "12 DR", "2024-01-05", "n/a", "-", None, ""],
+        index=list("abcdefghi"),
+    )
+    parsed = parse_amount_series(series)
+    assert parsed.index.tolist() == list("abcdefghi")
+    assert parsed.iloc[:4].tolist() == [1200.5, -300.0, 45.0, 12.0]
+    assert parsed.iloc[4:].isna().all()
@@ -0,0 +1,197 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.config.settings import settings
+from app.models.analyzer import BankStatementAnalyzer
+from app.parsers import budget as budget_module
+from app.parsers import excel_parser, pdf_parser
+from app.parsers.budget import ParseBudget
+from app.parsers.pdf_parser import extract_page_tables
+from app.routers.analyze import _cancel_on_disconnect
+from tests.pdf_factory import statement_pages, write_pdf
+from tests.test_streaming import HEADER, PREAMBLE, _collect, _rows
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    return str(write_pdf(tmp_path / "s.pdf", statement_pages(6, rows_per_page=5)))
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "s.csv"
+    path.write_text(PREAMBLE + HEADER + "".join(_rows(120)))
+    return str(path)
+
+
+@pytest.fixture
+def page_hook(monkeypatch):
+    """Calls ``hook(page_number)`` before each page is extracted."""
+    hooks = []
+    real = pdf_parser._extract_tables
+
+    def spy(page, engine, layout):
+        for hook in hooks:
+            hook(page.page_number)
+        return real(page, engine, layout)
+
+    monkeypatch.setattr(pdf_parser, "_extract_tables", spy)
+    return hooks
+
+
+def test_unlimited_budget_is_not_truncated(pdf_path):
+    result = BankStatementAnalyzer(pdf_path).extract_transactions()["result"]
+    assert len(result["transactions"]) == 30
+    assert (result["truncated"], result["truncation_reason"]) == (False, None)
+
+
+def test_pdf_page_limit(pdf_path):
+    budget = ParseBudget(max_pages=2)
+    result = BankStatementAnalyzer(pdf_path, budget=budget).extract_transactions()
+    assert result["status_code"] == 200
+    assert len(result["result"]["transactions"]) == 10
+    assert result["result"]["truncated"] is True
+    assert result["result"]["truncation_reason"] == "max_pages"
+
+
+def test_pdf_time_limit_between_pages(pdf_path, page_hook, monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(budget_module.time, "monotonic", lambda: clock[0])
+    page_hook.append(lambda page: clock.__setitem__(0, clock[0] + 0.6))
+
+    budget = ParseBudget(max_seconds=1)
+    pages = extract_page_tables(pdf_path, budget=budget)
+
+    assert len(pages) == 2  # 1.2 s on the clock after page 2
+    assert budget.reason == "max_seconds"
+
+
+def test_pdf_cancelled_mid_parse(pdf_path, page_hook):
+    budget = ParseBudget()
+    page_hook.append(lambda page: page == 3 and budget.cancel.set())
+
+    result = BankStatementAnalyzer(pdf_path, budget=budget).extract_transactions()
+    assert result["status_code"] == 499
+
+
+def test_pdf_pool_respects_budget(pdf_path, monkeypatch):
+    monkeypatch.setattr(settings, "pdf_parallel_min_pages", 2)
+    expected = extract_page_tables(pdf_path)[:4]
+    budget = ParseBudget(max_pages=4)
+    assert extract_page_tables(pdf_path, workers=2, budget=budget) == expected
+    assert budget.truncated
+
+
+def test_csv_row_limit(csv_path):
+    budget = ParseBudget(max_rows=50)
+    full = BankStatementAnalyzer(csv_path).extract_transactions()["result"]
+    result = BankStatementAnalyzer(csv_path, budget=budget).extract_transactions()
+    assert result["result"]["transactions"] == full["transactions"][:50]
+    assert result["result"]["truncation_reason"] == "max_rows"
+
+
+def test_csv_row_limit_not_hit(csv_path):
+    result = BankStatementAnalyzer(
+        csv_path, budget=ParseBudget(max_rows=120)
+    ).extract_transactions()
+    assert result["result"]["truncated"] is False
+
+
+def test_csv_rows_past_the_limit_are_not_built(csv_path, monkeypatch):
+    built = []
+    real = excel_parser.build_transactions
+
+    def spy(df, *args):
+        built.append(len(df))
+        return real(df, *args)
+
+    monkeypatch.setattr(excel_parser, "STREAM_CHUNK_ROWS", 20)
+    monkeypatch.setattr(excel_parser, "build_transactions", spy)
+    budget = ParseBudget(max_rows=50)
+    result = BankStatementAnalyzer(csv_path, budget=budget).extract_transactions()
+    assert len(result["result"]["transactions"]) == 50
+    assert built == [20, 20, 10]
+
+
+def test_csv_time_limit_between_chunks(csv_path, monkeypatch):
+    clock = [0.0]
+    real = excel_parser.build_transactions
+
+    def slow(df, *args):
+        clock[0] += 0.6
+        return real(df, *args)
+
+    monkeypatch.setattr(budget_module.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(excel_parser, "STREAM_CHUNK_ROWS", 20)
+    monkeypatch.setattr(excel_parser, "build_transactions", slow)
+    budget = ParseBudget(max_seconds=1)
+    result = BankStatementAnalyzer(csv_path, budget=budget).extract_transactions()
+    assert len(result["result"]["transactions"]) == 40  # 1.2 s after chunk 2
+    assert result["result"]["truncation_reason"] == "max_seconds"
+
+
+def test_csv_cancelled(csv_path):
+    budget = ParseBudget()
+    budget.cancel.set()
+    result = BankStatementAnalyzer(csv_path, budget=budget).extract_transactions()
+    assert result["status_code"] == 499
+
+
+def test_stream_row_limit(csv_path):
+    budget = ParseBudget(max_rows=45)
+    analyzer = BankStatementAnalyzer(csv_path, budget=budget)
+    transactions, summary = _collect(analyzer.stream_transactions(chunk_size=20))
+    assert len(transactions) == 45
+    assert summary["confidence_summary"]["total_transactions"] == 45
+    assert (summary["truncated"], summary["truncation_reason"]) == (True, "max_rows")
+
+
+def test_stream_stops_between_chunks_when_cancelled(csv_path):
+    budget = ParseBudget()
+    events = BankStatementAnalyzer(csv_path, budget=budget).stream_transactions(
+        chunk_size=20
+    )
+    first = next(events)
+    budget.cancel.set()
+    rest = list(events)
+    assert first["event"] == "transactions"
+    assert rest == [
+        {
+            "event": "error",
+            "status_code": 499,
+            "message": "Parsing cancelled: the client disconnected",
+        }
+    ]
+
+
+class _Request:
+    def __init__(self, disconnect_after):
+        self.polls = 0
+        self.disconnect_after = disconnect_after
+
+    async def is_disconnected(self):
+        self.polls += 1
+        return self.polls > self.disconnect_after
+
+
+async def test_disconnect_sets_cancel(monkeypatch):
+    monkeypatch.setattr("app.routers.analyze._DISCONNECT_POLL_S", 0)
+    cancel = threading.Event()
+    await asyncio.wait_for(_cancel_on_disconnect(_Request(2), cancel), timeout=1)
+    assert cancel.is_set()
+
+
+async def test_endpoint_reports_truncation(client, monkeypatch, csv_path):
+    monkeypatch.setattr(settings, "parse_max_rows", 10)
+    with open(csv_path, "rb") as f:
+        response = await client.post(
+            "/api/analyze/bank/statement",
+            files={"file": ("s.csv", f, "text/csv")},
+        )
+    assert response.status_code == 200
+    result = response.json()["result"]
+    assert len(result["transactions"]) == 10
+    assert result["truncated"] is True
+    assert result["truncation_reason"] == "max_rows"
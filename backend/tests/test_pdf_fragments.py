@@ -0,0 +1,80 @@
+import pandas as pd
+
+from app.models.analyzer import BankStatementAnalyzer
+from app.parsers import pdf_parser
+from app.parsers.pdf_parser import merge_fragments
+from tests.pdf_factory import statement_pages, write_pdf
+
+
+def _frame(columns, *rows):
+    return pd.DataFrame(list(rows), columns=columns)
+
+
+def test_merge_keeps_page_order():
+    a, b = ["date", "narration"], ["date", "details"]
+    frames = [
+        _frame(a, ["1", "x"]),
+        _frame(a, ["2", "y"]),
+        _frame(b, ["3", "z"]),
+        _frame(a, ["4", "w"]),
+    ]
+    merged = merge_fragments(frames)
+    assert [list(df.columns) for df in merged] == [a, b, a]
+    assert merged[0]["date"].tolist() == ["1", "2"]
+    assert merged[0].index.tolist() == [0, 1]
+    assert merged[2]["date"].tolist() == ["4"]
+
+
+def test_merge_duplicate_labels():
+    columns = ["date", "", ""]
+    merged = merge_fragments([_frame(columns, [1, 2, 3]), _frame(columns, [4, 5, 6])])
+    assert len(merged) == 1
+    assert merged[0].values.tolist() == [[1, 2, 3], [4, 5, 6]]
+
+
+def test_one_resolution_and_build_per_header(tmp_path, monkeypatch):
+    calls = {"resolve": 0, "build": 0}
+    real_resolve = pdf_parser.resolve_pdf_columns
+    real_build = pdf_parser.build_transactions
+
+    def resolve(columns):
+        calls["resolve"] += 1
+        return real_resolve(columns)
+
+    def build(df, roles, *args):
+        calls["build"] += 1
+        return real_build(df, roles, *args)
+
+    monkeypatch.setattr(pdf_parser, "resolve_pdf_columns", resolve)
+    monkeypatch.setattr(pdf_parser, "build_transactions", build)
+
+    pages = statement_pages(8, rows_per_page=5, header_every_page=True)
+    path = str(write_pdf(tmp_path / "s.pdf", pages))
+    result = BankStatementAnalyzer(path).extract_transactions()
+
+    assert len(result["result"]["transactions"]) == 40
+    assert calls == {"resolve": 1, "build": 1}
+
+
+def test_each_header_uses_its_own_date_format(tmp_path, monkeypatch):
+    formats = []
+    real_build = pdf_parser.build_transactions
+
+    def build(df, roles, date_format, *args):
+        formats.append(date_format)
+        return real_build(df, roles, date_format, *args)
+
+    monkeypatch.setattr(pdf_parser, "build_transactions", build)
+
+    pages = statement_pages(2, rows_per_page=5)
+    second = [["Txn Date", "Description", "Debit", "Credit", "Balance"]]
+    for row in pages[1]["table"]:
+        day, month, year = row[0].split("/")
+        second.append([f"{year}-{month}-{day}", *row[1:]])
+    pages[1]["table"] = second
+    path = str(write_pdf(tmp_path / "s.pdf", pages))
+    result = BankStatementAnalyzer(path).extract_transactions()["result"]
+
+    assert formats == ["%d/%m/%Y", "%Y-%m-%d"]
+    assert result["date_format"] == "%d/%m/%Y"
+    assert len(result["transactions"]) == 10
@@ -0,0 +1,133 @@
+import pytest
+
+from app.models.analyzer import BankStatementAnalyzer
+from app.parsers import pdf_parser
+from app.parsers.pdf_parser import (
+    TEXT_BACKENDS,
+    extract_pdf_metadata,
+    iter_page_texts,
+    with_transaction_period,
+)
+from tests.pdf_factory import statement_pages, write_pdf
+
+FULL_HEADER = [
+    "HDFC BANK LTD",
+    "Account Holder Name: JOHN DOE Branch: ANDHERI EAST",
+    "Account No: 50100123456789 IFSC: HDFC0001234",
+]
+
+
+def _metadata(path):
+    analyzer = BankStatementAnalyzer(str(path))
+    return extract_pdf_metadata(str(path), analyzer._extract_metadata_from_text)
+
+
+def _counting_pages(monkeypatch):
+    read = []
+    real = pdf_parser.iter_page_texts
+
+    def counting(file_path, backend=None):
+        for text in real(file_path, backend):
+            read.append(text)
+            yield text
+
+    monkeypatch.setattr(pdf_parser, "iter_page_texts", counting)
+    return read
+
+
+def test_metadata_reads_only_leading_pages(tmp_path, monkeypatch):
+    pages = statement_pages(12, rows_per_page=5)
+    pages[0]["lines"] = FULL_HEADER
+    path = write_pdf(tmp_path / "s.pdf", pages)
+    read = _counting_pages(monkeypatch)
+
+    meta = _metadata(path)
+
+    assert len(read) == 2
+    assert meta["account_holder"] == "JOHN DOE"
+    assert meta["ifsc_code"] == "HDFC0001234"
+
+
+def test_metadata_reads_on_while_fields_missing(tmp_path, monkeypatch):
+    pages = statement_pages(12, rows_per_page=5)
+    pages[0]["lines"] = []
+    pages[3]["lines"] = FULL_HEADER
+    path = write_pdf(tmp_path / "s.pdf", pages)
+    read = _counting_pages(monkeypatch)
+
+    meta = _metadata(path)
+
+    assert len(read) == 4
+    assert meta["account_number"] == "50100123456789"
+
+
+def test_metadata_page_cap(tmp_path, monkeypatch):
+    pages = statement_pages(12, rows_per_page=5)
+    pages[0]["lines"] = []
+    path = write_pdf(tmp_path / "s.pdf", pages)
+    read = _counting_pages(monkeypatch)
+
+    _metadata(path)
+
+    assert len(read) == pdf_parser._METADATA_MAX_PAGES
+
+
+def test_statement_period_covers_unread_pages(tmp_path):
+    path = write_pdf(tmp_path / "s.pdf", statement_pages(12, rows_per_page=20))
+    result = BankStatementAnalyzer(str(path)).extract_transactions()["result"]
+    dates = [t["transaction_date"] for t in result["transactions"]]
+    assert result["account_info"]["statement_period"] == {
+        "from": min(dates),
+        "to": max(dates),
+    }
+
+
+def test_with_transaction_period():
+    txns = [{"transaction_date": "2024-03-05"}, {"transaction_date": None}]
+    meta = {"statement_period": {"date": "2024-01-31"}}
+    assert with_transaction_period(meta, txns)["statement_period"] == {
+        "from": "2024-01-31",
+        "to": "2024-03-05",
+    }
+    assert with_transaction_period({"statement_period": {}}, txns[:1])[
+        "statement_period"
+    ] == {"date": "2024-03-05"}
+
+
+def test_with_transaction_period_reads_non_iso_metadata():
+    # "31/01/2024" < "2024-03-05" as strings; as dates it is the earlier.
+    txns = [{"transaction_date": "2024-03-05"}, {"transaction_date": "2024-02-10"}]
+    meta = {"statement_period": {"from": "31/01/2024", "to": "05 Apr 2024"}}
+    assert with_transaction_period(meta, txns)["statement_period"] == {
+        "from": "2024-01-31",
+        "to": "2024-04-05",
+    }
+    meta = {"statement_period": {"from": "n/a", "to": "2024-02-29"}}
+    assert with_transaction_period(meta, txns)["statement_period"] == {
+        "from": "2024-02-10",
+        "to": "2024-03-05",
+    }
+
+
+@pytest.mark.parametrize("backend", sorted(TEXT_BACKENDS))
+def test_text_backends_agree_on_metadata(tmp_path, backend):
+    pages = statement_pages(3, rows_per_page=5)
+    pages[0]["lines"] = FULL_HEADER
+    path = write_pdf(tmp_path / "s.pdf", pages)
+    analyzer = BankStatementAnalyzer(str(path))
+    expected = extract_pdf_metadata(
+        str(path), analyzer._extract_metadata_from_text, "pdfplumber"
+    )
+    assert (
+        extract_pdf_metadata(str(path), analyzer._extract_metadata_from_text, backend)
+        == expected
+    )
+    assert expected["account_holder"] == "JOHN DOE"
+
+
+def test_pdfium_page_texts(tmp_path):
+    path = write_pdf(tmp_path / "s.pdf", statement_pages(2, rows_per_page=3))
+    texts = list(iter_page_texts(str(path), "pdfium"))
+    assert len(texts) == 2
+    assert texts[0].splitlines()[0] == "HDFC BANK LTD"
+    assert "\r" not in texts[0]
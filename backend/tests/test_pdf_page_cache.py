@@ -0,0 +1,114 @@
+import os
+
+import pdfplumber
+import pytest
+
+from app.models.analyzer import BankStatementAnalyzer
+from app.parsers.page_cache import PageTableCache, page_digest
+from app.parsers.pdf_parser import extract_page_tables
+from tests.pdf_factory import statement_pages, write_pdf
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return PageTableCache(tmp_path / "cache", max_bytes=10 * 1024 * 1024)
+
+
+@pytest.fixture
+def extractions(monkeypatch):
+    """Page numbers that went through pdfplumber table extraction."""
+    from app.parsers import pdf_parser
+
+    pages = []
+    real = pdf_parser._extract_tables
+
+    def spy(page, engine, layout):
+        pages.append(page.page_number)
+        return real(page, engine, layout)
+
+    monkeypatch.setattr(pdf_parser, "_extract_tables", spy)
+    return pages
+
+
+def _months(tmp_path):
+    """Three monthly statements and the quarterly one made of their pages."""
+    pages = statement_pages(6, rows_per_page=6, header_every_page=True)
+    monthly = [
+        str(write_pdf(tmp_path / f"m{i}.pdf", pages[i * 2 : i * 2 + 2]))
+        for i in range(3)
+    ]
+    return monthly, str(write_pdf(tmp_path / "q.pdf", pages))
+
+
+def test_identical_pages_share_a_digest(tmp_path):
+    monthly, quarterly = _months(tmp_path)
+    with pdfplumber.open(monthly[1]) as m, pdfplumber.open(quarterly) as q:
+        assert page_digest(m.pages[0]) == page_digest(q.pages[2])
+        assert page_digest(q.pages[2]) != page_digest(q.pages[3])
+
+
+@pytest.mark.parametrize("engine", ["tables", "text"])
+def test_overlapping_upload_skips_seen_pages(tmp_path, cache, extractions, engine):
+    monthly, quarterly = _months(tmp_path)
+    expected = extract_page_tables(quarterly, engine=engine)
+    for path in monthly:
+        extract_page_tables(path, engine=engine, cache=cache)
+    extractions.clear()
+
+    assert extract_page_tables(quarterly, engine=engine, cache=cache) == expected
+    # Pages 3 and 5 opened a monthly file, with no layout carried in; in the
+    # quarterly file they follow page 1's, so they are a different key.
+    assert extractions == [3, 5]
+
+
+def test_continuation_pages_keyed_by_carried_region(tmp_path, cache, extractions):
+    path = str(write_pdf(tmp_path / "s.pdf", statement_pages(4, rows_per_page=6)))
+    expected = extract_page_tables(path)
+    extract_page_tables(path, cache=cache)
+    extractions.clear()
+
+    assert extract_page_tables(path, cache=cache) == expected
+    assert extractions == []
+
+
+def test_cached_parse_matches_uncached(tmp_path, cache):
+    monthly, quarterly = _months(tmp_path)
+    expected = BankStatementAnalyzer(quarterly).extract_transactions()
+    BankStatementAnalyzer(monthly[0], page_cache=cache).extract_transactions()
+    assert (
+        BankStatementAnalyzer(quarterly, page_cache=cache).extract_transactions()
+        == expected
+    )
+
+
+def test_lru_eviction(tmp_path):
+    cache = PageTableCache(tmp_path / "cache", max_bytes=350)  # ~76 B entries
+    table = [[["x" * 40]]]
+    for i, key in enumerate("abcd"):
+        cache.put(key, table, None)
+        os.utime(cache._path(key), (i, i))
+    cache.get("a")  # most recently used now
+    cache.put("e", table, None)
+
+    cached = {p.stem for p in (tmp_path / "cache").glob("*.json")}
+    assert "a" in cached and "e" in cached
+    assert "b" not in cached
+    assert sum(p.stat().st_size for p in (tmp_path / "cache").iterdir()) <= 350
+
+
+def test_corrupt_entry_is_a_miss(cache):
+    cache.put("k", [[["a"]]], None)
+    cache._path("k").write_text("{not json")
+    assert cache.get("k") is None
+
+
+def test_parallel_workers_use_cache(tmp_path, cache, monkeypatch):
+    from app.config.settings import settings
+
+    monkeypatch.setattr(settings, "pdf_parallel_min_pages", 2)
+    path = str(write_pdf(tmp_path / "s.pdf", statement_pages(6, rows_per_page=4)))
+    expected = extract_page_tables(path)
+
+    assert extract_page_tables(path, workers=2, cache=cache) == expected
+    assert len(list((tmp_path / "cache").glob("*.json"))) == 6
+    assert extract_page_tables(path, workers=2, cache=cache) == expected
@@ -0,0 +1,109 @@
+import threading
+import time
+
+import pytest
+
+from app.models.analyzer import BankStatementAnalyzer
+from app.parsers import pdf_parser
+from app.parsers.pdf_parser import extract_page_tables, process_pdf_transactions
+from tests.pdf_factory import HEADER, statement_pages, write_pdf
+
+
+@pytest.fixture
+def statement_pdf(tmp_path):
+    # header on page 1 only: every later page is a continuation table, so
+    # worker range boundaries fall on tables that need the earlier header
+    return str(write_pdf(tmp_path / "statement.pdf", statement_pages(9, rows_per_page=6)))
+
+
+def test_parallel_pages_merge_in_order(statement_pdf, monkeypatch):
+    monkeypatch.setattr(pdf_parser.settings, "pdf_parallel_min_pages", 2)
+    sequential = extract_page_tables(statement_pdf)
+    parallel = extract_page_tables(statement_pdf, workers=2)
+    assert parallel == sequential
+    assert len(parallel) == 9
+
+
+def test_parallel_result_matches_sequential(statement_pdf, monkeypatch):
+    monkeypatch.setattr(pdf_parser.settings, "pdf_parallel_min_pages", 2)
+    analyzer = BankStatementAnalyzer(statement_pdf)
+    sequential = process_pdf_transactions(
+        statement_pdf, analyzer._extract_metadata_from_text, workers=0
+    )
+    parallel = process_pdf_transactions(
+        statement_pdf, analyzer._extract_metadata_from_text, workers=2
+    )
+    assert sequential["status_code"] == 200
+    assert len(sequential["result"]["transactions"]) == 54
+    assert parallel == sequential
+
+
+def test_parallel_text_engine_follows_a_second_header_layout(tmp_path, monkeypatch):
+    # Pages 7-12 are a second section under its own header and columns; the
+    # ranges starting at pages 8 and 10 continue it, not the first section.
+    pages = statement_pages(12, rows_per_page=6)
+    pages[6]["table"].insert(0, ["Txn Date", "Description", "Withdrawal", "Deposit", "Balance"])
+    for page in pages[6:]:
+        page["col_widths"] = (90, 150, 100, 60, 120)
+    path = str(write_pdf(tmp_path / "two_layouts.pdf", pages, ruled=False))
+    monkeypatch.setattr(pdf_parser.settings, "pdf_parallel_min_pages", 2)
+    sequential = extract_page_tables(path, engine="text")
+    parallel = extract_page_tables(path, workers=2, engine="text")
+    assert parallel == sequential
+    assert sequential[7][0][0][1].startswith("UPI/")  # sliced under the new columns
+    assert sequential[0][0][0] == HEADER
+
+
+def test_pool_splits_when_no_layout_is_learned(tmp_path, monkeypatch):
+    pages = [{"lines": [f"Page {i + 1} of 9, no table here"]} for i in range(9)]
+    path = str(write_pdf(tmp_path / "no_tables.pdf", pages))
+    sequential = extract_page_tables(path)
+    read_here = []
+    real = pdf_parser._page_tables
+
+    def spy(page, *args):
+        read_here.append(page.page_number)  # pool workers don't see the spy
+        return real(page, *args)
+
+    monkeypatch.setattr(pdf_parser.settings, "pdf_parallel_min_pages", 2)
+    monkeypatch.setattr(pdf_parser, "_page_tables", spy)
+    assert extract_page_tables(path, workers=2) == sequential
+    assert read_here == [1, 2, 3]
+
+
+def test_small_pdf_stays_sequential(statement_pdf, monkeypatch):
+    def no_pool(workers):
+        raise AssertionError("pool used below pdf_parallel_min_pages")
+
+    monkeypatch.setattr(pdf_parser, "_get_page_pool", no_pool)
+    assert len(extract_page_tables(statement_pdf, workers=4)) == 9
+
+
+def test_concurrent_requests_share_one_pool(monkeypatch):
+    created = []
+
+    class Pool:
+        def __init__(self, **kwargs):
+            time.sleep(0.01)  # widens the check-then-create window
+            created.append(self)
+
+        def shutdown(self, wait=True):
+            pass
+
+    monkeypatch.setattr(pdf_parser, "ProcessPoolExecutor", Pool)
+    monkeypatch.setattr(pdf_parser, "_page_pool", None)
+    monkeypatch.setattr(pdf_parser, "_page_pool_workers", 0)
+    start = threading.Barrier(8)
+    pools = []
+
+    def request():
+        start.wait()
+        pools.append(pdf_parser._get_page_pool(2))
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(created) == 1
+    assert all(pool is created[0] for pool in pools)
@@ -0,0 +1,72 @@
+import time
+
+import pytest
+
+from app.models.analyzer import BankStatementAnalyzer
+from app.parsers import pdf_parser
+from app.parsers.pdf_parser import is_image_only_pdf
+from tests.pdf_factory import statement_pages, write_pdf
+
+
+@pytest.fixture
+def scanned(tmp_path):
+    return str(write_pdf(tmp_path / "scan.pdf", [{"image": True}] * 40))
+
+
+def test_image_only_pdf_detected(scanned):
+    assert is_image_only_pdf(scanned)
+
+
+@pytest.mark.parametrize(
+    "pages",
+    [
+        [{"image": True, "lines": ["Account No: 50100123456789"]}],  # OCR layer
+        [{"image": True}, {"lines": ["HDFC BANK LTD"]}],  # text on page 2
+        [{}, {}],  # blank, not scanned
+    ],
+    ids=["ocr-layer", "text-later", "blank"],
+)
+def test_text_or_blank_pdf_not_flagged(tmp_path, pages):
+    assert not is_image_only_pdf(str(write_pdf(tmp_path / "s.pdf", pages)))
+
+
+def test_unreadable_pdf_not_flagged(tmp_path):
+    path = tmp_path / "broken.pdf"
+    path.write_bytes(b"%PDF-1.4\nnot really")
+    assert not is_image_only_pdf(str(path))
+
+
+def test_scanned_pdf_rejected_before_extraction(scanned, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("page extraction ran on a scanned PDF")
+
+    monkeypatch.setattr(pdf_parser, "extract_page_tables", fail)
+    monkeypatch.setattr(pdf_parser, "extract_pdf_metadata", fail)
+
+    started = time.perf_counter()
+    result = BankStatementAnalyzer(scanned).extract_transactions()
+
+    assert time.perf_counter() - started < 1.0
+    assert result["status_code"] == 422
+    assert result["error_code"] == "SCANNED_PDF"
+
+
+def test_text_pdf_still_parses(tmp_path):
+    pages = statement_pages(2, rows_per_page=5)
+    pages[0]["image"] = True  # a logo does not make it a scan
+    path = str(write_pdf(tmp_path / "s.pdf", pages))
+    result = BankStatementAnalyzer(path).extract_transactions()
+    assert result["status_code"] == 200
+    assert len(result["result"]["transactions"]) == 10
+
+
+async def test_analyze_returns_scanned_error_code(client, scanned):
+    with open(scanned, "rb") as f:
+        response = await client.post(
+            "/api/analyze/bank/statement",
+            files={"file": ("scan.pdf", f, "application/pdf")},
+        )
+    assert response.status_code == 422
+    body = response.json()
+    assert body["error_code"] == "SCANNED_PDF"
+    assert "scanned" in body["detail"]
@@ -0,0 +1,55 @@
+import pdfplumber
+import pytest
+
+from app.parsers import pdf_parser
+from app.parsers.pdf_parser import extract_page_tables
+from tests.pdf_factory import statement_pages, write_pdf
+
+
+def _full_page_tables(path):
+    with pdfplumber.open(path) as pdf:
+        return [page.extract_tables() for page in pdf.pages]
+
+
+@pytest.fixture
+def detections(monkeypatch):
+    """Page numbers that went through full-page table detection."""
+    pages = []
+    real = pdfplumber.page.Page.find_tables
+
+    def spy(page, *args, **kwargs):
+        if not isinstance(page, pdfplumber.page.CroppedPage):
+            pages.append(page.page_number)
+        return real(page, *args, **kwargs)
+
+    monkeypatch.setattr(pdfplumber.page.Page, "find_tables", spy)
+    return pages
+
+
+def test_region_learned_from_header_page(tmp_path, detections):
+    pages = statement_pages(5, rows_per_page=8)
+    pages.insert(0, {"lines": ["Cover page - no table"]})
+    path = str(write_pdf(tmp_path / "s.pdf", pages))
+    expected = _full_page_tables(path)
+    detections.clear()
+
+    assert extract_page_tables(path) == expected
+    # cover page and header page scanned in full; the rest reuse the region
+    assert detections == [1, 2]
+
+
+def test_region_falls_back_when_page_has_no_rows(tmp_path, detections):
+    pages = statement_pages(4, rows_per_page=8)
+    pages[2] = {"lines": ["Interest rates and charges", "See branch for details"]}
+    path = str(write_pdf(tmp_path / "s.pdf", pages))
+    expected = _full_page_tables(path)
+    detections.clear()
+
+    assert extract_page_tables(path) == expected
+    assert detections == [1, 3]
+
+
+def test_region_shared_with_pool_workers(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_parser.settings, "pdf_parallel_min_pages", 2)
+    path = str(write_pdf(tmp_path / "s.pdf", statement_pages(8, rows_per_page=5)))
+    assert extract_page_tables(path, workers=2) == _full_page_tables(path)
@@ -0,0 +1,74 @@
+import pytest
+
+from app.models.analyzer import BankStatementAnalyzer
+from app.parsers import pdf_parser
+from app.parsers.pdf_parser import extract_page_tables
+from tests.pdf_factory import statement_pages, write_pdf
+
+
+@pytest.fixture
+def pages():
+    pages = statement_pages(3, rows_per_page=6)
+    pages[1]["table"][2][1] = "NEFT CR-SALARY\nACME CORP LTD"
+    return pages
+
+
+def test_text_engine_matches_table_finder(tmp_path, pages):
+    path = str(write_pdf(tmp_path / "ruled.pdf", pages))
+    assert extract_page_tables(path, engine="text") == extract_page_tables(path)
+
+
+def test_text_engine_reads_unruled_layout(tmp_path, pages):
+    ruled = str(write_pdf(tmp_path / "ruled.pdf", pages))
+    plain = str(write_pdf(tmp_path / "plain.pdf", pages, ruled=False))
+
+    assert extract_page_tables(plain) == [[], [], []]
+    tables = extract_page_tables(plain, engine="text")
+    assert tables == extract_page_tables(ruled)
+    assert tables[0][0][0] == ["Date", "Narration", "Debit", "Credit", "Balance"]
+    # continuation pages come back headerless, as extract_tables returns them
+    assert tables[1][0][0][0].endswith("/2024")
+
+
+def test_text_engine_falls_back_per_page(tmp_path, pages, monkeypatch):
+    pages[2]["table"] = [["TOTAL", "", "", "", ""], ["", "closing", "", "", ""]]
+    path = str(write_pdf(tmp_path / "s.pdf", pages))
+    fallbacks = []
+    real = pdf_parser.text_layout_tables
+
+    def spy(page, layout):
+        tables, layout = real(page, layout)
+        if tables is None:
+            fallbacks.append(page.page_number)
+        return tables, layout
+
+    monkeypatch.setattr(pdf_parser, "text_layout_tables", spy)
+    assert extract_page_tables(path, engine="text") == extract_page_tables(path)
+    assert fallbacks == [3]
+
+
+def test_text_engine_end_to_end(tmp_path, pages):
+    path = str(write_pdf(tmp_path / "plain.pdf", pages, ruled=False))
+    result = BankStatementAnalyzer(path, pdf_engine="text").extract_transactions()
+    assert result["status_code"] == 200
+    assert len(result["result"]["transactions"]) == 18
+    assert "NEFT CR-SALARY\nACME CORP LTD" in [
+        t["narration"] for t in result["result"]["transactions"]
+    ]
+
+
+def test_text_engine_in_process_pool(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_parser.settings, "pdf_parallel_min_pages", 2)
+    path = str(write_pdf(tmp_path / "plain.pdf", statement_pages(9, 5), ruled=False))
+    sequential = extract_page_tables(path, engine="text")
+    assert extract_page_tables(path, workers=2, engine="text") == sequential
+    assert all(sequential)
+
+
+async def test_analyze_rejects_unknown_pdf_engine(client):
+    response = await client.post(
+        "/api/analyze/bank/statement?pdf_engine=ocr",
+        files={"file": ("s.pdf", b"%PDF-1.4", "application/pdf")},
+    )
+    assert response.status_code == 400
+    assert "pdf_engine" in response.json()["detail"]
@@ -6,6 +6,7 @@ from sqlalchemy.exc import IntegrityError
 from sqlalchemy.pool import StaticPool
 from sqlmodel import Session, SQLModel, create_engine
 
+from app.config.settings import settings
 from app.db.crud import find_statement_by_hash, save_statement
 from app.db.database import get_session
 from app.db.models import StatementDB, TransactionDB
@@ -148,6 +149,28 @@ async def test_persist_true_second_upload_returns_cached(mem_client):
     assert "statement_id" in data2
 
 
+async def test_truncated_parse_is_not_cached_by_hash(mem_client, monkeypatch):
+    monkeypatch.setattr(settings, "parse_max_rows", 1)
+    file_content = (FIXTURES_DIR / "sample.csv").read_bytes()
+    async with AsyncClient(
+        transport=ASGITransport(app=mem_client), base_url="http://test"
+    ) as client:
+        r1 = await client.post(
+            "/api/analyze/bank/statement?persist=true",
+            files={"file": ("sample.csv", file_content, "text/csv")},
+        )
+        assert r1.json()["result"]["truncated"] is True
+
+        monkeypatch.setattr(settings, "parse_max_rows", 0)
+        r2 = await client.post(
+            "/api/analyze/bank/statement?persist=true",
+            files={"file": ("sample.csv", file_content, "text/csv")},
+        )
+    assert r2.status_code == 200
+    assert "cached" not in r2.json()
+    assert r2.json()["result"]["truncated"] is False
+
+
 async def test_get_statement_transactions_returns_list(mem_client):
     csv_path = FIXTURES_DIR / "sample.csv"
     async with AsyncClient(
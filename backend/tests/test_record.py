@@ -0,0 +1,79 @@
+import json
+import pickle
+
+import pytest
+
+from app.enrichers.narration_enricher import analyze_narration_details
+from app.models.record import TransactionRecord, as_dicts
+from app.scorers.confidence_scorer import calculate_confidence_score
+
+NARRATION = "UPI/123456789012/Rent March/HDFC/YBL12345678"
+
+
+def _pair():
+    base = {
+        "transaction_date": "2024-03-01",
+        "transaction_type": "DEBIT",
+        "amount": 25000.0,
+        "narration": NARRATION,
+        "balance": 1200.5,
+        "account": None,
+    }
+    details = analyze_narration_details(NARRATION)
+    return {**base, **details}, TransactionRecord(**base, **details)
+
+
+def test_to_dict_matches_former_dict_and_key_order():
+    legacy, record = _pair()
+    assert json.dumps(record.to_dict()) == json.dumps(legacy)
+    assert record == legacy
+
+
+def test_dict_interface():
+    legacy, record = _pair()
+    assert record["amount"] == 25000.0
+    assert record.get("merchant") is None
+    assert record.get("receiver_details", {}).get("name") is None
+    assert "confidence_score" not in record
+    assert record.get("llm_enriched", False) is False
+    with pytest.raises(KeyError):
+        record["nope"]
+    with pytest.raises(KeyError):
+        record["nope"] = 1
+
+
+def test_optional_fields_appear_once_set():
+    _, record = _pair()
+    record["confidence_score"] = calculate_confidence_score(record)
+    record["llm_enriched"] = True
+    assert list(record.to_dict())[-2:] == ["confidence_score", "llm_enriched"]
+    assert len(record) == len(record.to_dict())
+
+
+def test_lists_are_lazy():
+    record = TransactionRecord(narration="x", category=[], remarks=[])
+    assert record._category is None and record._remarks is None
+    assert record.to_dict()["category"] == []
+    assert record._category is None
+    record["category"].append("Rent")
+    assert record.to_dict()["category"] == ["Rent"]
+
+
+def test_receiver_details_round_trip():
+    record = TransactionRecord(receiver_details={"name": "A", "vpa": "a@ybl"})
+    assert record["receiver_details"] == {"name": "A", "account": None, "vpa": "a@ybl"}
+    record["receiver_details"] = {"account": "1234567890"}
+    assert record.receiver_name is None
+    assert record.receiver_account == "1234567890"
+
+
+def test_pickles_for_worker_processes():
+    _, record = _pair()
+    record["confidence_score"] = 0.9
+    assert pickle.loads(pickle.dumps(record)) == record
+
+
+def test_as_dicts_passes_dicts_through():
+    legacy, record = _pair()
+    assert as_dicts([record, legacy]) == [legacy, legacy]
+    assert type(as_dicts([record])[0]) is dict
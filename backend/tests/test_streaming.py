@@ -0,0 +1,109 @@
+import csv
+import io
+
+import pytest
+from openpyxl import Workbook
+
+from app.models.analyzer import BankStatementAnalyzer
+from app.parsers import excel_parser
+
+HEADER = "Date,Narration,Debit,Credit,Balance\n"
+PREAMBLE = "HDFC BANK LTD,,,\nAccount No: 50100123456789,,,\n\n"
+
+
+def _rows(n):
+    lines = []
+    for i in range(n):
+        day = i % 28 + 1
+        month = i // 28 % 12 + 1
+        lines.append(
+            f"{day:02d}/{month:02d}/2024,UPI/{100000000000 + i}/Shop{i % 7}/HDFC,"
+            f"{i % 50 + 1}.00,,{10000 + i}.00\n"
+        )
+    return lines
+
+
+@pytest.fixture(params=[".csv", ".xlsx"])
+def statement(request, tmp_path):
+    rows = _rows(120)
+    # duplicates land a few dates after their originals, in later chunks
+    rows = rows[:53] + rows[46:48] + ["\n"] + rows[53:] + rows[110:111]
+    text = PREAMBLE + HEADER + "".join(rows)
+    path = tmp_path / f"statement{request.param}"
+    if request.param == ".csv":
+        path.write_text(text)
+    else:
+        wb = Workbook()
+        for row in csv.reader(io.StringIO(text)):
+            wb.active.append(
+                [float(c) if c.replace(".", "").isdigit() else c for c in row]
+            )
+        wb.save(path)
+    return str(path)
+
+
+def _collect(events):
+    transactions, tail = [], None
+    for event in events:
+        if event["event"] == "transactions":
+            transactions.extend(event["transactions"])
+        else:
+            tail = event
+    return transactions, tail
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 50, 10_000])
+def test_stream_matches_whole_file(statement, chunk_size):
+    analyzer = BankStatementAnalyzer(statement)
+    expected = analyzer.extract_transactions()["result"]
+
+    transactions, summary = _collect(analyzer.stream_transactions(chunk_size))
+
+    assert summary["event"] == "summary"
+    assert transactions == expected["transactions"]
+    assert summary["account_info"] == expected["account_info"]
+    assert summary["date_format"] == expected["date_format"]
+    assert summary["confidence_summary"] == expected["confidence_summary"]
+
+
+def test_stream_yields_per_chunk(statement):
+    events = list(BankStatementAnalyzer(statement).stream_transactions(chunk_size=50))
+    chunks = [e for e in events if e["event"] == "transactions"]
+    assert len(chunks) == 3
+    assert all(len(e["transactions"]) <= 50 for e in chunks)
+    assert events[-1]["event"] == "summary"
+
+
+def test_stream_missing_columns(tmp_path):
+    path = tmp_path / "bad.csv"
+    path.write_text("Foo,Bar\n1,2\n")
+    events = list(BankStatementAnalyzer(str(path)).stream_transactions())
+    assert events == [
+        {
+            "event": "error",
+            "status_code": 400,
+            "message": "Missing critical columns (Date, Narration, and at least one of Credit/Debit/Amount).",
+        }
+    ]
+
+
+def test_stream_rejects_non_csv(tmp_path):
+    path = tmp_path / "statement.pdf"
+    path.write_bytes(b"%PDF-1.4")
+    events = list(BankStatementAnalyzer(str(path)).stream_transactions())
+    assert events[0]["event"] == "error"
+    assert events[0]["status_code"] == 400
+
+
+def test_stream_dedup_keeps_a_window_of_dates(tmp_path, monkeypatch):
+    monkeypatch.setattr(excel_parser, "STREAM_DEDUP_DATES", 5)
+    rows = _rows(20)
+    path = tmp_path / "statement.csv"
+    # row 12 repeated 3 dates on (dropped), row 2 repeated 18 dates on (kept)
+    rows = rows[:15] + rows[12:13] + rows[15:] + rows[2:3]
+    path.write_text(PREAMBLE + HEADER + "".join(rows))
+    transactions, _ = _collect(
+        BankStatementAnalyzer(str(path)).stream_transactions(chunk_size=4)
+    )
+    assert len(transactions) == 21
+    assert transactions[-1]["narration"] == transactions[2]["narration"]
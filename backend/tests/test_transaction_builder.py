@@ -0,0 +1,147 @@
+"""Differential tests: build_transactions vs. the former df.iterrows() row loop."""
+
+import json
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from app.enrichers.narration_enricher import analyze_narration_details
+from app.models.record import as_dicts
+from app.parsers.excel_parser import (
+    build_transactions,
+    clean_column_name,
+    normalize_date,
+    parse_amount,
+    resolve_columns,
+)
+from app.parsers.ingest import frame_from_grid, read_raw_grid
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+def legacy_rows(df, roles):
+    """The per-row loop process_excel_csv/process_pdf_transactions used to run."""
+    transactions = []
+    for index, row in df.iterrows():
+        try:
+            amount = None
+            txn_type = None
+            credit = parse_amount(row.get(roles["credit"]))
+            debit = parse_amount(row.get(roles["debit"]))
+            general_amount = (
+                parse_amount(row.get(roles["amount"])) if roles["amount"] else None
+            )
+            if credit is not None and credit > 0:
+                amount, txn_type = credit, "CREDIT"
+            elif debit is not None and debit > 0:
+                amount, txn_type = debit, "DEBIT"
+            elif general_amount is not None:
+                amount = abs(general_amount)
+                if roles["dr_cr_type"]:
+                    raw = row.get(roles["dr_cr_type"])
+                    val = str(raw).strip().lower() if pd.notna(raw) else ""
+                    txn_type = (
+                        "CREDIT"
+                        if "cr" in val
+                        else (
+                            "DEBIT"
+                            if "dr" in val
+                            else ("CREDIT" if general_amount >= 0 else "DEBIT")
+                        )
+                    )
+                else:
+                    txn_type = "CREDIT" if general_amount >= 0 else "DEBIT"
+            if amount is None and credit is None and debit is None and general_amount is None:
+                continue
+            narration_raw = row.get(roles["narration"])
+            narration = str(narration_raw).strip() if pd.notna(narration_raw) else ""
+            if not narration and amount is None:
+                continue
+            date_raw = row.get(roles["date"])
+            date_str = str(date_raw).strip() if pd.notna(date_raw) else None
+            account_raw = row.get(roles["account"])
+            transactions.append(
+                {
+                    "transaction_date": normalize_date(date_str, index),
+                    "transaction_type": txn_type,
+                    "amount": amount,
+                    "narration": narration,
+                    "balance": parse_amount(row.get(roles["balance"])),
+                    "account": (
+                        str(account_raw).strip()
+                        if roles["account"] and pd.notna(account_raw)
+                        else None
+                    ),
+                    **analyze_narration_details(narration),
+                }
+            )
+        except Exception:
+            continue
+    return transactions
+
+
+def _normalized(df):
+    df = df.loc[:, ~df.columns.str.contains("^Unnamed", case=False, na=False)]
+    df.columns = [clean_column_name(col) for col in df.columns]
+    return df
+
+
+def _frame(header, rows):
+    return _normalized(pd.DataFrame(rows, columns=header))
+
+
+FRAMES = {
+    "sample_csv": lambda: _normalized(
+        frame_from_grid(read_raw_grid(str(FIXTURES_DIR / "sample.csv")), 0)
+    ),
+    "dr_cr_column": lambda: _frame(
+        ["Txn Date", "Description", "Amount", "Dr/Cr", "Balance", "Account"],
+        [
+            ["2024-02-01", "POS AMAZON", "1200", "DR", "5000", None],
+            ["2024-02-02", "REFUND AMAZON", "(300)", "cr", "5300", " XX12 "],
+            ["2024-02-03", "UPI-GPAY", "-50", None, "5250", "XX12"],
+            ["2024-02-04", "Interest", "₹12.5 Cr.", "", "5262.5", None],
+            ["2024-02-05", "no amount", "n/a", "DR", "5262.5", None],
+        ],
+    ),
+    "credit_debit_edges": lambda: _frame(
+        ["Date", "Narration", "Withdrawals", "Deposits", "Balance"],
+        [
+            ["01/03/2024", "zero credit row", "", "0", "1,000.00"],
+            ["02/03/2024", "", "", "", ""],
+            ["03-Mar-24", "   ", "0", "", "999"],
+            [None, "IMPS/1234567890/JOHN/SBI", "250", "", "749"],
+            ["2024-03-05 10:11:12", "NEFT SALARY", "", "$40,000", "40749"],
+            ["31/02/2024", "bad date", "5", "", "2024-03-05"],
+        ],
+    ),
+    "duplicate_balance_column": lambda: _frame(
+        ["Date", "Narration", "Debit", "Credit", "Balance", "Balance"],
+        [["01-02-2024", "dup", "10", "", "100", "1"]],
+    ),
+    "duplicate_debit_column": lambda: _frame(
+        ["Date", "Narration", "Debit", "Debit", "Balance"],
+        [["01-02-2024", "dup", "10", "1", "100"]],
+    ),
+}
+
+
+@pytest.mark.parametrize("name", sorted(FRAMES))
+def test_builder_matches_row_loop(name):
+    df = FRAMES[name]()
+    roles = resolve_columns(df.columns)
+    expected = json.dumps(legacy_rows(df, roles))
+    assert json.dumps(as_dicts(build_transactions(df, roles))) == expected
+
+
+def test_builder_emits_python_floats():
+    df = FRAMES["sample_csv"]()
+    txns = build_transactions(df, resolve_columns(df.columns))
+    assert all(type(t["amount"]) is float for t in txns)
+    assert all(type(t["balance"]) is float for t in txns)
+
+
+def test_builder_empty_frame():
+    df = _frame(["Date", "Narration", "Amount"], [])
+    assert build_transactions(df, resolve_columns(df.columns)) == []